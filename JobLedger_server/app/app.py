@@ -1,31 +1,86 @@
 # Main entry point for the server
-from huggingface_hub import InferenceClient
+import time
+IMPORT_STARTED = time.perf_counter()
+
 import config
 import json
-import re
-from flask import Flask, request, jsonify
+import logging
+import threading
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google_auth_oauthlib.flow import Flow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
 import os.path
 import firestore_setup
+from extraction_cache import ExtractionCache, SqliteStore, FirestoreStore, job_identity
+from text_reduction import reduce_page_text
+from fast_extractors import default_registry, FULL_CONFIDENCE
+from query_jobs import QueryJob, QueryJobQueue
+from sheet_writer import SheetWriteBehind
+from sheet_provisioning import SheetProvisioner
+from application_index import ApplicationIndex
+from row_serializer import RowSerializer, FirestoreDescriptionStore
+import bulk_ledger
+from job_json import JobObjectDetector, extract_last_job_object
+from llm_backends import load_backend
+from llm_batcher import LLMBatcher
+from instrumentation import configure_logging, metrics, span, start_request, finish_request
+from lazy_init import Lazy
+from resilience import (
+    outbound, set_deadline, clear_deadline, deadline, remaining, bounded_timeout, check_deadline,
+    BreakerOpenError, BREAKER_STATES, QUOTA_STATUSES, TIMEOUT_ERRORS
+)
+from instrumentation import error_status
+import atexit
+import signal
+import sys
+import uuid
 from googleapiclient.errors import HttpError
-from google.cloud import secretmanager
-from google.oauth2 import service_account
+
+logger = logging.getLogger(__name__)
+
+# Bump when the validation/formatting rules change; migrate_sheets.py brings old sheets up to date
+SHEET_FORMAT_VERSION = 1
+
+# Where JobLedger's status rules apply: column E, rows 2-1000 of the first sheet
+STATUS_RANGE = {'sheetId': 0, 'startRowIndex': 1, 'endRowIndex': 1000, 'startColumnIndex': 4, 'endColumnIndex': 5}
+STATUS_VALUES = ('Pending', 'Approved', 'Rejected')
+
+def is_status_format_rule(rule: dict):
+    # True for the conditional format rules JobLedger adds (status_formatting_requests).
+    # The API leaves out zero-valued fields, so missing indexes count as 0.
+    ranges = rule.get('ranges', [])
+    if len(ranges) != 1 or any(ranges[0].get(key, 0) != value for key, value in STATUS_RANGE.items()):
+        return False
+    condition = rule.get('booleanRule', {}).get('condition', {})
+    values = [value.get('userEnteredValue') for value in condition.get('values', [])]
+    return condition.get('type') == 'TEXT_EQ' and len(values) == 1 and values[0] in STATUS_VALUES
 
 class Server:
-    def __init__(self):
+    def __init__(self, db=None):
         repo_id = "mistralai/Mistral-7B-Instruct-v0.3"
         api_key = os.environ.get('HF_API_KEY')
 
-        self.llm_client = InferenceClient(
+        # Selected per deployment with LLM_BACKEND (hf, llamacpp, onnx or fake)
+        self.llm = load_backend(
+            config.LLM_BACKEND,
             model=repo_id,
             api_key=api_key,
-            timeout=60
+            timeout=config.LLM_TIMEOUT,
+            model_path=config.LOCAL_MODEL_PATH,
+            n_ctx=config.LOCAL_MODEL_CTX,
+            n_threads=config.LOCAL_MODEL_THREADS
         )
+        if config.LLM_WARM_ON_START:
+            self.llm.warm()
+
+        # Coalesce concurrent extractions into batched backend calls
+        self.llm_batcher = None
+        if config.LLM_BATCH_MAX_SIZE > 1:
+            self.llm_batcher = LLMBatcher(
+                self.call_llm_batch,
+                max_batch=config.LLM_BATCH_MAX_SIZE,
+                max_wait=config.LLM_BATCH_MAX_WAIT,
+                workers=config.LLM_BATCH_WORKERS
+            )
 
         self.SCOPES = [
             'https://www.googleapis.com/auth/spreadsheets',
@@ -37,12 +92,65 @@ class Server:
         self.project_id = "jobledgerserverdeployment"
 
         # Get credentials and initialize services
+        # googleapiclient.discovery is slow to import, so it loads with the first Server
+        from google_clients import GoogleClientPool
         credentials = self._get_credentials()
-        self.sheets_service = build('sheets', 'v4', credentials=credentials)
-        self.drive_service = build('drive', 'v3', credentials=credentials)
+        self.google_clients = GoogleClientPool(credentials)
+
+        self.extraction_cache = self._build_extraction_cache(db)
+        self.row_serializer = RowSerializer(
+            config.DESCRIPTION_MODE,
+            max_items=config.DESCRIPTION_MAX_ITEMS,
+            max_chars=config.DESCRIPTION_MAX_CHARS,
+            store=FirestoreDescriptionStore(db) if db is not None else None,
+            link_base=config.DESCRIPTION_LINK_BASE
+        )
+        self.extractors = default_registry(config.FAST_PATH_MIN_CONFIDENCE)
+
+        self.sheet_writer = None
+        if config.SHEETS_WRITE_MODE in ('ack', 'wait'):
+            self.sheet_writer = SheetWriteBehind(
+                self.flush_rows,
+                window=config.SHEETS_WRITE_WINDOW,
+                max_rows=config.SHEETS_WRITE_MAX_ROWS,
+                workers=config.SHEETS_WRITE_WORKERS
+            )
+
+        self.applications = ApplicationIndex(
+            self.read_rows,
+            self.sheet_modified_time,
+            page_rows=config.BULK_EXPORT_PAGE_ROWS,
+            max_users=config.APPLICATION_INDEX_SIZE,
+            resync_interval=config.APPLICATION_INDEX_RESYNC
+        )
+
+    def _build_extraction_cache(self, db):
+        store = None
+        if config.EXTRACTION_CACHE_BACKEND == 'sqlite':
+            store = SqliteStore(config.EXTRACTION_CACHE_PATH)
+        elif config.EXTRACTION_CACHE_BACKEND == 'firestore' and db is not None:
+            store = FirestoreStore(db)
+
+        return ExtractionCache(
+            max_size=config.EXTRACTION_CACHE_SIZE,
+            ttl=config.EXTRACTION_CACHE_TTL,
+            store=store,
+            store_max_rows=config.EXTRACTION_CACHE_STORE_SIZE,
+            evict_interval=config.EXTRACTION_CACHE_EVICT_INTERVAL
+        )
+
+    @property
+    def sheets_service(self):
+        # Per-thread client, safe to use from any waitress worker
+        return self.google_clients.sheets()
+
+    @property
+    def drive_service(self):
+        return self.google_clients.drive()
 
     def _get_credentials(self):
         # Retrieve credentials.json from Secret Manager
+        from google.oauth2 import service_account
         credentials = service_account.Credentials.from_service_account_file(
             os.getenv('GOOGLE_APPLICATION_CREDENTIALS'),
             scopes=self.SCOPES
@@ -51,32 +159,28 @@ class Server:
         return credentials
 
     def jsonResult(self, response: str):
-        # Regular expression to match JSON objects
-        json_matches = re.findall(r'\{\s*"job_title":.*?\}', response, re.DOTALL)
+        # Single pass over the model output for the last job object, repairing
+        # trailing commas and unterminated arrays/strings along the way
+        parsed_json = extract_last_job_object(response)
 
-        if json_matches:
-            # Select the last JSON object
-            last_json_string = json_matches[-1]
-            
-            # Parse the JSON string to verify it's valid JSON (optional)
-            try:
-                parsed_json = json.loads(last_json_string)
-                parsed_json["status"] = "New"
-                parsed_json["notes"] = ""
-                # testing purposes
-                # print("Extracted JSON:")
-                # print(json.dumps(parsed_json, indent=4))  # Pretty print the JSON
-                return parsed_json
-            except json.JSONDecodeError:
-                print("Failed to parse JSON.")
+        if parsed_json:
+            return self.with_job_defaults(parsed_json)
         else:
-            print("No JSON found in the text.")
+            logger.warning("No JSON found in the text.")
 
-    def call_llm(self, prompt: str):
-        response = self.llm_client.post(
-            json={
-                "inputs": 
-                f"""
+    def with_job_defaults(self, parsed_json: dict):
+        if not isinstance(parsed_json.get("job_description"), list):
+            description = parsed_json.get("job_description")
+            parsed_json["job_description"] = [description] if description else []
+        parsed_json["status"] = "New"
+        parsed_json["notes"] = ""
+        # testing purposes
+        # print("Extracted JSON:")
+        # print(json.dumps(parsed_json, indent=4))  # Pretty print the JSON
+        return parsed_json
+
+    def build_prompt(self, prompt: str):
+        return f"""
                     Process the following text and extract only the job details. Return the details in the JSON format below, strictly without any additional text, explanation, or the original query:
                     {{
                         "job_title": "title of the job",
@@ -88,169 +192,278 @@ class Server:
 
                     Text to process:   
                     {prompt}
-                """,
-                "task": "text-generation",
-                "parameters": {"max_new_tokens": 700},
-            },
-        )
-        response = json.loads(response.decode())[0]["generated_text"]
+                """
+
+    def call_llm(self, prompt: str, on_partial=None):
+        # Generation is a pure function of the prompt, so every path is safe to retry
+        # Skipped once the backend has found it can't batch (hf behind TGI)
+        if self.llm_batcher and getattr(self.llm, 'batch_supported', True):
+            return self.llm_batcher.submit(prompt).result(timeout=remaining())
+        if config.LLM_STREAMING:
+            return outbound.call('llm', lambda: self.call_llm_streaming(prompt, on_partial))
+
+        def generate():
+            with span('llm', 'generate'):
+                return self.llm.generate(self.build_prompt(prompt), max_new_tokens=700)
+        response = outbound.call('llm', generate)
         # print(response)
         return self.jsonResult(response)
+
+    def call_llm_batch(self, prompts: list):
+        # Several pages in one backend call; local backends run them as one batch
+        def generate_batch():
+            with span('llm', 'generate_batch'):
+                return self.llm.generate_batch([self.build_prompt(prompt) for prompt in prompts], max_new_tokens=700)
+        responses = outbound.call('llm', generate_batch)
+        return [self.jsonResult(response) for response in responses]
+
+    def call_llm_streaming(self, prompt: str, on_partial=None):
+        # Stop generating as soon as a complete job object has been parsed
+        start = time.perf_counter()
+        first_field = []
+
+        def report_partial(fields):
+            if not first_field:
+                first_field.append(time.perf_counter() - start)
+                logger.info(f"First field after {first_field[0]:.2f}s", extra={'duration': first_field[0]})
+                metrics.observe('jobledger_llm_first_field_seconds', {}, first_field[0])
+            if on_partial:
+                on_partial(fields)
+
+        detector = JobObjectDetector(on_partial=report_partial)
+        generated = []
+        with span('llm', 'stream'):
+            stream = self.llm.stream(self.build_prompt(prompt), max_new_tokens=700)
+            try:
+                for token in stream:
+                    # A slow trickle of tokens must not outlive the request
+                    check_deadline()
+                    generated.append(token)
+                    completed = detector.feed(token)
+                    if completed:
+                        logger.info(
+                            f"Job object complete after {len(generated)} tokens, stopping generation",
+                            extra={'tokens': len(generated)}
+                        )
+                        return self.with_job_defaults(completed[0])
+            finally:
+                stream.close()
+
+        return self.jsonResult(''.join(generated))
+
+    def extract_job_details(self, page_text: str, page: dict = None, on_partial=None):
+        prompt = page_text
+        if config.TEXT_REDUCTION_TOKEN_BUDGET:
+            prompt = reduce_page_text(page_text, config.TEXT_REDUCTION_TOKEN_BUDGET)
+
+        # Serve repeated captures of the same posting without parsing the page or
+        # another LLM round trip. Keyed on the posting's URL when it names one, else
+        # on the reduced job text: the raw page carries per-user chrome.
+        cache_source = job_identity((page or {}).get('url')) or prompt
+        cached = self.extraction_cache.get(cache_source)
+        if cached:
+            return cached
+
+        # Structured pages (JSON-LD, known board layouts) don't need the LLM at all
+        if config.FAST_PATH_ENABLED and page:
+            result, confidence = self.extractors.extract(page)
+            if result:
+                # The cache entry is shared by every later capture of the posting,
+                # so only results read entirely from the page go in
+                if confidence >= FULL_CONFIDENCE:
+                    self.extraction_cache.set(cache_source, result)
+                return result
+
+        start = time.perf_counter()
+        try:
+            result = self.call_llm(prompt, on_partial)
+        except BreakerOpenError:
+            # The LLM is failing; a partial rule-based result beats an error
+            fallback = self.extractors.extract(page, config.FAST_PATH_FALLBACK_CONFIDENCE)[0] if page else None
+            if fallback:
+                logger.warning("LLM circuit open, serving the fast-path fallback")
+                return fallback
+            raise
+        duration = time.perf_counter() - start
+        logger.info(
+            f"LLM extraction took {duration:.2f}s for {len(prompt)} chars",
+            extra={'duration': duration, 'chars': len(prompt)}
+        )
+        if result:
+            self.extraction_cache.set(cache_source, result)
+        return result
       
+    def build_row(self, job_data: dict):
+        return self.row_serializer.row(job_data)
+
+    def build_rows(self, records: list):
+        # Batches the side store writes for the whole chunk
+        return self.row_serializer.rows(records)
+
+    def append_rows(self, spreadsheet_id: str, range_name: str, rows: list):
+        # Raises on failure so callers can retry
+        return self.sheets_service.spreadsheets().values().append(
+            spreadsheetId=spreadsheet_id,
+            range=range_name,
+            valueInputOption='RAW',
+            insertDataOption='INSERT_ROWS',
+            body={'values': rows}
+        ).execute()
+
+    def read_rows(self, spreadsheet_id: str, start_row: int, end_row: int):
+        result = self.sheets_service.spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id,
+            range=f"Sheet1!A{start_row}:F{end_row}"
+        ).execute()
+        return result.get('values', [])
+
+    def sheet_modified_time(self, spreadsheet_id: str):
+        # Cheap Drive metadata read; changes whenever anyone edits the sheet
+        return self.drive_service.files().get(
+            fileId=spreadsheet_id,
+            fields='modifiedTime',
+            supportsAllDrives=True
+        ).execute().get('modifiedTime')
+
     def append_to_sheet(self, spreadsheet_id: str, range_name: str, job_data: dict):
-        print(f"Appending data to sheet...")  # Debugging line
-        values = [
-            [
-                job_data.get('job_title', ''),
-                job_data.get('company_name'),
-                job_data.get('date_applied', ''),
-                job_data.get('job_description', []),
-                job_data.get('status', 'Pending'),
-                job_data.get('notes', '')
-            ]
-        ]
-        
-        body = {
-            'values': values
-        }
-        
+        logger.info(f"Appending data to sheet...")  # Debugging line
         try:
-            result = self.sheets_service.spreadsheets().values().append(
-                spreadsheetId=spreadsheet_id,
-                range=range_name,
-                valueInputOption='RAW',
-                insertDataOption='INSERT_ROWS',
-                body=body
-            ).execute()
-            
-            return result
+            return self.append_rows(spreadsheet_id, range_name, [self.build_row(job_data)])
         except Exception as e:
-            print(f"Error appending to sheet: {e}")
+            logger.error(f"Error appending to sheet: {e}")
             return None
         
-    def add_status_data_validation(self, spreadsheet_id: str):
-        try:
-            # Define the data validation rule for the 'Status' column (e.g., column F)
-            requests = [
-                {
-                    "setDataValidation": {
-                        "range": {
-                            "sheetId": 0,  # Assuming the first sheet, change if necessary
+    def status_validation_requests(self):
+        # Data validation rule for the 'Status' column (e.g., column F)
+        return [
+            {
+                "setDataValidation": {
+                    "range": {
+                        "sheetId": 0,  # Assuming the first sheet, change if necessary
+                        "startRowIndex": 1,
+                        "endRowIndex": 1000,
+                        "startColumnIndex": 4,  # Column F is index 5 (zero-based)
+                        "endColumnIndex": 5   # End column is F
+                    },
+                    "rule": {
+                        "condition": {
+                            "type": "ONE_OF_LIST",
+                            "values": [
+                                {"userEnteredValue": "Pending"},
+                                {"userEnteredValue": "Approved"},
+                                {"userEnteredValue": "Rejected"}
+                            ]
+                        },
+                    }
+                }
+            }
+        ]
+
+    def status_formatting_requests(self):
+        # Colour the 'Status' column by value
+        return [
+            {
+                "addConditionalFormatRule": {
+                    "rule": {
+                        "ranges": [{
+                            "sheetId": 0,
                             "startRowIndex": 1,
                             "endRowIndex": 1000,
-                            "startColumnIndex": 4,  # Column F is index 5 (zero-based)
-                            "endColumnIndex": 5   # End column is F
-                        },
-                        "rule": {
+                            "startColumnIndex": 4,
+                            "endColumnIndex": 5
+                        }],
+                        "booleanRule": {
                             "condition": {
-                                "type": "ONE_OF_LIST",
-                                "values": [
-                                    {"userEnteredValue": "Pending"},
-                                    {"userEnteredValue": "Approved"},
-                                    {"userEnteredValue": "Rejected"}
-                                ]
+                                "type": "TEXT_EQ",
+                                "values": [{"userEnteredValue": "Pending"}]
                             },
+                            "format": {
+                                "backgroundColor": {"red": 0.85, "green": 0.85, "blue": 0}
+                            }
                         }
-                    }
+                    },
+                    "index": 0,
                 }
-            ]
-
-            # Apply the data validation rule to the status column
-            self.sheets_service.spreadsheets().batchUpdate(
-                spreadsheetId=spreadsheet_id,
-                body={
-                    "requests": requests
-                }
-            ).execute()
-
-            print("Data validation applied successfully!")
-        except Exception as e:
-            print(f"Error applying data validation: {e}")
-
-    def add_status_conditional_formatting(self, spreadsheet_id: str):
-        try:
-            requests = [
-                {
-                    "addConditionalFormatRule": {
-                        "rule": {
-                            "ranges": [{
-                                "sheetId": 0,
-                                "startRowIndex": 1,
-                                "endRowIndex": 1000,
-                                "startColumnIndex": 4,
-                                "endColumnIndex": 5
-                            }],
-                            "booleanRule": {
-                                "condition": {
-                                    "type": "TEXT_EQ",
-                                    "values": [{"userEnteredValue": "Pending"}]
-                                },
-                                "format": {
-                                    "backgroundColor": {"red": 0.85, "green": 0.85, "blue": 0}
-                                }
-                            }
-                        },
-                        "index": 0,
-                    }
-                },
-                {
-                    "addConditionalFormatRule": {
-                        "rule": {
-                            "ranges": [{
-                                "sheetId": 0,
-                                "startRowIndex": 1,
-                                "endRowIndex": 1000,
-                                "startColumnIndex": 4,
-                                "endColumnIndex": 5
-                            }],
-                            "booleanRule": {
-                                "condition": {
-                                    "type": "TEXT_EQ",
-                                    "values": [{"userEnteredValue": "Approved"}]
-                                },
-                                "format": {
-                                    "backgroundColor": {"red": 0, "green": 0.85, "blue": 0}
-                                }
+            },
+            {
+                "addConditionalFormatRule": {
+                    "rule": {
+                        "ranges": [{
+                            "sheetId": 0,
+                            "startRowIndex": 1,
+                            "endRowIndex": 1000,
+                            "startColumnIndex": 4,
+                            "endColumnIndex": 5
+                        }],
+                        "booleanRule": {
+                            "condition": {
+                                "type": "TEXT_EQ",
+                                "values": [{"userEnteredValue": "Approved"}]
+                            },
+                            "format": {
+                                "backgroundColor": {"red": 0, "green": 0.85, "blue": 0}
                             }
                         }
                     }
-                },
-                {
-                    "addConditionalFormatRule": {
-                        "rule": {
-                            "ranges": [{
-                                "sheetId": 0,
-                                "startRowIndex": 1,
-                                "endRowIndex": 1000,
-                                "startColumnIndex": 4,
-                                "endColumnIndex": 5
-                            }],
-                            "booleanRule": {
-                                "condition": {
-                                    "type": "TEXT_EQ",
-                                    "values": [{"userEnteredValue": "Rejected"}]
-                                },
-                                "format": {
-                                    "backgroundColor": {"red": 0.85, "green": 0, "blue": 0}
-                                }
+                }
+            },
+            {
+                "addConditionalFormatRule": {
+                    "rule": {
+                        "ranges": [{
+                            "sheetId": 0,
+                            "startRowIndex": 1,
+                            "endRowIndex": 1000,
+                            "startColumnIndex": 4,
+                            "endColumnIndex": 5
+                        }],
+                        "booleanRule": {
+                            "condition": {
+                                "type": "TEXT_EQ",
+                                "values": [{"userEnteredValue": "Rejected"}]
+                            },
+                            "format": {
+                                "backgroundColor": {"red": 0.85, "green": 0, "blue": 0}
                             }
                         }
                     }
                 }
-            ]
+            }
+        ]
 
-            body={"requests": requests}
-            response = (
-                self.sheets_service.spreadsheets()
-                .batchUpdate(spreadsheetId=spreadsheet_id, body=body)
-                .execute()
-            )
+    def format_sheet(self, spreadsheet_id: str):
+        # Validation and conditional formatting in one call, run once per sheet
+        self.sheets_service.spreadsheets().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={"requests": self.status_validation_requests() + self.status_formatting_requests()}
+        ).execute()
+        return SHEET_FORMAT_VERSION
 
+    def migrate_sheet_format(self, spreadsheet_id: str):
+        # Drop the status rules stacked up by older per-append formatting,
+        # keeping any the user added, then apply the current formatting once
+        spreadsheet = self.sheets_service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id,
+            fields="sheets(properties(sheetId),conditionalFormats)"
+        ).execute()
 
-            print(f"Formatting applied successfully: {response}")
+        deletes = []
+        for sheet in spreadsheet.get('sheets', []):
+            if sheet['properties'].get('sheetId', 0) != 0:
+                continue
+            rules = sheet.get('conditionalFormats', [])
+            # Delete from the end so the remaining indexes stay valid
+            for index in reversed(range(len(rules))):
+                if is_status_format_rule(rules[index]):
+                    deletes.append({"deleteConditionalFormatRule": {"sheetId": 0, "index": index}})
 
-        except Exception as e:
-            print(f"Error applying conditional formatting: {e}")
+        requests = deletes + self.status_validation_requests() + self.status_formatting_requests()
+        self.sheets_service.spreadsheets().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={"requests": requests}
+        ).execute()
+        logger.info(f"Sheet {spreadsheet_id} migrated, removed {len(deletes)} conditional format rules")
+        return SHEET_FORMAT_VERSION
 
     def create_and_share_sheet(self, sheet_title: str):
         try:
@@ -262,7 +475,7 @@ class Server:
             }
             spreadsheet = self.sheets_service.spreadsheets().create(body=spreadsheet_body).execute()
             spreadsheet_id = spreadsheet['spreadsheetId']
-            print(f"Spreadsheet created with ID: {spreadsheet_id}")
+            logger.info(f"Spreadsheet created with ID: {spreadsheet_id}")
             
             # Step 2: Set permissions to "anyone with the link can edit"
             permission_body = {
@@ -279,18 +492,34 @@ class Server:
             
             # Step 3: Generate and return the link
             share_link = f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/edit"
-            print(f"Spreadsheet link: {share_link}")
+            logger.info(f"Spreadsheet link: {share_link}")
             return share_link
         except HttpError as error:
-            print(f"An error occurred: {error}")
+            logger.error(f"An error occurred: {error}")
             return None
 
+    def sheet_title(self, user_email: str):
+        return f"User_{user_email}_Sheet"
+
     # run this only for new users
     def trigger_new_sheet(self, user_email: str):
-        sheet_title = f"User_{user_email}_Sheet"
+        return self.create_ledger_sheet(self.sheet_title(user_email))
+
+    def claim_spare(self, spreadsheet_id: str, user_email: str):
+        # Spares are created before their owner is known; give a claimed one
+        # the title a sheet created for this user would have had
+        self.drive_service.files().update(
+            fileId=spreadsheet_id,
+            body={'name': self.sheet_title(user_email)},
+            supportsAllDrives=True,
+            fields='id'
+        ).execute()
+
+    def create_ledger_sheet(self, sheet_title: str):
+        # Creates, shares and formats a sheet with the header row in place
         sheet_link = self.create_and_share_sheet(sheet_title)
         if sheet_link:
-            print(f"New sheet created and shared: {sheet_link}")
+            logger.info(f"New sheet created and shared: {sheet_link}")
             spreadsheet_id = sheet_link.split("/")[5]  # The ID is typically in the URL at this position
             new_sheet_title = {
                 "job_title": "Job Title",
@@ -301,23 +530,217 @@ class Server:
                 "notes": "Additional Notes"
             }
             self.append_to_sheet(spreadsheet_id, 'Sheet1!A:F', new_sheet_title)
+            format_version = None
+            try:
+                format_version = self.format_sheet(spreadsheet_id)
+            except Exception as e:
+                logger.error(f"Error formatting new sheet: {e}")
             return {
                 "spreadsheetId": spreadsheet_id,
-                "spreadsheetUrl": sheet_link
+                "spreadsheetUrl": sheet_link,
+                "formatVersion": format_version
             }
         else:
-            print("Failed to create and share the sheet.")
+            logger.error("Failed to create and share the sheet.")
         
+    def flush_rows(self, spreadsheet_id: str, rows: list):
+        # One append per batch of buffered rows; formatting is applied when the sheet is created
+        return self.append_rows(spreadsheet_id, 'Sheet1!A:F', rows)
+
     def append_to_existing_sheet(self, spreadsheet_id: str, job_data: dict):
-        self.append_to_sheet(spreadsheet_id, 'Sheet1!A:F', job_data)
-        self.add_status_data_validation(spreadsheet_id)
-        self.add_status_conditional_formatting(spreadsheet_id)
+        # Raises on failure so the route can tell the client the row wasn't saved
+        if not self.sheet_writer:
+            result = self.append_rows(spreadsheet_id, 'Sheet1!A:F', [self.build_row(job_data)])
+        else:
+            future = self.sheet_writer.add(spreadsheet_id, self.build_row(job_data))
+            result = None
+            if config.SHEETS_WRITE_MODE == 'wait':
+                result = future.result(timeout=bounded_timeout(config.SHEETS_WRITE_TIMEOUT))
+        self.applications.record_append(spreadsheet_id, job_data)
+        return result
+
+configure_logging()
 
 app = Flask(__name__)
 CORS(app)
 
-server = Server()
-db = firestore_setup.database()
+outbound.configure(
+    max_attempts=config.OUTBOUND_MAX_ATTEMPTS,
+    base_delay=config.OUTBOUND_BACKOFF_BASE,
+    max_delay=config.OUTBOUND_BACKOFF_MAX,
+    failure_threshold=config.BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=config.BREAKER_RESET_TIMEOUT
+)
+
+# The Firestore client and Server are built on first use or by warm_up();
+# everything else below is cheap to create at import
+db = Lazy('firestore', lambda: firestore_setup.database(
+    cache_size=config.USER_CACHE_SIZE,
+    cache_ttl=config.USER_CACHE_TTL,
+    listen=config.USER_CACHE_LISTEN
+))
+server = Lazy('server', lambda: Server(db))
+provisioner = SheetProvisioner(
+    server,
+    db,
+    lease_ttl=config.SHEET_LEASE_TTL,
+    wait_timeout=config.SHEET_PROVISION_TIMEOUT,
+    spare_target=config.SPARE_SHEET_POOL_SIZE
+)
+query_jobs = QueryJobQueue(
+    workers=config.QUERY_WORKERS,
+    max_queued=config.QUERY_QUEUE_SIZE,
+    timeout=config.QUERY_JOB_TIMEOUT,
+    ttl=config.QUERY_JOB_TTL
+)
+event_streams = threading.BoundedSemaphore(config.QUERY_EVENT_STREAMS)
+
+startup = {
+    'mode': config.STARTUP_MODE,
+    'import_seconds': None,
+    'warm_seconds': None,
+    'error': None,
+    'workers': 1,
+}
+warmed = threading.Event()
+
+def warm_up():
+    # Builds the clients in the order the first requests need them
+    start = time.perf_counter()
+    try:
+        db.resolve()
+        server.resolve()
+        server.google_clients.warm()
+        provisioner.refill_async()
+    except Exception as e:
+        startup['error'] = str(e)
+        logger.exception(f"Warm-up failed: {e}")
+    finally:
+        startup['warm_seconds'] = time.perf_counter() - start
+        warmed.set()
+        logger.info(f"Warm-up finished in {startup['warm_seconds']:.2f}s", extra={'duration': startup['warm_seconds']})
+
+stopped = threading.Event()
+
+def shutdown():
+    # Drain queued work before the process exits. Runs from atexit and from
+    # gunicorn's worker_exit hook, whichever comes first. Rows already
+    # acknowledged to clients are flushed first; query jobs get whatever is left
+    # of SERVER_GRACEFUL_TIMEOUT, since Cloud Run kills the instance soon after.
+    if stopped.is_set():
+        return
+    stopped.set()
+    started = time.perf_counter()
+    if server.is_ready() and server.sheet_writer:
+        server.sheet_writer.close()
+        logger.info(f"Flushed buffered rows in {time.perf_counter() - started:.2f}s")
+    query_jobs.shutdown(timeout=max(config.SERVER_GRACEFUL_TIMEOUT - (time.perf_counter() - started), 0))
+    logger.info(f"Drained query jobs in {time.perf_counter() - started:.2f}s")
+    if not server.is_ready():
+        return
+    if server.llm_batcher:
+        server.llm_batcher.close()
+    server.applications.close()
+
+atexit.register(shutdown)
+
+@app.before_request
+def start_request_trace():
+    set_deadline(config.REQUEST_DEADLINE)
+    # Metrics are labelled by endpoint, so 404s and other unrouted paths share one
+    # label instead of adding a series per path
+    start_request(request.headers.get('X-Request-Id') or uuid.uuid4().hex, request.endpoint or 'unmatched')
+
+@app.after_request
+def finish_request_trace(response):
+    clear_deadline()
+    current = finish_request(response.status_code)
+    if current:
+        response.headers['X-Request-Id'] = current['id']
+        logger.info(
+            f"{request.method} {request.path} {response.status_code} in {current['duration'] * 1000:.0f}ms",
+            extra={
+                'endpoint': current['endpoint'],
+                'status': response.status_code,
+                'duration': current['duration'],
+                'spans': current['spans'],
+            }
+        )
+    return response
+
+def error_response(e):
+    # Outages, quota rejections and spent deadlines are worth retrying for the client
+    status = error_status(e)
+    if isinstance(e, BreakerOpenError):
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = str(int(e.retry_in) + 1)
+        return response, 503
+    if isinstance(e, TIMEOUT_ERRORS) or status in QUOTA_STATUSES:
+        return jsonify({'error': str(e)}), 503
+    return jsonify({'error': str(e)}), 500
+
+def collect_gauges():
+    # Point-in-time state read when /metrics is scraped; a scrape never triggers initialization
+    gauges = [('jobledger_query_queue_depth', {}, query_jobs.depth())]
+    for dependency, stats in outbound.stats().items():
+        gauges.append(('jobledger_breaker_state', {'dependency': dependency}, BREAKER_STATES[stats['state']]))
+    if not (server.is_ready() and db.is_ready()):
+        return gauges
+    for cache_name, stats in (('extraction', server.extraction_cache.stats()), ('users', db.user_cache.stats())):
+        for stat in ('size', 'hits', 'misses'):
+            gauges.append((f'jobledger_cache_{stat}', {'cache': cache_name}, stats[stat]))
+    for extractor, stats in server.extractors.stats().items():
+        gauges.append(('jobledger_fast_path_attempts', {'extractor': extractor}, stats['attempts']))
+        gauges.append(('jobledger_fast_path_hits', {'extractor': extractor}, stats['hits']))
+    if server.llm_batcher:
+        for stat, value in server.llm_batcher.stats().items():
+            gauges.append((f'jobledger_llm_batch_{stat}', {}, value))
+    for stat, value in server.applications.stats().items():
+        gauges.append((f'jobledger_application_index_{stat}', {}, value))
+    for stat, value in server.row_serializer.stats().items():
+        if stat != 'mode':
+            gauges.append((f'jobledger_descriptions_{stat}', {}, value))
+    gauges.append(('jobledger_google_clients', {}, server.google_clients.created))
+    return gauges
+
+metrics.register_collector(collect_gauges)
+
+def process_query(query: str, user_email: str, page: dict, on_partial=None):
+    # Returns (user_found, result); shared by the synchronous and background paths
+    result = server.extract_job_details(query, page, on_partial)
+
+    userExist = db.get_user_info(user_email)
+
+    if not userExist:
+        # Create a new Google Sheet and get the link
+        # sheet_info = server.trigger_new_sheet(user_email)
+        # sheet_url = sheet_info["spreadsheetUrl"]
+        # db.add_user_to_firestore(user_email, sheet_url, 'paid')
+        return False, None
+    else:
+        sheet_url = userExist['sheet_link']
+        if not sheet_url:
+            sheet_info = provisioner.ensure_sheet(user_email)
+            sheet_url = sheet_info["spreadsheetUrl"]
+
+    return True, result
+
+def run_query_job(query: str, user_email: str, page: dict, job=None):
+    # Fields streamed from the LLM are visible to pollers before the job finishes.
+    # Runs on a queue worker, so it gets its own trace keyed by the job id.
+    start_request(job.id if job else uuid.uuid4().hex, 'query_job')
+    status = 500
+    try:
+        with deadline(config.QUERY_JOB_TIMEOUT):
+            result = process_query(query, user_email, page, job.set_partial if job else None)[1]
+        status = 200
+        return result
+    finally:
+        current = finish_request(status)
+        logger.info(
+            f"Query job finished in {current['duration'] * 1000:.0f}ms",
+            extra={'endpoint': 'query_job', 'status': status, 'duration': current['duration'], 'spans': current['spans']}
+        )
 
 @app.route("/api/query", methods=['POST'])
 def handle_query():
@@ -329,28 +752,81 @@ def handle_query():
         
         query = data['query']
         user_email = data['user_email']
+        # Optional structured page data sent by newer extension versions
+        page = {
+            'url': data.get('url'),
+            'json_ld': data.get('json_ld'),
+            'html': data.get('html'),
+        }
 
-        result = server.call_llm(query)
+        # Jobs live in this process; with several workers the poll could land on
+        # another one, so async requests get the synchronous answer instead
+        if data.get('async') and startup['workers'] == 1:
+            # Hand the extraction to the worker pool and let the client poll for it
+            job = query_jobs.submit(run_query_job, query, user_email, page)
+            if not job:
+                return jsonify({'error': 'Too many queued queries, try again later'}), 503
+            return jsonify({
+                'job_id': job.id,
+                'status': job.status,
+                'status_url': f"/api/query/{job.id}",
+                'events_url': f"/api/query/{job.id}/events"
+            }), 202
 
-        userExist = db.get_user_info(user_email)
-        
+        if data.get('stream'):
+            # Same job as async, but run on its own thread and answered on this
+            # connection, so it works with any number of workers. The request
+            # thread waits on it either way, as it would for a plain request.
+            job = QueryJob(uuid.uuid4().hex, run_query_job, (query, user_email, page))
+            threading.Thread(target=job.run, name=f"query-stream-{job.id[:8]}", daemon=True).start()
+
+            def stream():
+                # One JSON object per line; blank lines keep idle proxies from closing it
+                for update in job.updates(config.QUERY_JOB_TIMEOUT):
+                    yield json.dumps(update) + "\n" if update else "\n"
+
+            return Response(stream(), mimetype='application/x-ndjson', headers={'Cache-Control': 'no-cache'})
+
+        userExist, result = process_query(query, user_email, page)
         if not userExist:
-            # Create a new Google Sheet and get the link
-            # sheet_info = server.trigger_new_sheet(user_email)
-            # sheet_url = sheet_info["spreadsheetUrl"]
-            # db.add_user_to_firestore(user_email, sheet_url, 'paid')
             return None
-        else:
-            sheet_url = userExist['sheet_link']
-            if not sheet_url:
-                sheet_info = server.trigger_new_sheet(user_email)
-                sheet_url = sheet_info["spreadsheetUrl"]
-                db.add_user_to_firestore(user_email, sheet_url)
             
         return jsonify(result)
     
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return error_response(e)
+
+@app.route("/api/query/<job_id>", methods=['GET'])
+def handle_query_status(job_id):
+    job = query_jobs.get(job_id)
+    if not job:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job.to_dict(config.QUERY_JOB_TIMEOUT)), 200
+
+@app.route("/api/query/<job_id>/events", methods=['GET'])
+def handle_query_events(job_id):
+    job = query_jobs.get(job_id)
+    if not job:
+        return jsonify({'error': 'Unknown job'}), 404
+
+    if not event_streams.acquire(blocking=False):
+        return jsonify({'error': 'Too many open event streams, poll status_url instead',
+                        'status_url': f"/api/query/{job.id}"}), 503
+
+    def stream():
+        # EventSource reconnects a second after the stream ends and gets the
+        # current status first, so ending early only costs that second
+        ends_at = time.time() + config.QUERY_EVENT_STREAM_HOLD
+        yield "retry: 1000\n\n"
+        for data in job.updates(config.QUERY_JOB_TIMEOUT):
+            yield f"data: {json.dumps(data)}\n\n" if data else ": keep-alive\n\n"
+            if time.time() > ends_at:
+                return
+
+    response = Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+    # Runs when the server closes the response, including when the client goes away
+    response.call_on_close(event_streams.release)
+    return response
     
 @app.route("/api/sheets", methods=['POST'])
 def handle_google_sheets():
@@ -378,27 +854,168 @@ def handle_google_sheets():
 
         if not userExist or userExist == 'anonymous':
              # Create a new Google Sheet and get the link
-            sheet_info = server.trigger_new_sheet(userEmail)
+            sheet_info = provisioner.ensure_sheet(userEmail)
             spreadsheet_id = sheet_info["spreadsheetId"]
             sheet_url = sheet_info["spreadsheetUrl"]
-            db.add_user_to_firestore(userEmail, sheet_url)
-            server.append_to_existing_sheet(spreadsheet_id, job_details)
-            return jsonify({
-                'message': 'New sheet created and data appended successfully!',
-                'sheet_url': sheet_url
-            }), 200
+            message = 'New sheet created and data appended successfully!'
         else:
             # Found user in database
             sheet_url = userExist['sheet_link']
             spreadsheet_id = sheet_url.split("/")[5]
-            server.append_to_existing_sheet(spreadsheet_id, job_details)
+            message = 'Existing sheet found and data appended successfully!'
+
+        if config.SKIP_DUPLICATE_APPLICATIONS and not job_data.get('allow_duplicate'):
+            existing = server.applications.lookup(
+                spreadsheet_id, job_details.get('company_name'), job_details.get('job_title')
+            )
+            if existing:
+                return jsonify({
+                    'message': 'This job is already in your sheet',
+                    'duplicate': True,
+                    'application': existing,
+                    'sheet_url': sheet_url
+                }), 200
+
+        server.append_to_existing_sheet(spreadsheet_id, job_details)
+        return jsonify({
+            'message': message,
+            'duplicate': False,
+            'sheet_url': sheet_url
+        }), 200
+    
+    except Exception as e:
+        return error_response(e)
+
+def user_spreadsheet_id(user_email: str, create: bool):
+    userExist = db.get_user_info(user_email)
+    sheet_url = userExist['sheet_link'] if userExist else None
+    if not sheet_url:
+        if not create:
+            return None
+        sheet_url = provisioner.ensure_sheet(user_email)["spreadsheetUrl"]
+    return sheet_url.split("/")[5]
+
+@app.route("/api/sheets/bulk", methods=['POST'])
+def handle_bulk_import():
+    # Body is NDJSON (one job per line) or CSV with a header row; the user
+    # is passed as ?user_email= so the body can be streamed
+    try:
+        user_email = request.args.get('user_email')
+        if not user_email:
+            return jsonify({'error': 'No user_email provided'}), 400
+        spreadsheet_id = user_spreadsheet_id(user_email, create=True)
+    except Exception as e:
+        return error_response(e)
+
+    rows = bulk_ledger.open_rows(request.stream, request.content_type)
+    chunks = bulk_ledger.iter_chunks(rows, config.BULK_CHUNK_ROWS, config.BULK_CHUNK_BYTES)
+
+    def progress():
+        # One NDJSON progress line per chunk, then a summary
+        written = 0
+        failed = 0
+        invalid = 0
+        for index, (chunk, chunk_invalid) in enumerate(chunks):
+            report = {'chunk': index, 'rows': len(chunk), 'invalid': chunk_invalid}
+            invalid += len(chunk_invalid)
+            if chunk:
+                try:
+                    server.append_rows(spreadsheet_id, 'Sheet1!A:F', server.build_rows(chunk))
+                    for row in chunk:
+                        server.applications.record_append(spreadsheet_id, row)
+                    written += len(chunk)
+                    report['status'] = 'written'
+                except Exception as e:
+                    logger.error(f"Error writing bulk chunk {index}: {e}")
+                    failed += len(chunk)
+                    report['status'] = 'failed'
+                    report['error'] = str(e)
+            yield json.dumps(report) + "\n"
+        yield json.dumps({'done': True, 'written': written, 'failed': failed, 'invalid': invalid}) + "\n"
+
+    return Response(stream_with_context(progress()), mimetype='application/x-ndjson')
+
+@app.route("/api/sheets/export", methods=['GET'])
+def handle_bulk_export():
+    try:
+        user_email = request.args.get('user_email')
+        if not user_email:
+            return jsonify({'error': 'No user_email provided'}), 400
+        spreadsheet_id = user_spreadsheet_id(user_email, create=False)
+        if not spreadsheet_id:
+            return jsonify({'error': 'No sheet found for user'}), 404
+    except Exception as e:
+        return error_response(e)
+
+    as_csv = request.args.get('format') == 'csv'
+    page_size = config.BULK_EXPORT_PAGE_ROWS
+
+    def export():
+        if as_csv:
+            yield bulk_ledger.format_csv_line(bulk_ledger.LEDGER_COLUMNS)
+        # Row 1 is the header
+        start_row = 2
+        while True:
+            try:
+                values = server.read_rows(spreadsheet_id, start_row, start_row + page_size - 1)
+            except Exception as e:
+                logger.error(f"Error exporting rows from {start_row}: {e}")
+                if not as_csv:
+                    yield json.dumps({'error': str(e), 'row': start_row}) + "\n"
+                return
+            for record in bulk_ledger.rows_to_records(values):
+                if as_csv:
+                    yield bulk_ledger.format_csv_line([record[column] for column in bulk_ledger.LEDGER_COLUMNS])
+                else:
+                    yield json.dumps(record) + "\n"
+            if len(values) < page_size:
+                return
+            start_row += page_size
+
+    mimetype = 'text/csv' if as_csv else 'application/x-ndjson'
+    return Response(export(), mimetype=mimetype)
+
+@app.route("/api/applications", methods=['GET'])
+def handle_applications():
+    # Answered from the in-memory index: ?company=&title= checks for a
+    # duplicate, otherwise returns totals and counts per status
+    try:
+        user_email = request.args.get('user_email')
+        if not user_email:
+            return jsonify({'error': 'No user_email provided'}), 400
+        spreadsheet_id = user_spreadsheet_id(user_email, create=False)
+        if not spreadsheet_id:
+            return jsonify({'error': 'No sheet found for user'}), 404
+
+        company = request.args.get('company')
+        title = request.args.get('title')
+        if company or title:
+            existing = server.applications.lookup(spreadsheet_id, company, title)
+            return jsonify({'duplicate': existing is not None, 'application': existing}), 200
+        return jsonify(server.applications.summary(spreadsheet_id)), 200
+    except Exception as e:
+        return error_response(e)
+
+@app.route("/api/descriptions/<key>", methods=['GET'])
+def handle_description(key):
+    # Full description behind the link left in a capped sheet cell
+    try:
+        store = server.row_serializer.store
+        if not store:
+            return jsonify({'error': 'Descriptions are not stored'}), 404
+        doc = store.get(key)
+        if not doc:
+            return jsonify({'error': 'Description not found'}), 404
+        if request.args.get('format') == 'json':
             return jsonify({
-                'message': 'Existing sheet found and data appended successfully!',
-                'sheet_url': sheet_url
+                'job_title': doc['job_title'],
+                'company_name': doc['company_name'],
+                'description': doc['description']
             }), 200
-    
+        text = f"{doc['job_title']} at {doc['company_name']}\n\n" + "\n".join(f"- {item}" for item in doc['description'])
+        return Response(text, mimetype='text/plain; charset=utf-8')
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return error_response(e)
 
 @app.route("/api/link", methods=['POST'])
 def handle_sheet_link():
@@ -423,16 +1040,93 @@ def handle_sheet_link():
         else:
             sheet_url = userExist['sheet_link']
             if not sheet_url:
-                sheet_info = server.trigger_new_sheet(userEmail)
+                sheet_info = provisioner.ensure_sheet(userEmail)
                 sheet_url = sheet_info["spreadsheetUrl"]
-                db.add_user_to_firestore(userEmail, sheet_url)
             return jsonify({
                 'message': 'Existing sheet found!',
                 'sheet_url': sheet_url
             }), 200
     
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return error_response(e)
+
+@app.route("/api/cache/stats", methods=['GET'])
+def handle_cache_stats():
+    return jsonify({
+        'extraction': server.extraction_cache.stats(),
+        'users': db.user_cache.stats(),
+        'applications': server.applications.stats(),
+        'descriptions': server.row_serializer.stats()
+    }), 200
+
+@app.route("/api/query/stats", methods=['GET'])
+def handle_query_stats():
+    return jsonify({
+        'queue_depth': query_jobs.depth(),
+        'jobs': len(query_jobs.jobs),
+        'llm_batching': server.llm_batcher.stats() if server.llm_batcher else None
+    }), 200
+
+@app.route("/api/extractors/stats", methods=['GET'])
+def handle_extractor_stats():
+    return jsonify(server.extractors.stats()), 200
+
+@app.route("/api/ready", methods=['GET'])
+def handle_ready():
+    # Readiness probe: 503 until warm-up has built the clients
+    ready = warmed.is_set() and not startup['error']
+    return jsonify({
+        'ready': ready,
+        'mode': startup['mode'],
+        'import_seconds': startup['import_seconds'],
+        'warm_seconds': startup['warm_seconds'],
+        'error': startup['error'],
+        'components': {
+            'firestore': db.init_status(),
+            'server': server.init_status(),
+        }
+    }), 200 if ready else 503
+
+@app.route("/api/breakers", methods=['GET'])
+def handle_breaker_stats():
+    return jsonify(outbound.stats()), 200
+
+@app.route("/metrics", methods=['GET'])
+def handle_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def exit_on_sigterm(signum, frame):
+    # waitress-serve dies on SIGTERM without running atexit hooks; exiting
+    # normally lets waitress finish in-flight requests and shutdown() drain
+    logger.info("SIGTERM received, shutting down")
+    sys.exit(0)
+
+def start(mode: str, workers: int = 1):
+    # Starts this process's threads and client warm-up. Runs at import, or
+    # with DEFER_STARTUP from gunicorn's post_fork hook in each worker, since
+    # neither threads nor gRPC/HTTP connections survive fork. workers is the
+    # number of server processes sharing the port.
+    startup['workers'] = workers
+    query_jobs.start()
+    if mode == 'eager':
+        warm_up()
+        if startup['error']:
+            raise RuntimeError(f"Startup failed: {startup['error']}")
+    elif mode == 'background':
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    else:
+        # lazy: nothing to wait for, clients are built by the requests that need them
+        warmed.set()
+
+if not config.DEFER_STARTUP:
+    if threading.current_thread() is threading.main_thread() and signal.getsignal(signal.SIGTERM) == signal.SIG_DFL:
+        signal.signal(signal.SIGTERM, exit_on_sigterm)
+    start(config.STARTUP_MODE)
+startup['import_seconds'] = time.perf_counter() - IMPORT_STARTED
+logger.info(
+    f"app imported in {startup['import_seconds']:.2f}s ({config.STARTUP_MODE} startup)",
+    extra={'duration': startup['import_seconds']}
+)
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8080)
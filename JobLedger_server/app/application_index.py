@@ -0,0 +1,198 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from bulk_ledger import rows_to_records
+
+logger = logging.getLogger(__name__)
+
+COMPANY_SUFFIXES = {'inc', 'ltd', 'llc', 'llp', 'plc', 'corp', 'corporation', 'co', 'company', 'pte', 'gmbh', 'limited'}
+
+# Appends that might not have reached the sheet when a resync read it
+APPEND_GRACE = 10
+
+
+def normalize_name(value: str):
+    return " ".join(re.sub(r'[^a-z0-9]+', ' ', str(value or '').lower()).split())
+
+
+def application_key(company: str, title: str):
+    # "Example Corp." / "example corp" / "Example, Inc" all index the same company
+    words = normalize_name(company).split()
+    while len(words) > 1 and words[-1] in COMPANY_SUFFIXES:
+        words.pop()
+    return " ".join(words), normalize_name(title)
+
+
+class UserApplications:
+    # Everything the index knows about one sheet. Rows read from the sheet carry
+    # their row number; rows appended since the last resync have row None.
+    def __init__(self, spreadsheet_id: str, modified_time=None):
+        self.spreadsheet_id = spreadsheet_id
+        self.modified_time = modified_time
+        self.synced_at = time.time()
+        self.entries = {}
+        self.status_counts = Counter()
+        self.recent = []  # (added_at, record) appended since the last resync
+
+    def add(self, record: dict, row=None):
+        key = application_key(record.get('company_name'), record.get('job_title'))
+        if not any(key):
+            return
+        previous = self.entries.get(key)
+        if previous:
+            self.status_counts[previous['status']] -= 1
+        status = record.get('status') or 'Pending'
+        self.entries[key] = {
+            'job_title': record.get('job_title', ''),
+            'company_name': record.get('company_name', ''),
+            'date_applied': record.get('date_applied', ''),
+            'status': status,
+            'row': row,
+            'count': previous['count'] + 1 if previous else 1,
+        }
+        self.status_counts[status] += 1
+
+    def stats(self):
+        return {
+            'total': len(self.entries),
+            'status_counts': {status: count for status, count in self.status_counts.items() if count},
+            'synced_at': self.synced_at,
+        }
+
+
+class ApplicationIndex:
+    # Per-user index of applications keyed on normalized (company, title), kept
+    # in memory so duplicate checks and status counts never touch the Sheets API.
+    # A sheet is read once when first needed, updated on every append, and
+    # resynced in the background when Drive reports it was modified.
+    def __init__(self, read_rows, modified_time=None, page_rows: int = 1000,
+                 max_users: int = 1000, resync_interval: float = 300):
+        self.read_rows = read_rows
+        self.modified_time = modified_time
+        self.page_rows = page_rows
+        self.max_users = max_users
+        self.resync_interval = resync_interval
+        self.sheets = OrderedDict()
+        self.lock = threading.Lock()
+        self.loads = 0
+        self.resyncs = 0
+        self.closed = threading.Event()
+        self.resyncer = None
+        if resync_interval:
+            self.resyncer = threading.Thread(target=self._run, name="application-index-resync", daemon=True)
+            self.resyncer.start()
+
+    def _read(self, spreadsheet_id: str):
+        # Row 1 is the header
+        modified_time = self.modified_time(spreadsheet_id) if self.modified_time else None
+        applications = UserApplications(spreadsheet_id, modified_time)
+        start_row = 2
+        while True:
+            values = self.read_rows(spreadsheet_id, start_row, start_row + self.page_rows - 1)
+            for offset, record in enumerate(rows_to_records(values)):
+                applications.add(record, start_row + offset)
+            if len(values) < self.page_rows:
+                return applications
+            start_row += self.page_rows
+
+    def _store(self, applications: UserApplications):
+        self.sheets[applications.spreadsheet_id] = applications
+        self.sheets.move_to_end(applications.spreadsheet_id)
+        while len(self.sheets) > self.max_users:
+            self.sheets.popitem(last=False)
+
+    def get(self, spreadsheet_id: str):
+        with self.lock:
+            applications = self.sheets.get(spreadsheet_id)
+            if applications:
+                self.sheets.move_to_end(spreadsheet_id)
+                return applications
+        applications = self._read(spreadsheet_id)
+        with self.lock:
+            self.loads += 1
+            # Another request may have loaded it meanwhile; keep the first
+            if spreadsheet_id not in self.sheets:
+                self._store(applications)
+            return self.sheets[spreadsheet_id]
+
+    def lookup(self, spreadsheet_id: str, company: str, title: str):
+        applications = self.get(spreadsheet_id)
+        with self.lock:
+            entry = applications.entries.get(application_key(company, title))
+            return dict(entry) if entry else None
+
+    def summary(self, spreadsheet_id: str):
+        applications = self.get(spreadsheet_id)
+        with self.lock:
+            return applications.stats()
+
+    def record_append(self, spreadsheet_id: str, record: dict):
+        # Only sheets already in memory are updated; others load fresh when asked for
+        with self.lock:
+            applications = self.sheets.get(spreadsheet_id)
+            if applications:
+                applications.add(record)
+                if self.resync_interval:
+                    # Older appends are certainly in the sheet by the next resync
+                    cutoff = time.time() - self.resync_interval - APPEND_GRACE
+                    applications.recent = [item for item in applications.recent if item[0] >= cutoff]
+                    applications.recent.append((time.time(), dict(record)))
+
+    def resync(self, spreadsheet_id: str, force: bool = False):
+        with self.lock:
+            current = self.sheets.get(spreadsheet_id)
+        if not current:
+            return False
+        if not force and self.modified_time:
+            if self.modified_time(spreadsheet_id) == current.modified_time:
+                with self.lock:
+                    current.synced_at = time.time()
+                return False
+
+        started = time.time()
+        fresh = self._read(spreadsheet_id)
+        with self.lock:
+            current = self.sheets.get(spreadsheet_id)
+            if current:
+                # Re-apply appends the read may have missed (write-behind, in-flight requests)
+                for added_at, record in current.recent:
+                    if added_at >= started - APPEND_GRACE:
+                        key = application_key(record.get('company_name'), record.get('job_title'))
+                        if key not in fresh.entries:
+                            fresh.add(record)
+                        fresh.recent.append((added_at, record))
+                self._store(fresh)
+            self.resyncs += 1
+        return True
+
+    def _run(self):
+        while not self.closed.wait(self.resync_interval / 4):
+            now = time.time()
+            with self.lock:
+                due = [s.spreadsheet_id for s in self.sheets.values() if now - s.synced_at >= self.resync_interval]
+            for spreadsheet_id in due:
+                if self.closed.is_set():
+                    return
+                try:
+                    self.resync(spreadsheet_id)
+                except Exception as e:
+                    logger.error(f"Error resyncing application index for {spreadsheet_id}: {e}")
+                    # Try again next interval rather than on every pass
+                    with self.lock:
+                        if spreadsheet_id in self.sheets:
+                            self.sheets[spreadsheet_id].synced_at = time.time()
+
+    def close(self):
+        self.closed.set()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'sheets': len(self.sheets),
+                'max_sheets': self.max_users,
+                'applications': sum(len(s.entries) for s in self.sheets.values()),
+                'loads': self.loads,
+                'resyncs': self.resyncs,
+            }
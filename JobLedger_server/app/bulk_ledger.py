@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+
+# Sheet column order, matches Server.build_row
+LEDGER_COLUMNS = ['job_title', 'company_name', 'date_applied', 'job_description', 'status', 'notes']
+STATUSES = ('Pending', 'Approved', 'Rejected', 'New')
+
+
+def iter_ndjson(stream):
+    # Yields (line_number, record or None, error) without reading the whole body
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except json.JSONDecodeError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+
+
+def iter_csv(stream):
+    reader = csv.DictReader(stream)
+    for line_number, record in enumerate(reader, start=2):
+        yield line_number, record, None
+
+
+def validate_row(record):
+    # Returns (job_data, error)
+    if not isinstance(record, dict):
+        return None, "Row must be an object"
+
+    job_data = {column: record.get(column) or '' for column in LEDGER_COLUMNS}
+    if not str(job_data['job_title']).strip():
+        return None, "Missing job_title"
+    if not str(job_data['company_name']).strip():
+        return None, "Missing company_name"
+
+    job_data['status'] = job_data['status'] or 'Pending'
+    if job_data['status'] not in STATUSES:
+        return None, f"Unknown status: {job_data['status']}"
+
+    if isinstance(job_data['job_description'], list):
+        job_data['job_description'] = "\n".join(str(item) for item in job_data['job_description'])
+    return job_data, None
+
+
+def iter_chunks(rows, max_rows: int, max_bytes: int):
+    # Groups (line_number, job_data, error) into chunks that fit in one append call.
+    # Yields (valid rows, invalid [(line_number, error)]) per chunk.
+    chunk = []
+    invalid = []
+    size = 0
+    for line_number, record, error in rows:
+        job_data = None
+        if not error:
+            job_data, error = validate_row(record)
+        if error:
+            invalid.append({'line': line_number, 'error': error})
+            continue
+
+        row_size = len(json.dumps(job_data))
+        if chunk and (len(chunk) >= max_rows or size + row_size > max_bytes):
+            yield chunk, invalid
+            chunk, invalid, size = [], [], 0
+        chunk.append(job_data)
+        size += row_size
+
+    if chunk or invalid:
+        yield chunk, invalid
+
+
+def open_rows(stream, content_type: str):
+    # The request stream yields bytes one line at a time
+    text = (line.decode('utf-8') for line in stream)
+    if 'csv' in (content_type or ''):
+        return iter_csv(text)
+    return iter_ndjson(text)
+
+
+def rows_to_records(values: list):
+    for row in values:
+        row = row + [''] * (len(LEDGER_COLUMNS) - len(row))
+        yield dict(zip(LEDGER_COLUMNS, row))
+
+
+def format_csv_line(values: list):
+    out = io.StringIO()
+    csv.writer(out).writerow(values)
+    return out.getvalue()
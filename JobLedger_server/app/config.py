@@ -3,4 +3,122 @@ import os
 from dotenv import load_dotenv
 
 load_dotenv()
-HF_API_KEY = os.getenv('HF_API_KEY')
\ No newline at end of file
+HF_API_KEY = os.getenv('HF_API_KEY')
+
+# Extraction cache settings
+EXTRACTION_CACHE_SIZE = int(os.getenv('EXTRACTION_CACHE_SIZE', '512'))
+EXTRACTION_CACHE_TTL = int(os.getenv('EXTRACTION_CACHE_TTL', str(7 * 24 * 3600)))
+# "sqlite", "firestore" or empty to keep the cache in memory only
+EXTRACTION_CACHE_BACKEND = os.getenv('EXTRACTION_CACHE_BACKEND', '')
+EXTRACTION_CACHE_PATH = os.getenv('EXTRACTION_CACHE_PATH', '/tmp/extraction_cache.db')
+# Row cap for the sqlite/firestore tier, and how often expired/excess rows are deleted
+EXTRACTION_CACHE_STORE_SIZE = int(os.getenv('EXTRACTION_CACHE_STORE_SIZE', '50000'))
+EXTRACTION_CACHE_EVICT_INTERVAL = float(os.getenv('EXTRACTION_CACHE_EVICT_INTERVAL', '3600'))
+
+# Page text reduction before the LLM prompt (0 disables it)
+TEXT_REDUCTION_TOKEN_BUDGET = int(os.getenv('TEXT_REDUCTION_TOKEN_BUDGET', '1500'))
+
+# Rule-based extractors that skip the LLM for structured job boards
+FAST_PATH_ENABLED = os.getenv('FAST_PATH_ENABLED', 'true').lower() == 'true'
+FAST_PATH_MIN_CONFIDENCE = float(os.getenv('FAST_PATH_MIN_CONFIDENCE', '0.8'))
+# Lower bar used only when the LLM circuit is open and a partial result beats an error
+FAST_PATH_FALLBACK_CONFIDENCE = float(os.getenv('FAST_PATH_FALLBACK_CONFIDENCE', '0.4'))
+
+# Background workers for asynchronous /api/query jobs
+QUERY_WORKERS = int(os.getenv('QUERY_WORKERS', '4'))
+QUERY_QUEUE_SIZE = int(os.getenv('QUERY_QUEUE_SIZE', '32'))
+QUERY_JOB_TIMEOUT = float(os.getenv('QUERY_JOB_TIMEOUT', '90'))
+QUERY_JOB_TTL = float(os.getenv('QUERY_JOB_TTL', '600'))
+# Each open /events stream holds a server thread until its job ends; over this
+# many, the stream is refused with a 503 and the client can poll status_url
+QUERY_EVENT_STREAMS = int(os.getenv('QUERY_EVENT_STREAMS', '4'))
+# A stream still open after this many seconds is ended and the client reconnects,
+# so an abandoned one gives its thread back without waiting for the job
+QUERY_EVENT_STREAM_HOLD = float(os.getenv('QUERY_EVENT_STREAM_HOLD', '25'))
+
+# Write-behind batching of sheet appends: "ack" returns once the row is queued,
+# "wait" blocks until its batch is flushed, "off" appends synchronously
+SHEETS_WRITE_MODE = os.getenv('SHEETS_WRITE_MODE', 'off')
+SHEETS_WRITE_WINDOW = float(os.getenv('SHEETS_WRITE_WINDOW', '0.5'))
+SHEETS_WRITE_MAX_ROWS = int(os.getenv('SHEETS_WRITE_MAX_ROWS', '50'))
+# Appends to different spreadsheets that may run at once
+SHEETS_WRITE_WORKERS = int(os.getenv('SHEETS_WRITE_WORKERS', '16'))
+SHEETS_WRITE_TIMEOUT = float(os.getenv('SHEETS_WRITE_TIMEOUT', '60'))
+
+# In-process cache of Firestore user records
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '1024'))
+USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', '300'))
+USER_CACHE_LISTEN = os.getenv('USER_CACHE_LISTEN', 'false').lower() == 'true'
+
+# New-user sheet provisioning
+SHEET_LEASE_TTL = float(os.getenv('SHEET_LEASE_TTL', '60'))
+SHEET_PROVISION_TIMEOUT = float(os.getenv('SHEET_PROVISION_TIMEOUT', '60'))
+# Number of pre-created, pre-formatted sheets to keep ready for new users
+SPARE_SHEET_POOL_SIZE = int(os.getenv('SPARE_SHEET_POOL_SIZE', '0'))
+
+# Bulk import/export chunking (Sheets requests are capped at ~10MB)
+BULK_CHUNK_ROWS = int(os.getenv('BULK_CHUNK_ROWS', '500'))
+BULK_CHUNK_BYTES = int(os.getenv('BULK_CHUNK_BYTES', str(2 * 1024 * 1024)))
+BULK_EXPORT_PAGE_ROWS = int(os.getenv('BULK_EXPORT_PAGE_ROWS', '1000'))
+
+# Stream LLM tokens and stop once a complete job object has been generated
+LLM_STREAMING = os.getenv('LLM_STREAMING', 'true').lower() == 'true'
+
+# LLM backend: "hf" (Hugging Face Inference API), "llamacpp" or "onnx" (local CPU), "fake" (tests)
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'hf')
+LOCAL_MODEL_PATH = os.getenv('LOCAL_MODEL_PATH', '')
+LOCAL_MODEL_CTX = int(os.getenv('LOCAL_MODEL_CTX', '4096'))
+LOCAL_MODEL_THREADS = int(os.getenv('LOCAL_MODEL_THREADS', '0')) or None
+# Load local models at startup instead of on the first request
+LLM_WARM_ON_START = os.getenv('LLM_WARM_ON_START', 'true').lower() == 'true'
+
+# Micro-batching of concurrent LLM calls (1 disables it; batched calls don't stream)
+LLM_BATCH_MAX_SIZE = int(os.getenv('LLM_BATCH_MAX_SIZE', '1'))
+LLM_BATCH_MAX_WAIT = float(os.getenv('LLM_BATCH_MAX_WAIT', '0.01'))
+# Batches sent to the backend at once
+LLM_BATCH_WORKERS = int(os.getenv('LLM_BATCH_WORKERS', '4'))
+
+# How the Firestore, Google and LLM clients are created at startup:
+# "eager" builds them while app.py is imported, "background" on a warm-up thread
+# after import, "lazy" on first use. /api/ready reports when warm-up is done.
+STARTUP_MODE = os.getenv('STARTUP_MODE', 'background')
+
+# Outbound calls (HF, Sheets/Drive, Firestore): per-request deadline, retries and circuit breakers
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', '30'))
+REQUEST_DEADLINE = float(os.getenv('REQUEST_DEADLINE', '60'))
+OUTBOUND_MAX_ATTEMPTS = int(os.getenv('OUTBOUND_MAX_ATTEMPTS', '3'))
+OUTBOUND_BACKOFF_BASE = float(os.getenv('OUTBOUND_BACKOFF_BASE', '0.5'))
+OUTBOUND_BACKOFF_MAX = float(os.getenv('OUTBOUND_BACKOFF_MAX', '8'))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', '5'))
+BREAKER_RESET_TIMEOUT = float(os.getenv('BREAKER_RESET_TIMEOUT', '30'))
+
+# In-memory index of each user's applications for duplicate checks and status counts
+APPLICATION_INDEX_SIZE = int(os.getenv('APPLICATION_INDEX_SIZE', '1000'))
+# Seconds between checks for manual edits to indexed sheets (0 disables resync)
+APPLICATION_INDEX_RESYNC = float(os.getenv('APPLICATION_INDEX_RESYNC', '300'))
+# Don't append a job that is already in the user's sheet (same company and title)
+SKIP_DUPLICATE_APPLICATIONS = os.getenv('SKIP_DUPLICATE_APPLICATIONS', 'false').lower() == 'true'
+
+# Public URL of this service, used for the links in side_store mode
+DESCRIPTION_LINK_BASE = os.getenv('DESCRIPTION_LINK_BASE', '')
+# How job descriptions are written to sheet cells: "full" keeps every point,
+# "side_store" keeps the first DESCRIPTION_MAX_ITEMS points within DESCRIPTION_MAX_CHARS
+# and saves the full text compressed in Firestore behind a link, "capped" only
+# truncates (the rest is dropped). Defaults to side_store when links can be built.
+DESCRIPTION_MODE = os.getenv('DESCRIPTION_MODE') or ('side_store' if DESCRIPTION_LINK_BASE else 'full')
+DESCRIPTION_MAX_ITEMS = int(os.getenv('DESCRIPTION_MAX_ITEMS', '8'))
+DESCRIPTION_MAX_CHARS = int(os.getenv('DESCRIPTION_MAX_CHARS', '1000'))
+
+# Multi-process serving with gunicorn (gunicorn.conf.py). Every worker is a separate
+# process with its own clients, caches, application index and query job queue, so
+# it defaults to one worker; with more, async /api/query requests are answered
+# synchronously (see app.start). Local models are loaded once per worker.
+SERVER_WORKERS = int(os.getenv('SERVER_WORKERS', '1'))
+SERVER_THREADS = int(os.getenv('SERVER_THREADS', os.getenv('WAITRESS_THREADS', '16')))
+# Seconds a worker may go without a heartbeat before gunicorn restarts it
+SERVER_TIMEOUT = int(os.getenv('SERVER_TIMEOUT', '120'))
+# Seconds to finish in-flight requests after SIGTERM (Cloud Run kills the instance after 10)
+SERVER_GRACEFUL_TIMEOUT = int(os.getenv('SERVER_GRACEFUL_TIMEOUT', '8'))
+# Set by gunicorn.conf.py: importing app.py doesn't start threads or warm-up,
+# gunicorn's post_fork hook calls app.start() in each worker instead
+DEFER_STARTUP = os.getenv('DEFER_STARTUP', 'false').lower() == 'true'
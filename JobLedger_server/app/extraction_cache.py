@@ -0,0 +1,221 @@
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Query parameters and paths that name one posting on the boards users capture from
+JOB_ID_PATTERNS = [
+    re.compile(r'[?&]currentJobId=(\d+)'),
+    re.compile(r'/jobs/view/(?:[^/?#]*-)?(\d+)'),
+    re.compile(r'[?&](?:jk|gh_jid|jobId|job_id)=([\w-]+)', re.IGNORECASE),
+]
+
+
+def normalize_text(text: str):
+    # Collapse whitespace and case so re-captures of the same page hash the same
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+
+def cache_key(text: str):
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+def job_identity(url: str):
+    # "host job id" when the URL names a specific posting, so every user capturing
+    # it shares a cache entry whatever their page chrome shows; None otherwise
+    if not url:
+        return None
+    for pattern in JOB_ID_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return f"{urlparse(url).netloc.lower()} {match.group(1)}"
+    return None
+
+
+class SqliteStore:
+    # Persistent tier backed by a local SQLite file
+    def __init__(self, path: str):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS extractions ("
+            "key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS extractions_created_at ON extractions (created_at)")
+        self.conn.commit()
+
+    def get(self, key: str):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT result, created_at FROM extractions WHERE key = ?", (key,)
+            ).fetchone()
+        if row:
+            return json.loads(row[0]), row[1]
+        return None
+
+    def set(self, key: str, result: dict, created_at: float):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO extractions (key, result, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(result), created_at)
+            )
+            self.conn.commit()
+
+    def delete(self, key: str):
+        with self.lock:
+            self.conn.execute("DELETE FROM extractions WHERE key = ?", (key,))
+            self.conn.commit()
+
+    def evict_expired(self, ttl: int, max_rows: int):
+        with self.lock:
+            self.conn.execute("DELETE FROM extractions WHERE created_at < ?", (time.time() - ttl,))
+            # Then the oldest rows beyond max_rows
+            self.conn.execute(
+                "DELETE FROM extractions WHERE key IN ("
+                "SELECT key FROM extractions ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (max_rows,)
+            )
+            self.conn.commit()
+
+
+class FirestoreStore:
+    # Persistent tier backed by a collection managed by firestore_setup.database
+    def __init__(self, db):
+        self.db = db
+
+    def get(self, key: str):
+        doc = self.db.get_cached_extraction(key)
+        if doc:
+            return doc['result'], doc['created_at']
+        return None
+
+    def set(self, key: str, result: dict, created_at: float):
+        self.db.set_cached_extraction(key, result, created_at)
+
+    def delete(self, key: str):
+        self.db.delete_cached_extraction(key)
+
+    def evict_expired(self, ttl: int, max_rows: int):
+        self.db.delete_expired_extractions(time.time() - ttl)
+        self.db.trim_extractions(max_rows)
+
+
+class ExtractionCache:
+    # Content-addressed cache of jsonResult outputs, keyed on the posting's identity
+    # (see job_identity) or its normalized job text. A bounded in-process LRU sits in
+    # front of an optional persistent store, which is trimmed to store_max_rows and
+    # cleared of expired entries at most every evict_interval seconds.
+    def __init__(self, max_size: int = 512, ttl: int = 7 * 24 * 3600, store=None,
+                 store_max_rows: int = 50000, evict_interval: float = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.store = store
+        self.store_max_rows = store_max_rows
+        self.evict_interval = evict_interval
+        self.last_evicted = time.time()
+        self.evicting = False
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.store_hits = 0
+        self.evictions = 0
+
+    def _expired(self, created_at: float):
+        return time.time() - created_at > self.ttl
+
+    def _put_local(self, key: str, result: dict, created_at: float):
+        self.entries[key] = (result, created_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, text: str):
+        key = cache_key(text)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and not self._expired(entry[1]):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[0])
+            if entry:
+                del self.entries[key]
+                self.evictions += 1
+
+        if self.store:
+            try:
+                stored = self.store.get(key)
+            except Exception as e:
+                logger.error(f"Error reading extraction cache store: {e}")
+                stored = None
+            if stored and not self._expired(stored[1]):
+                with self.lock:
+                    self._put_local(key, stored[0], stored[1])
+                    self.hits += 1
+                    self.store_hits += 1
+                return dict(stored[0])
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def set(self, text: str, result: dict):
+        if not result:
+            return
+        key = cache_key(text)
+        created_at = time.time()
+        with self.lock:
+            self._put_local(key, dict(result), created_at)
+        if self.store:
+            try:
+                self.store.set(key, result, created_at)
+            except Exception as e:
+                logger.error(f"Error writing extraction cache store: {e}")
+        self._maybe_evict()
+
+    def _maybe_evict(self):
+        # Piggybacks on writes; the store delete runs on its own thread
+        with self.lock:
+            if self.evicting or time.time() - self.last_evicted < self.evict_interval:
+                return
+            self.evicting = True
+            self.last_evicted = time.time()
+        threading.Thread(target=self._evict_in_background, name="extraction-cache-evict", daemon=True).start()
+
+    def _evict_in_background(self):
+        try:
+            self.evict_expired()
+        finally:
+            with self.lock:
+                self.evicting = False
+
+    def evict_expired(self):
+        with self.lock:
+            expired = [key for key, entry in self.entries.items() if self._expired(entry[1])]
+            for key in expired:
+                del self.entries[key]
+            self.evictions += len(expired)
+        if self.store:
+            try:
+                self.store.evict_expired(self.ttl, self.store_max_rows)
+            except Exception as e:
+                logger.error(f"Error evicting extraction cache store: {e}")
+
+    def stats(self):
+        with self.lock:
+            return {
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'store_hits': self.store_hits,
+                'evictions': self.evictions,
+            }
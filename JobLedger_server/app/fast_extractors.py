@@ -0,0 +1,297 @@
+import json
+import logging
+import re
+import threading
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+MAX_DESCRIPTION_POINTS = 20
+# Score of a result with a title, a company read from the page and a description
+FULL_CONFIDENCE = 1.0
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+BLOCK_TAGS = {'p', 'li', 'br', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'tr', 'ul', 'ol', 'section'}
+# select_text feeds the parser this much html at a time so it can stop early
+FEED_CHUNK = 64 * 1024
+
+
+class ElementTextParser(HTMLParser):
+    # Collects the text of the first element matching each selector.
+    # Selectors are (tag or None, attribute, substring of the attribute value).
+    def __init__(self, selectors: dict):
+        super().__init__(convert_charrefs=True)
+        self.selectors = selectors
+        self.results = {}
+        self.open = []  # [name, depth, chunks] for elements currently being captured
+        self.depth = 0
+
+    def _matches(self, tag, attrs, selector):
+        want_tag, attr, value = selector
+        if want_tag and want_tag != tag:
+            return False
+        return value in (attrs.get(attr) or '')
+
+    def handle_starttag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            for capture in self.open:
+                capture[2].append('\n')
+        if tag in VOID_TAGS:
+            return
+        self.depth += 1
+        attrs = dict(attrs)
+        for name, selector in self.selectors.items():
+            if name in self.results or any(c[0] == name for c in self.open):
+                continue
+            if self._matches(tag, attrs, selector):
+                self.open.append([name, self.depth, []])
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS:
+            return
+        if tag in BLOCK_TAGS:
+            for capture in self.open:
+                capture[2].append('\n')
+        for capture in [c for c in self.open if c[1] == self.depth]:
+            self.results[capture[0]] = ''.join(capture[2])
+            self.open.remove(capture)
+        self.depth = max(self.depth - 1, 0)
+
+    def handle_data(self, data):
+        for capture in self.open:
+            capture[2].append(data)
+
+
+def select_text(html: str, selectors: dict):
+    # Stops reading once every selector has been captured; the rest of a full
+    # page is usually scripts and footers
+    parser = ElementTextParser(selectors)
+    try:
+        for start in range(0, len(html), FEED_CHUNK):
+            parser.feed(html[start:start + FEED_CHUNK])
+            if len(parser.results) == len(selectors):
+                break
+        else:
+            parser.close()
+    except Exception as e:
+        logger.error(f"Error parsing page html: {e}")
+    for name, depth, chunks in parser.open:
+        parser.results.setdefault(name, ''.join(chunks))
+    return {name: clean_text(text) for name, text in parser.results.items()}
+
+
+def clean_text(text: str):
+    lines = [re.sub(r'\s+', ' ', line).strip() for line in text.splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+def html_to_text(html: str):
+    return select_text(f"<div data-root='1'>{html}</div>", {'root': (None, 'data-root', '1')}).get('root', '')
+
+
+def description_points(text: str):
+    points = []
+    for line in text.splitlines():
+        line = line.strip(' \t-•*·')
+        if len(line) < 3:
+            continue
+        points.append(line)
+        if len(points) == MAX_DESCRIPTION_POINTS:
+            break
+    return points
+
+
+def job_result(title: str, company: str, description: str):
+    return {
+        "job_title": title.strip(),
+        "company_name": company.strip(),
+        "job_description": description_points(description),
+        "status": "New",
+        "notes": "",
+    }
+
+
+def confidence_for(title: str, company: str, description: str, company_guessed: bool = False):
+    # Without a description the score stays below the default 0.8 threshold;
+    # a company guessed from the URL counts for less than one read from the page
+    score = 0.0
+    if title:
+        score += 0.35
+    if company:
+        score += 0.15 if company_guessed else 0.35
+    if description:
+        score += 0.3
+    return round(score, 2)
+
+
+def name_from_slug(slug: str):
+    # "acme-robotics" -> "Acme Robotics"
+    return " ".join(word.capitalize() for word in re.split(r'[-_]+', slug) if word)
+
+
+class JsonLdExtractor:
+    # schema.org JobPosting blocks, which most ATS and many boards embed for search engines
+    name = 'json_ld'
+
+    def _postings(self, node):
+        if isinstance(node, list):
+            for item in node:
+                yield from self._postings(item)
+        elif isinstance(node, dict):
+            types = node.get('@type')
+            types = types if isinstance(types, list) else [types]
+            if 'JobPosting' in types:
+                yield node
+            if '@graph' in node:
+                yield from self._postings(node['@graph'])
+
+    def extract(self, page: dict):
+        for block in page.get('json_ld') or []:
+            try:
+                data = json.loads(block) if isinstance(block, str) else block
+            except json.JSONDecodeError:
+                continue
+            for posting in self._postings(data):
+                title = posting.get('title') or ''
+                organization = posting.get('hiringOrganization') or ''
+                company = organization.get('name', '') if isinstance(organization, dict) else str(organization)
+                description = html_to_text(posting.get('description') or '')
+                return job_result(title, company, description), confidence_for(title, company, description)
+        return None, 0.0
+
+
+class LayoutExtractor:
+    # Boards with stable markup: match on the host, then read fixed elements
+    name = ''
+    hosts = ()
+    selectors = {}
+
+    def matches(self, url: str):
+        host = urlparse(url or '').netloc.lower()
+        return any(host == h or host.endswith('.' + h) for h in self.hosts)
+
+    def company_from_url(self, url: str):
+        return ''
+
+    def extract(self, page: dict):
+        url = page.get('url') or ''
+        html = page.get('html') or ''
+        if not html or not self.matches(url):
+            return None, 0.0
+        found = select_text(html, self.selectors)
+        title = found.get('title', '').split('\n')[0]
+        company = found.get('company', '').split('\n')[0]
+        guessed = not company
+        if guessed:
+            company = name_from_slug(self.company_from_url(url))
+        description = found.get('description', '')
+        return job_result(title, company, description), confidence_for(title, company, description, guessed)
+
+
+class LinkedInExtractor(LayoutExtractor):
+    name = 'linkedin'
+    hosts = ('linkedin.com',)
+    selectors = {
+        'title': (None, 'class', 'job-details-jobs-unified-top-card__job-title'),
+        'company': (None, 'class', 'job-details-jobs-unified-top-card__company-name'),
+        'description': (None, 'id', 'job-details'),
+    }
+
+
+class GreenhouseExtractor(LayoutExtractor):
+    name = 'greenhouse'
+    hosts = ('greenhouse.io',)
+    selectors = {
+        'title': ('h1', 'class', 'app-title'),
+        'company': (None, 'class', 'company-name'),
+        'description': ('div', 'id', 'content'),
+    }
+
+    def company_from_url(self, url: str):
+        # boards.greenhouse.io/<company>/jobs/<id>
+        parts = urlparse(url).path.strip('/').split('/')
+        return parts[0] if parts and parts[0] else ''
+
+
+class LeverExtractor(LayoutExtractor):
+    name = 'lever'
+    hosts = ('lever.co',)
+    selectors = {
+        'title': ('div', 'class', 'posting-headline'),
+        'description': (None, 'data-qa', 'job-description'),
+    }
+
+    def company_from_url(self, url: str):
+        # jobs.lever.co/<company>/<id>
+        parts = urlparse(url).path.strip('/').split('/')
+        return parts[0] if parts and parts[0] else ''
+
+
+class WorkdayExtractor(LayoutExtractor):
+    name = 'workday'
+    hosts = ('myworkdayjobs.com',)
+    selectors = {
+        'title': (None, 'data-automation-id', 'jobPostingHeader'),
+        'description': (None, 'data-automation-id', 'jobPostingDescription'),
+    }
+
+    def company_from_url(self, url: str):
+        # <company>.wd5.myworkdayjobs.com
+        return urlparse(url).netloc.split('.')[0]
+
+
+class ExtractorRegistry:
+    # Runs registered extractors in order and returns the first confident result.
+    # Results have the same shape as Server.jsonResult.
+    def __init__(self, min_confidence: float = 0.8):
+        self.min_confidence = min_confidence
+        self.extractors = []
+        self.lock = threading.Lock()
+        self.attempts = {}
+        self.hits = {}
+
+    def register(self, extractor):
+        self.extractors.append(extractor)
+        self.attempts[extractor.name] = 0
+        self.hits[extractor.name] = 0
+        return extractor
+
+    def extract(self, page: dict, min_confidence: float = None):
+        # Returns (result, confidence), or (None, 0.0) when nothing is confident enough.
+        # min_confidence overrides the registry threshold, e.g. for a fallback when the LLM is down
+        threshold = self.min_confidence if min_confidence is None else min_confidence
+        for extractor in self.extractors:
+            try:
+                result, confidence = extractor.extract(page)
+            except Exception as e:
+                logger.error(f"Extractor {extractor.name} failed: {e}")
+                result, confidence = None, 0.0
+            with self.lock:
+                self.attempts[extractor.name] += 1
+                if result and confidence >= threshold:
+                    self.hits[extractor.name] += 1
+            if result and confidence >= threshold:
+                logger.info(f"Fast-path extraction by {extractor.name} (confidence {confidence:.2f})")
+                return result, confidence
+        return None, 0.0
+
+    def stats(self):
+        with self.lock:
+            return {
+                name: {
+                    'attempts': self.attempts[name],
+                    'hits': self.hits[name],
+                    'hit_rate': self.hits[name] / self.attempts[name] if self.attempts[name] else 0.0,
+                }
+                for name in self.attempts
+            }
+
+
+def default_registry(min_confidence: float = 0.8):
+    registry = ExtractorRegistry(min_confidence)
+    registry.register(JsonLdExtractor())
+    registry.register(LinkedInExtractor())
+    registry.register(GreenhouseExtractor())
+    registry.register(LeverExtractor())
+    registry.register(WorkdayExtractor())
+    return registry
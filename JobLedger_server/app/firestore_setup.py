@@ -1,12 +1,63 @@
 import datetime
-import firebase_admin
-from google.cloud import firestore
-from firebase_admin import credentials
+import logging
 import os.path
 import json
+import threading
+import time
+from collections import OrderedDict
+from resilience import guarded
+
+logger = logging.getLogger(__name__)
+
+class UserCache:
+    # Bounded TTL cache of user documents, keyed by email
+    def __init__(self, max_size=1024, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_email):
+        with self.lock:
+            entry = self.entries.get(user_email)
+            if entry and time.time() - entry[1] <= self.ttl:
+                self.entries.move_to_end(user_email)
+                self.hits += 1
+                return dict(entry[0])
+            if entry:
+                del self.entries[user_email]
+            self.misses += 1
+            return None
+
+    def put(self, user_email, user_data: dict):
+        with self.lock:
+            self.entries[user_email] = (dict(user_data), time.time())
+            self.entries.move_to_end(user_email)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_email):
+        with self.lock:
+            self.entries.pop(user_email, None)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
 
 class database:
-    def __init__(self):
+    def __init__(self, cache_size=1024, cache_ttl=300, listen=False):
+        # Imported here so importing this module stays cheap at startup
+        import firebase_admin
+        from firebase_admin import credentials
+        from google.cloud import firestore
+
         try:
             # Check if the app is already initialized
             firebase_admin.get_app()
@@ -27,44 +78,205 @@ class database:
         # Get Firestore client
         self.db =  firestore.Client()
 
-    def get_user_info(self, user_email):
-        user_ref = self.db.collection('users_info').document(user_email)
-        user_doc = user_ref.get()
+        self.user_cache = UserCache(cache_size, cache_ttl)
+        self.user_watch = None
+        if listen:
+            self.watch_users()
+
+    def watch_users(self):
+        # Keep the user cache in step with writes made by other instances
+        def on_snapshot(docs, changes, read_time):
+            for change in changes:
+                user_email = change.document.id
+                if change.type.name == 'REMOVED':
+                    self.user_cache.invalidate(user_email)
+                else:
+                    self.user_cache.put(user_email, change.document.to_dict())
+
+        self.user_watch = self.db.collection('users_info').on_snapshot(on_snapshot)
+
+    def get_user_info(self, user_email, use_cache=True):
+        cached = self.user_cache.get(user_email) if use_cache else None
+        if cached:
+            return cached
+
+        user_doc = self._get_user_doc(user_email)
 
         if user_doc.exists:
-            return user_doc.to_dict()  # Returns a dictionary of user data
+            user_data = user_doc.to_dict()  # Returns a dictionary of user data
+            self.user_cache.put(user_email, user_data)
+            return user_data
         else:
-            print(f"No data found for user: {user_email}")
+            logger.info(f"No data found for user: {user_email}")
             return None
 
-    def add_user_to_firestore(self, user_email, sheet_link):
-        date = datetime.datetime.now()
-        # Reference to the 'users' collection
-        user_ref = self.db.collection('users_info').document(user_email)  # You can use the user's email as the document ID or another unique identifier
+    @guarded('firestore', 'get_user_info', retry=False)
+    def _get_user_doc(self, user_email):
+        return self.db.collection('users_info').document(user_email).get()
 
-        # Data to store in the document
-        user_data = {
+    def _user_data(self, user_email, sheet_link, sheet_format_version=None):
+        return {
             'user_email': user_email,
             'sheet_link': sheet_link,
-            'subscription_date': date,
+            'subscription_date': datetime.datetime.now(),
+            'sheet_format_version': sheet_format_version,
         }
 
+    @guarded('firestore', retry=False)
+    def add_user_to_firestore(self, user_email, sheet_link, sheet_format_version=None):
+        # Reference to the 'users' collection
+        user_ref = self.db.collection('users_info').document(user_email)  # You can use the user's email as the document ID or another unique identifier
+
+        # Data to store in the document
+        user_data = self._user_data(user_email, sheet_link, sheet_format_version)
+
         # Add data to the Firestore document
         user_ref.set(user_data)
-        print(f"User {user_email} has been added to Firestore.")
+        self.user_cache.invalidate(user_email)
+        logger.info(f"User {user_email} has been added to Firestore.")
 
+    @guarded('firestore', retry=False)
     def delete_user_from_firestore(self, user_email):
         # Reference to the document in the 'users' collection
         user_ref = self.db.collection('users_info').document(user_email)
 
         # Delete the document
         user_ref.delete()
-        print(f"User with ID {user_email} has been deleted from Firestore.")
+        self.user_cache.invalidate(user_email)
+        logger.info(f"User with ID {user_email} has been deleted from Firestore.")
 
+    @guarded('firestore', retry=False)
     def update_user_info(self, user_email, updated_data: dict):
         user_ref = self.db.collection('users_info').document(user_email)
         user_ref.update(updated_data)
-        print(f"User {user_email} has been updated.")
+        self.user_cache.invalidate(user_email)
+        logger.info(f"User {user_email} has been updated.")
+
+    def list_users(self):
+        # Streams every user document as a dictionary
+        for doc in self.db.collection('users_info').stream():
+            yield doc.to_dict()
+
+    @guarded('firestore', retry=False)
+    def acquire_sheet_lease(self, user_email, owner, ttl):
+        # Returns (sheet_link, acquired). Only the lease holder may create a sheet
+        # for the user; everyone else waits for sheet_link to appear.
+        user_ref = self.db.collection('users_info').document(user_email)
+        lease_ref = self.db.collection('sheet_leases').document(user_email)
+
+        from google.cloud import firestore
+
+        @firestore.transactional
+        def acquire(transaction):
+            user_doc = user_ref.get(transaction=transaction)
+            if user_doc.exists and (user_doc.to_dict() or {}).get('sheet_link'):
+                return user_doc.to_dict()['sheet_link'], False
+
+            now = time.time()
+            lease_doc = lease_ref.get(transaction=transaction)
+            if lease_doc.exists:
+                lease = lease_doc.to_dict()
+                if lease['owner'] != owner and lease['expires_at'] > now:
+                    return None, False
+
+            transaction.set(lease_ref, {'owner': owner, 'expires_at': now + ttl})
+            return None, True
+
+        return acquire(self.db.transaction())
+
+    @guarded('firestore', retry=False)
+    def release_sheet_lease(self, user_email):
+        self.db.collection('sheet_leases').document(user_email).delete()
+
+    @guarded('firestore', retry=False)
+    def add_spare_sheet(self, spreadsheet_id, sheet_link, sheet_format_version=None):
+        self.db.collection('spare_sheets').document(spreadsheet_id).set({
+            'sheet_link': sheet_link,
+            'sheet_format_version': sheet_format_version,
+            'created_at': time.time(),
+        })
+
+    @guarded('firestore', retry=False)
+    def count_spare_sheets(self):
+        return int(self.db.collection('spare_sheets').count().get()[0][0].value)
+
+    @guarded('firestore', retry=False)
+    def claim_spare_sheet(self, user_email):
+        # Hands a pre-created sheet to the user in a single transaction.
+        # Returns the spare sheet data, or None when the pool is empty.
+        user_ref = self.db.collection('users_info').document(user_email)
+        spares = self.db.collection('spare_sheets').limit(1)
+
+        from google.cloud import firestore
+
+        @firestore.transactional
+        def claim(transaction):
+            found = list(spares.get(transaction=transaction))
+            if not found:
+                return None
+            spare = found[0].to_dict()
+            transaction.delete(found[0].reference)
+            transaction.set(user_ref, self._user_data(user_email, spare['sheet_link'], spare['sheet_format_version']))
+            return spare
+
+        spare = claim(self.db.transaction())
+        self.user_cache.invalidate(user_email)
+        if spare:
+            logger.info(f"Spare sheet {spare['sheet_link']} assigned to {user_email}")
+        return spare
+
+    @guarded('firestore', retry=False)
+    def get_cached_extraction(self, key):
+        doc = self.db.collection('extraction_cache').document(key).get()
+        if doc.exists:
+            return doc.to_dict()
+        return None
+
+    @guarded('firestore', retry=False)
+    def set_cached_extraction(self, key, result: dict, created_at: float):
+        self.db.collection('extraction_cache').document(key).set({
+            'result': result,
+            'created_at': created_at,
+        })
+
+    @guarded('firestore', retry=False)
+    def delete_cached_extraction(self, key):
+        self.db.collection('extraction_cache').document(key).delete()
+
+    @guarded('firestore', retry=False)
+    def delete_expired_extractions(self, cutoff: float):
+        expired = self.db.collection('extraction_cache').where('created_at', '<', cutoff).stream()
+        for doc in expired:
+            doc.reference.delete()
+
+    @guarded('firestore', retry=False)
+    def trim_extractions(self, max_docs: int):
+        # Deletes the oldest cached extractions beyond max_docs
+        collection = self.db.collection('extraction_cache')
+        excess = int(collection.count().get()[0][0].value) - max_docs
+        if excess <= 0:
+            return
+        from google.cloud import firestore
+        oldest = collection.order_by('created_at', direction=firestore.Query.ASCENDING).limit(excess).stream()
+        for doc in oldest:
+            doc.reference.delete()
+
+    @guarded('firestore', retry=False)
+    def set_descriptions(self, documents: dict):
+        # Full job descriptions keyed by row ID; a write batch holds at most 500 writes
+        keys = list(documents)
+        for start in range(0, len(keys), 500):
+            batch = self.db.batch()
+            for key in keys[start:start + 500]:
+                batch.set(self.db.collection('job_descriptions').document(key), documents[key])
+            batch.commit()
+
+    @guarded('firestore', retry=False)
+    def get_description(self, key):
+        doc = self.db.collection('job_descriptions').document(key).get()
+        if doc.exists:
+            return doc.to_dict()
+        return None
 
 
 
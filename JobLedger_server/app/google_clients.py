@@ -0,0 +1,98 @@
+import json
+import threading
+import httplib2
+import google_auth_httplib2
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.http import HttpRequest
+from instrumentation import span
+from resilience import bounded_timeout, outbound
+
+# Discovery documents ship inside google-api-python-client, so building a
+# client never has to fetch one over the network
+API_VERSIONS = {'sheets': 'v4', 'drive': 'v3'}
+
+
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE')
+
+
+def bound_timeout(http):
+    # Caps the next call at what's left of the request deadline. httplib2 only
+    # reads Http.timeout when it opens a connection, so sockets kept alive from
+    # earlier calls get the new timeout too.
+    transport = getattr(http, 'http', http)
+    default = getattr(transport, 'default_timeout', None)
+    if default is None:
+        return
+    timeout = bounded_timeout(default)
+    transport.timeout = timeout
+    for connection in transport.connections.values():
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+
+
+class InstrumentedHttpRequest(HttpRequest):
+    # Every execute() goes through the shared outbound layer (circuit breaker,
+    # retries, deadline) and is timed as a span named after the API method,
+    # e.g. sheets.spreadsheets.values.append
+    def execute(self, http=None, num_retries=0):
+        dependency = (self.methodId or 'google').split('.')[0]
+
+        def attempt():
+            bound_timeout(http or self.http)
+            with span(dependency, self.methodId or 'request'):
+                return HttpRequest.execute(self, http=http, num_retries=num_retries)
+        return outbound.call(dependency, attempt, idempotent=self.method in IDEMPOTENT_METHODS)
+
+
+class GoogleClientPool:
+    # httplib2 transports are not thread-safe, so every thread gets its own
+    # Sheets/Drive clients. The discovery documents are parsed once and shared,
+    # and each thread's Http object keeps its connections alive between calls.
+    def __init__(self, credentials, timeout: float = 60):
+        self.credentials = credentials
+        self.timeout = timeout
+        self.documents = {}
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.created = 0
+
+    def _document(self, name: str):
+        with self.lock:
+            if name not in self.documents:
+                document = get_static_doc(name, API_VERSIONS[name])
+                if document is None:
+                    raise RuntimeError(f"No bundled discovery document for {name} {API_VERSIONS[name]}")
+                self.documents[name] = json.loads(document)
+            return self.documents[name]
+
+    def _client(self, name: str):
+        clients = getattr(self.local, 'clients', None)
+        if clients is None:
+            clients = self.local.clients = {}
+            transport = httplib2.Http(timeout=self.timeout)
+            # What bound_timeout caps at when the request has time to spare
+            transport.default_timeout = self.timeout
+            self.local.http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=transport)
+
+        if name not in clients:
+            clients[name] = build_from_document(
+                self._document(name),
+                http=self.local.http,
+                requestBuilder=InstrumentedHttpRequest
+            )
+            with self.lock:
+                self.created += 1
+        return clients[name]
+
+    def warm(self):
+        # Parses the discovery documents and builds this thread's clients
+        for name in API_VERSIONS:
+            self._client(name)
+
+    def sheets(self):
+        return self._client('sheets')
+
+    def drive(self):
+        return self._client('drive')
@@ -0,0 +1,37 @@
+# gunicorn settings for the multi-process serving mode:
+#   gunicorn -c gunicorn.conf.py app:app
+# The master imports app.py once (preload_app) so workers share its code pages.
+# Clients, threads and warm-up are started per worker after fork; on SIGTERM
+# each worker finishes in-flight requests, then drains queued work.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Must be set before app.py (and config) are imported by the master
+os.environ['DEFER_STARTUP'] = 'true'
+
+# Not imported as "config": gunicorn reads every top-level name here as a
+# setting, and "config" is one (the config file path)
+import config as app_config  # noqa: E402
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+workers = app_config.SERVER_WORKERS
+# Threads keep slow LLM and Google API calls from blocking a whole worker
+worker_class = 'gthread'
+threads = app_config.SERVER_THREADS
+preload_app = True
+timeout = app_config.SERVER_TIMEOUT
+graceful_timeout = app_config.SERVER_GRACEFUL_TIMEOUT
+keepalive = 5
+# app.py logs every request as JSON already
+accesslog = None
+
+
+def post_fork(server, worker):
+    import app
+    app.start(app_config.STARTUP_MODE, server.cfg.workers)
+
+
+def worker_exit(server, worker):
+    import app
+    app.shutdown()
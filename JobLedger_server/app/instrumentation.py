@@ -0,0 +1,198 @@
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Fields a log call can pass through `extra` to show up in the JSON line
+LOG_FIELDS = ('request_id', 'endpoint', 'status', 'duration', 'spans', 'dependency', 'operation',
+              'ratio', 'chars', 'tokens', 'rows', 'spreadsheet_id', 'user_email')
+
+
+class JsonFormatter(logging.Formatter):
+    # One JSON object per line, the format Cloud Logging parses from stdout
+    def format(self, record):
+        entry = {
+            'severity': record.levelname,
+            'message': record.getMessage(),
+            'logger': record.name,
+            'time': self.formatTime(record),
+        }
+        for field in LOG_FIELDS:
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        current = current_request()
+        if current and 'request_id' not in entry:
+            entry['request_id'] = current['id']
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level=logging.INFO):
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter())
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metrics:
+    # Minimal Prometheus-style registry: counters, latency histograms and
+    # gauges read from callbacks at scrape time
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.collectors = []
+        self.help = {}
+
+    def inc(self, name: str, labels: dict = None, amount: float = 1):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name: str, labels: dict, value: float):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    def describe(self, name: str, text: str):
+        self.help[name] = text
+
+    def register_collector(self, collector):
+        # collector() returns [(name, labels, value)] gauges
+        self.collectors.append(collector)
+
+    def _labels(self, labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+    def render(self):
+        lines = []
+        seen = set()
+
+        def header(name, kind):
+            if name not in seen:
+                seen.add(name)
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self.lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                header(name, 'counter')
+                lines.append(f"{name}{self._labels(labels)} {value}")
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                header(name, 'histogram')
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    lines.append(f"{name}_bucket{self._labels(labels, [('le', bound)])} {count}")
+                lines.append(f"{name}_bucket{self._labels(labels, [('le', '+Inf')])} {histogram.count}")
+                lines.append(f"{name}_sum{self._labels(labels)} {histogram.total}")
+                lines.append(f"{name}_count{self._labels(labels)} {histogram.count}")
+
+        for collector in self.collectors:
+            try:
+                gauges = collector()
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"Metrics collector failed: {e}")
+                continue
+            for name, labels, value in gauges:
+                header(name, 'gauge')
+                lines.append(f"{name}{self._labels(sorted(labels.items()))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+metrics.describe('jobledger_dependency_latency_seconds', 'Latency of outbound calls by dependency and operation')
+metrics.describe('jobledger_request_latency_seconds', 'Latency of HTTP requests by endpoint')
+metrics.describe('jobledger_dependency_errors_total', 'Failed outbound calls by dependency')
+metrics.describe('jobledger_quota_errors_total', 'Outbound calls rejected with 429 by dependency')
+
+_local = threading.local()
+
+
+def current_request():
+    return getattr(_local, 'request', None)
+
+
+def start_request(request_id: str, endpoint: str):
+    _local.request = {'id': request_id, 'endpoint': endpoint, 'start': time.perf_counter(), 'spans': []}
+    return _local.request
+
+
+def finish_request(status: int):
+    current = current_request()
+    _local.request = None
+    if not current:
+        return None
+    duration = time.perf_counter() - current['start']
+    metrics.observe('jobledger_request_latency_seconds', {'endpoint': current['endpoint']}, duration)
+    metrics.inc('jobledger_requests_total', {'endpoint': current['endpoint'], 'status': status})
+    current['duration'] = duration
+    return current
+
+
+def error_status(error):
+    # HTTP status of a failed outbound call: googleapiclient HttpError, requests/HF errors
+    status = getattr(getattr(error, 'resp', None), 'status', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status is None:
+        status = getattr(error, 'code', None)
+    return status if isinstance(status, int) else None
+
+
+@contextmanager
+def span(dependency: str, operation: str):
+    # Times one outbound call and adds it to the current request's breakdown
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        labels = {'dependency': dependency, 'operation': operation}
+        metrics.observe('jobledger_dependency_latency_seconds', labels, duration)
+        if error is not None:
+            metrics.inc('jobledger_dependency_errors_total', {'dependency': dependency})
+            if error_status(error) == 429:
+                metrics.inc('jobledger_quota_errors_total', {'dependency': dependency})
+        current = current_request()
+        if current is not None:
+            current['spans'].append({
+                'dependency': dependency,
+                'operation': operation,
+                'duration': round(duration, 4),
+                'error': type(error).__name__ if error else None,
+            })
+
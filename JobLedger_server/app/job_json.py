@@ -0,0 +1,294 @@
+import json
+import re
+
+STRING_STOP = re.compile(r'["\\]')
+STRUCTURAL = re.compile(r'[{}\[\]",:]')
+
+# Placeholder values from the prompt template; objects carrying them are prompt echoes
+TEMPLATE_VALUES = {"title of the job", "company name", "description of the job in point form"}
+
+
+def _drop_trailing_comma(out: list):
+    i = len(out) - 1
+    while i >= 0 and out[i].isspace():
+        i -= 1
+    if i >= 0 and out[i] == ',':
+        del out[i:]
+
+
+def _last_char(out: list):
+    i = len(out) - 1
+    while i >= 0 and out[i].isspace():
+        i -= 1
+    return out[i] if i >= 0 else ''
+
+
+def _close(out: list, stack: list):
+    # Terminate whatever is still open at the end of out
+    out = list(out)
+    for opener in reversed(stack):
+        _drop_trailing_comma(out)
+        if _last_char(out) == ':':
+            out.append('null')
+        out.append('}' if opener == '{' else ']')
+    return ''.join(out)
+
+
+def repair_json(text: str):
+    # Returns candidate repairs of model-written JSON, best first: trailing commas
+    # dropped, raw newlines escaped in strings, missing ']' inserted before '}',
+    # and anything left open at the end closed. Later candidates cut the
+    # text back to earlier commas in case it ends mid key/value pair.
+    out = []
+    stack = []
+    commas = []  # (position in out, open containers) for each comma outside strings
+    in_string = False
+    escape = False
+    for char in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+            elif char == '\n':
+                char = '\\n'
+            out.append(char)
+            continue
+
+        if char == '"':
+            in_string = True
+            out.append(char)
+        elif char in '{[':
+            stack.append(char)
+            out.append(char)
+        elif char in '}]':
+            _drop_trailing_comma(out)
+            if char == '}':
+                # Arrays the model forgot to close
+                while stack and stack[-1] == '[':
+                    stack.pop()
+                    out.append(']')
+            if stack and (stack[-1] == '{') == (char == '}'):
+                stack.pop()
+                out.append(char)
+            # Anything else is a stray closer and is dropped
+        else:
+            if char == ',':
+                commas.append((len(out), list(stack)))
+            out.append(char)
+
+    if in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+
+    candidates = [_close(out, stack)]
+    for position, open_containers in reversed(commas[-3:]):
+        candidates.append(_close(out[:position], open_containers))
+    return candidates
+
+
+def parse_loose(text: str):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    for candidate in repair_json(text):
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def extract_last_job_object(text: str, required_key: str = 'job_title', max_restarts: int = 5):
+    # Single pass over the model output; returns the last complete job object,
+    # or a trailing one that was cut off before it was closed if none completed
+    detector = JobObjectDetector(required_key=required_key)
+    found = detector.feed(text)
+    if found:
+        return found[-1]
+
+    # An unbalanced '{"' in echoed page text can swallow the real object; rescan
+    # from the last few places a job object could start
+    starts = [m.start() for m in re.finditer(r'\{\s*"' + re.escape(required_key) + '"', text)]
+    trailing = detector.pending_object()
+    for start in reversed(starts[-max_restarts:]):
+        restarted = JobObjectDetector(required_key=required_key)
+        found = restarted.feed(text[start:])
+        if found:
+            return found[-1]
+        trailing = trailing or restarted.pending_object()
+    return trailing
+
+
+class JobObjectDetector:
+    # Scans model output as it streams in, one character at a time, and
+    # reports each complete top-level JSON object that holds a job.
+    # Fields are reported through on_partial as soon as their strings close.
+    def __init__(self, on_partial=None, required_key: str = 'job_title'):
+        self.on_partial = on_partial
+        self.required_key = required_key
+        self.stack = []
+        self.buffer = []
+        self.opening = None  # '{' plus whitespace, until we see whether a key follows
+        self.in_string = False
+        self.escape = False
+        self.string_start = 0
+        self.key = None
+        self.after_colon = False
+        self.partial = {}
+
+    @property
+    def depth(self):
+        return len(self.stack)
+
+    def _start_object(self):
+        self.buffer = ['{']
+        self.stack = ['{']
+        self.key = None
+        self.after_colon = False
+        self.partial = {}
+
+    def _string_closed(self):
+        # Keys and values are only tracked for partial reporting
+        if not self.on_partial:
+            return
+        try:
+            value = json.loads(''.join(self.buffer[self.string_start:]))
+        except json.JSONDecodeError:
+            return
+
+        if self.depth == 1:
+            if not self.after_colon:
+                self.key = value
+                return
+            if value in TEMPLATE_VALUES:
+                return
+            self.partial[self.key] = value
+        elif self.depth == 2 and self.key and self.after_colon:
+            if value in TEMPLATE_VALUES:
+                return
+            self.partial.setdefault(self.key, [])
+            if isinstance(self.partial[self.key], list):
+                self.partial[self.key].append(value)
+        else:
+            return
+
+        if self.on_partial and self.required_key in self.partial:
+            self.on_partial(dict(self.partial))
+
+    def _job_object(self, text: str):
+        parsed = parse_loose(text)
+        if not isinstance(parsed, dict) or self.required_key not in parsed:
+            return None
+        if parsed[self.required_key] in TEMPLATE_VALUES:
+            return None
+        return parsed
+
+    def _finish_object(self):
+        parsed = self._job_object(''.join(self.buffer))
+        self.buffer = []
+        return parsed
+
+    def pending_object(self):
+        # The object still being written, repaired as if the output stopped here
+        if not self.depth:
+            return None
+        return self._job_object(''.join(self.buffer))
+
+    def feed(self, chunk: str):
+        # Returns the job objects completed by this chunk. Runs of plain text
+        # are skipped with str.find/regex searches rather than char by char.
+        completed = []
+        i = 0
+        while i < len(chunk):
+            if not self.stack:
+                if self.opening is None:
+                    i = chunk.find('{', i)
+                    if i == -1:
+                        break
+                    self.opening = ['{']
+                    i += 1
+                    continue
+                # Only '{' followed by a key opens an object, so stray braces in
+                # echoed page text ("{ brace here. Output: {...}") are skipped
+                char = chunk[i]
+                if char.isspace():
+                    self.opening.append(char)
+                    i += 1
+                    continue
+                opening = self.opening
+                self.opening = None
+                if char == '"':
+                    self._start_object()
+                    self.buffer = opening
+                # Either way, char is scanned again in the new state
+                continue
+
+            if self.in_string:
+                if self.escape:
+                    self.buffer.append(chunk[i])
+                    self.escape = False
+                    i += 1
+                    continue
+                match = STRING_STOP.search(chunk, i)
+                if not match:
+                    self.buffer.append(chunk[i:])
+                    break
+                j = match.start()
+                self.buffer.append(chunk[i:j + 1])
+                i = j + 1
+                if chunk[j] == '\\':
+                    self.escape = True
+                else:
+                    self.in_string = False
+                    self._string_closed()
+                continue
+
+            match = STRUCTURAL.search(chunk, i)
+            if not match:
+                self.buffer.append(chunk[i:])
+                break
+            j = match.start()
+            if j > i:
+                self.buffer.append(chunk[i:j])
+            char = chunk[j]
+            i = j + 1
+            self.buffer.append(char)
+
+            if char == '"':
+                self.in_string = True
+                self.string_start = len(self.buffer) - 1
+            elif char == '{' and self.depth == 1 and not self.after_colon:
+                # A new object where a key should be: the previous one was abandoned
+                self._start_object()
+            elif char in '{[':
+                self.stack.append(char)
+            elif char in '}]':
+                if char == '}':
+                    # Close arrays the model left open so the object still parses
+                    missing = 0
+                    while self.stack[-1] == '[':
+                        self.stack.pop()
+                        missing += 1
+                    if missing:
+                        self.buffer[-1:] = [']'] * missing + ['}']
+                elif self.stack[-1] != '[':
+                    # Stray ']' inside an object
+                    self.buffer.pop()
+                    continue
+                self.stack.pop()
+                if not self.stack:
+                    parsed = self._finish_object()
+                    if parsed:
+                        completed.append(parsed)
+            elif self.depth == 1:
+                if char == ':':
+                    self.after_colon = True
+                elif char == ',':
+                    self.after_colon = False
+                    self.key = None
+        return completed
@@ -0,0 +1,55 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Lazy:
+    # Stands in for an object that is expensive to create. The factory runs once,
+    # on first attribute access or when resolve() is called from the warm-up
+    # thread; concurrent callers wait for that single construction.
+    def __init__(self, name: str, factory):
+        self._lazy_name = name
+        self._lazy_factory = factory
+        self._lazy_lock = threading.Lock()
+        self._lazy_value = None
+        self._lazy_ready = False
+        self._lazy_error = None
+        self._lazy_seconds = None
+
+    def resolve(self):
+        if self._lazy_ready:
+            return self._lazy_value
+        with self._lazy_lock:
+            if not self._lazy_ready:
+                start = time.perf_counter()
+                try:
+                    self._lazy_value = self._lazy_factory()
+                except Exception as e:
+                    self._lazy_error = e
+                    raise
+                self._lazy_seconds = time.perf_counter() - start
+                self._lazy_error = None
+                self._lazy_ready = True
+                logger.info(
+                    f"{self._lazy_name} initialized in {self._lazy_seconds:.2f}s",
+                    extra={'duration': self._lazy_seconds}
+                )
+        return self._lazy_value
+
+    def is_ready(self):
+        return self._lazy_ready
+
+    def init_status(self):
+        return {
+            'ready': self._lazy_ready,
+            'seconds': self._lazy_seconds,
+            'error': str(self._lazy_error) if self._lazy_error else None,
+        }
+
+    def __getattr__(self, name):
+        # Only reached for attributes the proxy itself doesn't have
+        if name.startswith('_lazy_'):
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
@@ -0,0 +1,225 @@
+import copy
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from resilience import bounded_timeout
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBackend:
+    # Interface behind Server.call_llm. generate() returns the raw model text,
+    # stream() yields it token by token and generate_batch() handles several
+    # prompts at once (one at a time unless the backend can do better).
+    name = ''
+
+    def warm(self):
+        pass
+
+    def generate(self, prompt: str, max_new_tokens: int):
+        raise NotImplementedError
+
+    def stream(self, prompt: str, max_new_tokens: int):
+        yield self.generate(prompt, max_new_tokens)
+
+    def generate_batch(self, prompts: list, max_new_tokens: int):
+        return [self.generate(prompt, max_new_tokens) for prompt in prompts]
+
+
+class HFInferenceBackend(LLMBackend):
+    # Remote Hugging Face Inference API
+    name = 'hf'
+
+    def __init__(self, model: str, api_key: str, timeout: float = 60):
+        from huggingface_hub import InferenceClient
+        self.client = InferenceClient(model=model, api_key=api_key, timeout=timeout)
+        self.timeout = timeout
+        # TGI endpoints reject list inputs; cleared on the first 4xx for a batch
+        self.batch_supported = True
+
+    def _client(self):
+        # A call may not outlive the calling thread's request deadline; the shared
+        # client is copied rather than changed since other threads use it too
+        timeout = bounded_timeout(self.timeout)
+        if timeout >= self.timeout:
+            return self.client
+        client = copy.copy(self.client)
+        client.timeout = timeout
+        return client
+
+    def generate(self, prompt: str, max_new_tokens: int):
+        response = self._client().post(
+            json={
+                "inputs": prompt,
+                "task": "text-generation",
+                "parameters": {"max_new_tokens": max_new_tokens},
+            },
+        )
+        return json.loads(response.decode())[0]["generated_text"]
+
+    def stream(self, prompt: str, max_new_tokens: int):
+        yield from self._client().text_generation(prompt, max_new_tokens=max_new_tokens, stream=True)
+
+    def _generate_each(self, prompts: list, max_new_tokens: int):
+        # Remote calls, so they run side by side rather than one after another
+        if len(prompts) == 1:
+            return [self.generate(prompts[0], max_new_tokens)]
+        with ThreadPoolExecutor(max_workers=len(prompts), thread_name_prefix="hf-prompt") as pool:
+            return list(pool.map(lambda prompt: self.generate(prompt, max_new_tokens), prompts))
+
+    def generate_batch(self, prompts: list, max_new_tokens: int):
+        # The serverless text-generation task accepts a list of inputs, so a batch
+        # costs one request; models served by TGI don't, and get one call per prompt
+        if len(prompts) == 1 or not self.batch_supported:
+            return self._generate_each(prompts, max_new_tokens)
+        from requests import HTTPError
+        try:
+            response = json.loads(self._client().post(
+                json={
+                    "inputs": prompts,
+                    "task": "text-generation",
+                    "parameters": {"max_new_tokens": max_new_tokens},
+                },
+            ).decode())
+        except HTTPError as e:
+            status = getattr(e.response, 'status_code', None)
+            if status is None or not 400 <= status < 500 or status == 429:
+                raise
+            logger.warning(f"Batched inputs rejected with {status}, sending prompts one at a time")
+            self.batch_supported = False
+            return self._generate_each(prompts, max_new_tokens)
+        if not isinstance(response, list) or len(response) != len(prompts):
+            logger.warning("Unexpected batched response, retrying prompts one at a time")
+            return self._generate_each(prompts, max_new_tokens)
+        return [(item[0] if isinstance(item, list) else item)["generated_text"] for item in response]
+
+
+class LlamaCppBackend(LLMBackend):
+    # CPU inference of a quantized GGUF instruct model through llama-cpp-python.
+    # A llama.cpp context serves one sequence at a time, so calls are serialized.
+    name = 'llamacpp'
+
+    def __init__(self, model_path: str, n_ctx: int = 4096, n_threads: int = None):
+        self.model_path = model_path
+        self.n_ctx = n_ctx
+        self.n_threads = n_threads
+        self.model = None
+        self.lock = threading.Lock()
+
+    def warm(self):
+        with self.lock:
+            if self.model is None:
+                try:
+                    from llama_cpp import Llama
+                except ImportError:
+                    raise ImportError("LLM_BACKEND=llamacpp requires the llama-cpp-python package")
+                start = time.perf_counter()
+                self.model = Llama(
+                    model_path=self.model_path,
+                    n_ctx=self.n_ctx,
+                    n_threads=self.n_threads,
+                    verbose=False
+                )
+                # Touch the weights so the first real request doesn't pay for page-in
+                self.model("Hello", max_tokens=1)
+                logger.info(f"Loaded {self.model_path} in {time.perf_counter() - start:.1f}s")
+
+    def generate(self, prompt: str, max_new_tokens: int):
+        self.warm()
+        with self.lock:
+            output = self.model(prompt, max_tokens=max_new_tokens, echo=False)
+        return output["choices"][0]["text"]
+
+    def stream(self, prompt: str, max_new_tokens: int):
+        self.warm()
+        with self.lock:
+            for chunk in self.model(prompt, max_tokens=max_new_tokens, echo=False, stream=True):
+                yield chunk["choices"][0]["text"]
+
+
+class OnnxBackend(LLMBackend):
+    # CPU inference of a small ONNX-exported instruct model through onnxruntime.
+    # Batches are padded and run through generate() together.
+    name = 'onnx'
+
+    def __init__(self, model_path: str, max_input_tokens: int = 2048):
+        self.model_path = model_path
+        self.max_input_tokens = max_input_tokens
+        self.model = None
+        self.tokenizer = None
+        self.lock = threading.Lock()
+
+    def warm(self):
+        with self.lock:
+            if self.model is None:
+                try:
+                    from optimum.onnxruntime import ORTModelForCausalLM
+                    from transformers import AutoTokenizer
+                except ImportError:
+                    raise ImportError("LLM_BACKEND=onnx requires the optimum[onnxruntime] package")
+                start = time.perf_counter()
+                self.tokenizer = AutoTokenizer.from_pretrained(self.model_path)
+                self.tokenizer.padding_side = 'left'
+                if self.tokenizer.pad_token is None:
+                    self.tokenizer.pad_token = self.tokenizer.eos_token
+                self.model = ORTModelForCausalLM.from_pretrained(self.model_path)
+                self._generate(["Hello"], 1)
+                logger.info(f"Loaded {self.model_path} in {time.perf_counter() - start:.1f}s")
+
+    def _generate(self, prompts: list, max_new_tokens: int):
+        inputs = self.tokenizer(
+            prompts,
+            return_tensors='pt',
+            padding=True,
+            truncation=True,
+            max_length=self.max_input_tokens
+        )
+        outputs = self.model.generate(**inputs, max_new_tokens=max_new_tokens, do_sample=False)
+        prompt_length = inputs['input_ids'].shape[1]
+        return self.tokenizer.batch_decode(outputs[:, prompt_length:], skip_special_tokens=True)
+
+    def generate(self, prompt: str, max_new_tokens: int):
+        return self.generate_batch([prompt], max_new_tokens)[0]
+
+    def generate_batch(self, prompts: list, max_new_tokens: int):
+        self.warm()
+        with self.lock:
+            return self._generate(prompts, max_new_tokens)
+
+
+class FakeBackend(LLMBackend):
+    # Canned responses for tests and local runs without a model
+    name = 'fake'
+
+    def __init__(self, response=None, latency: float = 0.0):
+        self.response = response or json.dumps({
+            "job_title": "Software Engineer",
+            "company_name": "Example Corp",
+            "job_description": ["Build and maintain services"]
+        })
+        self.latency = latency
+        self.prompts = []
+
+    def generate(self, prompt: str, max_new_tokens: int):
+        self.prompts.append(prompt)
+        time.sleep(self.latency)
+        return self.response(prompt) if callable(self.response) else self.response
+
+    def stream(self, prompt: str, max_new_tokens: int):
+        text = self.generate(prompt, max_new_tokens)
+        for i in range(0, len(text), 4):
+            yield text[i:i + 4]
+
+
+def load_backend(name: str, **settings):
+    if name == 'hf':
+        return HFInferenceBackend(settings['model'], settings['api_key'], settings.get('timeout', 60))
+    if name == 'llamacpp':
+        return LlamaCppBackend(settings['model_path'], settings.get('n_ctx', 4096), settings.get('n_threads'))
+    if name == 'onnx':
+        return OnnxBackend(settings['model_path'])
+    if name == 'fake':
+        return FakeBackend()
+    raise ValueError(f"Unknown LLM backend: {name}")
@@ -0,0 +1,103 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class LLMBatcher:
+    # Collects prompts that arrive within max_wait seconds of each other (up to
+    # max_batch) and sends them to batch_fn together. batch_fn takes a list of
+    # prompts and returns one result per prompt, in order. Up to workers batches
+    # run at once; while all are busy, new prompts keep joining the next batch.
+    def __init__(self, batch_fn, max_batch: int = 8, max_wait: float = 0.01, workers: int = 4):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-batch")
+        self.slots = threading.Semaphore(workers)
+        self.pending = []  # (prompt, future, submitted_at)
+        self.condition = threading.Condition()
+        self.closed = False
+        self.batches = 0
+        self.items = 0
+        self.queue_wait_total = 0.0
+        self.inference_total = 0.0
+        self.thread = threading.Thread(target=self._run, name="llm-batcher", daemon=True)
+        self.thread.start()
+
+    def submit(self, prompt: str):
+        future = Future()
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("LLM batcher is closed")
+            self.pending.append((prompt, future, time.perf_counter()))
+            self.condition.notify()
+        return future
+
+    def _take_batch(self):
+        with self.condition:
+            while not self.pending and not self.closed:
+                self.condition.wait()
+            if not self.pending:
+                return None
+            # Give other callers a moment to join the batch
+            deadline = self.pending[0][2] + self.max_wait
+            while len(self.pending) < self.max_batch and not self.closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self.condition.wait(timeout=remaining)
+            batch = self.pending[:self.max_batch]
+            del self.pending[:self.max_batch]
+            return batch
+
+    def _run(self):
+        while True:
+            self.slots.acquire()
+            batch = self._take_batch()
+            if batch is None:
+                self.slots.release()
+                return
+            self.pool.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch: list):
+        started = time.perf_counter()
+        try:
+            results = self.batch_fn([prompt for prompt, _, _ in batch])
+            error = None
+        except Exception as e:
+            results = None
+            error = e
+        finally:
+            self.slots.release()
+        inference = time.perf_counter() - started
+
+        with self.condition:
+            self.batches += 1
+            self.items += len(batch)
+            self.queue_wait_total += sum(started - submitted_at for _, _, submitted_at in batch)
+            self.inference_total += inference
+
+        for i, (_, future, _) in enumerate(batch):
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(results[i])
+
+    def close(self):
+        # Finish whatever is queued, then stop
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join()
+        self.pool.shutdown(wait=True)
+
+    def stats(self):
+        with self.condition:
+            return {
+                'batches': self.batches,
+                'items': self.items,
+                'queued': len(self.pending),
+                'avg_batch_size': self.items / self.batches if self.batches else 0.0,
+                'avg_queue_wait': self.queue_wait_total / self.items if self.items else 0.0,
+                'avg_inference_time': self.inference_total / self.batches if self.batches else 0.0,
+            }
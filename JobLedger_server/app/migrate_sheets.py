@@ -0,0 +1,49 @@
+# Brings existing users' sheets up to the current SHEET_FORMAT_VERSION.
+# Older sheets were re-formatted on every append and carry thousands of
+# duplicate conditional format rules; this removes them and applies the
+# formatting once.
+#
+# Usage: python migrate_sheets.py [--dry-run]
+import os
+import sys
+
+# Import app.py without its serving machinery (query workers, warm-up, spare
+# sheet refill) and build only the clients the migration needs
+os.environ['DEFER_STARTUP'] = 'true'
+os.environ.setdefault('LLM_WARM_ON_START', 'false')
+os.environ.setdefault('SHEETS_WRITE_MODE', 'off')
+os.environ.setdefault('APPLICATION_INDEX_RESYNC', '0')
+
+import firestore_setup  # noqa: E402
+from app import Server, SHEET_FORMAT_VERSION  # noqa: E402
+
+
+def migrate(dry_run: bool = False):
+    db = firestore_setup.database()
+    server = Server(db)
+    migrated = 0
+    failed = 0
+    for user in db.list_users():
+        sheet_link = user.get('sheet_link')
+        if not sheet_link or (user.get('sheet_format_version') or 0) >= SHEET_FORMAT_VERSION:
+            continue
+
+        user_email = user['user_email']
+        spreadsheet_id = sheet_link.split("/")[5]
+        print(f"Migrating sheet for {user_email} ({spreadsheet_id})")
+        if dry_run:
+            continue
+
+        try:
+            version = server.migrate_sheet_format(spreadsheet_id)
+            db.update_user_info(user_email, {'sheet_format_version': version})
+            migrated += 1
+        except Exception as e:
+            print(f"Error migrating sheet for {user_email}: {e}")
+            failed += 1
+
+    print(f"Migrated {migrated} sheets, {failed} failed")
+
+
+if __name__ == '__main__':
+    migrate(dry_run='--dry-run' in sys.argv)
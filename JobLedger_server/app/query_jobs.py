@@ -0,0 +1,185 @@
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class QueryJob:
+    def __init__(self, job_id: str, func, args: tuple):
+        self.id = job_id
+        self.func = func
+        self.args = args
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.queued_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.partial = None
+        self.done = threading.Event()
+
+    def set_partial(self, fields: dict):
+        self.partial = fields
+
+    def run(self):
+        # started_at first: to_dict() reads it as soon as status is running
+        self.started_at = time.time()
+        self.status = 'running'
+        try:
+            self.result = self.func(*self.args, job=self)
+            self.status = 'done'
+        except Exception as e:
+            logger.error(f"Query job {self.id} failed: {e}")
+            self.error = str(e)
+            self.status = 'failed'
+        self.finished_at = time.time()
+        self.done.set()
+
+    def updates(self, timeout: float, keep_alive: float = 10):
+        # Yields to_dict() whenever the status or partial fields change, and None
+        # after keep_alive idle seconds, until the job finishes or times out
+        deadline = self.queued_at + timeout
+        last_state = None
+        last_sent = time.time()
+        while True:
+            data = self.to_dict(timeout)
+            state = (data['status'], json.dumps(data.get('partial')))
+            if state != last_state:
+                last_state = state
+                last_sent = time.time()
+                yield data
+            elif time.time() - last_sent > keep_alive:
+                last_sent = time.time()
+                yield None
+            if data['status'] in ('done', 'failed', 'timeout') or time.time() > deadline:
+                return
+            # Short waits so streamed fields go out promptly
+            self.done.wait(timeout=0.25)
+
+    def to_dict(self, timeout: float):
+        status = self.status
+        if status == 'running' and time.time() - self.started_at > timeout:
+            status = 'timeout'
+
+        data = {
+            'job_id': self.id,
+            'status': status,
+            'timings': {
+                'queue_wait': (self.started_at or time.time()) - self.queued_at,
+                'run_time': (self.finished_at or time.time()) - self.started_at if self.started_at else None,
+            }
+        }
+        if self.status == 'done':
+            data['result'] = self.result
+        elif self.partial:
+            data['partial'] = self.partial
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+class QueryJobQueue:
+    # Bounded background worker pool for /api/query so slow LLM calls
+    # don't hold the request threads of every other endpoint.
+    # Job functions are called with the job as the `job` keyword argument.
+    def __init__(self, workers: int = 4, max_queued: int = 32, timeout: float = 90, ttl: float = 600):
+        self.workers = workers
+        self.timeout = timeout
+        self.ttl = ttl
+        self.pending = queue.Queue(maxsize=max_queued)
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.stopping = False
+        self.cancelling = False
+        self.threads = []
+
+    def start(self):
+        # Separate from __init__ so a pre-fork server can create the queue in the
+        # master and start the threads in each worker; threads don't survive fork
+        if self.threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"query-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, func, *args):
+        # Returns None when the queue is full so the caller can shed load
+        if self.stopping:
+            return None
+        self._expire()
+        job = QueryJob(uuid.uuid4().hex, func, args)
+        try:
+            self.pending.put_nowait(job)
+        except queue.Full:
+            return None
+        with self.lock:
+            self.jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def depth(self):
+        return self.pending.qsize()
+
+    def _work(self):
+        while True:
+            job = self.pending.get()
+            if job is None:
+                self.pending.task_done()
+                return
+            if self.cancelling:
+                self._cancel(job)
+                self.pending.task_done()
+                continue
+            job.run()
+            self.pending.task_done()
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        with self.lock:
+            expired = [job_id for job_id, job in self.jobs.items()
+                       if job.finished_at and job.finished_at < cutoff]
+            for job_id in expired:
+                del self.jobs[job_id]
+
+    def _cancel(self, job: QueryJob):
+        job.error = 'Server shutting down'
+        job.status = 'failed'
+        job.finished_at = time.time()
+        job.done.set()
+
+    def shutdown(self, wait: bool = True, timeout: float = None):
+        # Stop taking work, let queued jobs finish, then stop the workers. With a
+        # timeout, jobs still queued after that many seconds fail instead; a job
+        # already running can't be interrupted and is abandoned with its thread.
+        self.stopping = True
+        deadline = time.time() + timeout if timeout is not None else None
+
+        def left():
+            return None if deadline is None else max(deadline - time.time(), 0)
+
+        for _ in self.threads:
+            try:
+                self.pending.put(None, timeout=left())
+            except queue.Full:
+                break
+        if not wait:
+            return
+        for thread in self.threads:
+            thread.join(left())
+        self.cancelling = True
+        while True:
+            try:
+                job = self.pending.get_nowait()
+            except queue.Empty:
+                return
+            if job is not None:
+                self._cancel(job)
+            self.pending.task_done()
@@ -0,0 +1,256 @@
+import concurrent.futures
+import functools
+import logging
+import math
+import random
+import threading
+import time
+from contextlib import contextmanager
+from instrumentation import error_status, metrics, span
+
+logger = logging.getLogger(__name__)
+
+# Rejected before doing any work, so safe to retry even for non-idempotent calls
+QUOTA_STATUSES = (429, 503)
+TRANSIENT_STATUSES = (500, 502, 504)
+# concurrent.futures.TimeoutError only became the builtin in Python 3.11
+TIMEOUT_ERRORS = (TimeoutError, concurrent.futures.TimeoutError)
+
+BREAKER_STATES = {'closed': 0, 'half_open': 1, 'open': 2}
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class BreakerOpenError(Exception):
+    def __init__(self, dependency: str, retry_in: float):
+        super().__init__(f"{dependency} is unavailable, retry in {math.ceil(retry_in)}s")
+        self.dependency = dependency
+        self.retry_in = retry_in
+
+
+_local = threading.local()
+
+
+def set_deadline(seconds: float):
+    # Starts this thread's budget for a new request, replacing any earlier one
+    previous = getattr(_local, 'deadline', None)
+    _local.deadline = time.monotonic() + seconds
+    return previous
+
+
+def clear_deadline(previous=None):
+    _local.deadline = previous
+
+
+@contextmanager
+def deadline(seconds: float):
+    # Nested budgets never extend the one they run under
+    previous = getattr(_local, 'deadline', None)
+    _local.deadline = time.monotonic() + seconds
+    if previous is not None:
+        _local.deadline = min(_local.deadline, previous)
+    try:
+        yield
+    finally:
+        clear_deadline(previous)
+
+
+def remaining():
+    # Seconds left in this thread's budget, or None when there is no deadline
+    current = getattr(_local, 'deadline', None)
+    if current is None:
+        return None
+    return current - time.monotonic()
+
+
+def check_deadline():
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+
+
+def bounded_timeout(timeout: float):
+    # The smaller of a fixed timeout and what's left of the deadline
+    left = remaining()
+    if left is None:
+        return timeout
+    return max(min(timeout, left), 0)
+
+
+def is_failure(error):
+    # Errors that say the dependency is unhealthy. 4xx other than 429 means it answered;
+    # a spent request deadline says nothing about the dependency.
+    if isinstance(error, DeadlineExceeded):
+        return False
+    status = error_status(error)
+    return status is None or status == 429 or status >= 500
+
+
+def is_retryable(error, idempotent: bool):
+    status = error_status(error)
+    if status in QUOTA_STATUSES:
+        return True
+    if not idempotent:
+        return False
+    return status in TRANSIENT_STATUSES or isinstance(error, TIMEOUT_ERRORS + (ConnectionError,))
+
+
+def retry_after(error):
+    headers = getattr(error, 'resp', None) or getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after') or headers.get('Retry-After') or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class CircuitBreaker:
+    # Opens after failure_threshold consecutive failures and rejects calls for
+    # reset_timeout seconds; then lets one trial call through (half-open) and
+    # closes again if it succeeds.
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_running = False
+        self.rejected = 0
+        self.opened = 0
+
+    def allow(self):
+        with self.lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self.trial_running = False
+            if self.state == 'half_open' and not self.trial_running:
+                self.trial_running = True
+                return True
+            self.rejected += 1
+            return False
+
+    def retry_in(self):
+        return max(self.reset_timeout - (time.monotonic() - self.opened_at), 0)
+
+    def record_success(self):
+        with self.lock:
+            if self.state != 'closed':
+                logger.info(f"Circuit for {self.name} closed")
+            self.state = 'closed'
+            self.failures = 0
+            self.trial_running = False
+
+    def release(self):
+        # Records neither outcome, e.g. when the caller ran out of time; a
+        # half-open trial slot is freed for the next call
+        with self.lock:
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.opened += 1
+                    logger.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'times_opened': self.opened,
+                'rejected': self.rejected,
+                'retry_in': round(self.retry_in(), 1) if self.state == 'open' else 0.0,
+            }
+
+
+class Outbound:
+    # Shared wrapper for calls to HF, Sheets/Drive and Firestore: per-dependency
+    # circuit breakers, retries with full-jitter exponential backoff, and the
+    # calling thread's deadline budget.
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8,
+                 failure_threshold: int = 5, reset_timeout: float = 30):
+        self.breakers = {}
+        self.lock = threading.Lock()
+        self.configure(max_attempts, base_delay, max_delay, failure_threshold, reset_timeout)
+
+    def configure(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8,
+                  failure_threshold: int = 5, reset_timeout: float = 30):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+    def breaker(self, dependency: str):
+        with self.lock:
+            if dependency not in self.breakers:
+                self.breakers[dependency] = CircuitBreaker(dependency, self.failure_threshold, self.reset_timeout)
+            return self.breakers[dependency]
+
+    def call(self, dependency: str, func, idempotent: bool = True, retry: bool = True):
+        breaker = self.breaker(dependency)
+        attempts = self.max_attempts if retry else 1
+        for attempt in range(attempts):
+            check_deadline()
+            if not breaker.allow():
+                metrics.inc('jobledger_breaker_rejections_total', {'dependency': dependency})
+                raise BreakerOpenError(dependency, breaker.retry_in())
+            try:
+                result = func()
+            except DeadlineExceeded:
+                # The request's budget ran out mid-call; that says nothing about the dependency
+                breaker.release()
+                raise
+            except Exception as e:
+                if is_failure(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if attempt == attempts - 1 or not is_retryable(e, idempotent):
+                    raise
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                delay = max(delay, min(retry_after(e), self.max_delay))
+                left = remaining()
+                if left is not None and delay >= left:
+                    raise
+                metrics.inc('jobledger_outbound_retries_total', {'dependency': dependency})
+                logger.warning(f"{dependency} call failed ({e}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+            breaker.record_success()
+            return result
+
+    def stats(self):
+        with self.lock:
+            breakers = list(self.breakers.values())
+        return {breaker.name: breaker.stats() for breaker in breakers}
+
+
+def guarded(dependency: str, operation: str = None, idempotent: bool = True, retry: bool = True):
+    # Decorator: run the function through outbound.call, timed as a span
+    def decorator(func):
+        name = operation or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            def attempt():
+                with span(dependency, name):
+                    return func(*args, **kwargs)
+            return outbound.call(dependency, attempt, idempotent=idempotent, retry=retry)
+        return wrapper
+    return decorator
+
+
+outbound = Outbound()
+metrics.describe('jobledger_breaker_rejections_total', 'Calls rejected because the dependency circuit was open')
+metrics.describe('jobledger_outbound_retries_total', 'Retried outbound calls by dependency')
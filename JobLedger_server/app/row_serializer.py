@@ -0,0 +1,189 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# Google Sheets rejects cells longer than this
+SHEETS_CELL_LIMIT = 50000
+# Firestore documents are capped at 1MiB; leave room for the other fields
+MAX_STORED_BYTES = 900 * 1024
+
+DESCRIPTION_MODES = ('full', 'capped', 'side_store')
+
+# "1. ", "2) ", "- ", "* ", "• " prefixes added by the extension or the model
+BULLET_PREFIX = re.compile(r'^\s*(?:\d+[.)]|[-*•])\s+')
+
+
+def normalize_description(value):
+    # A list of bullet points from whatever the extension, the LLM or a bulk
+    # import sent: a list, a newline separated string, or nothing
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.splitlines()
+    elif not isinstance(value, (list, tuple)):
+        value = [value]
+
+    items = []
+    seen = set()
+    for item in value:
+        text = " ".join(BULLET_PREFIX.sub('', str(item)).split())
+        if text and text.lower() not in seen:
+            seen.add(text.lower())
+            items.append(text)
+    return items
+
+
+def cap_items(items: list, max_items: int, max_chars: int):
+    # First points that fit in max_items and max_chars; a single oversized point is truncated
+    kept = []
+    size = 0
+    for item in items[:max_items]:
+        if size + len(item) + len(kept) > max_chars:
+            if not kept:
+                kept.append(item[:max(max_chars - 1, 0)] + "…")
+            break
+        kept.append(item)
+        size += len(item)
+    return kept
+
+
+def description_key(job_data: dict, items: list):
+    # Row ID for the side store: same job and description, same document,
+    # so a retried append overwrites instead of duplicating
+    content = json.dumps([job_data.get('company_name') or '', job_data.get('job_title') or '', items])
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:32]
+
+
+def compress_items(items: list):
+    return zlib.compress(json.dumps(items).encode('utf-8'))
+
+
+def decompress_items(data: bytes):
+    return json.loads(zlib.decompress(data).decode('utf-8'))
+
+
+class FirestoreDescriptionStore:
+    # Full descriptions in a collection managed by firestore_setup.database
+    def __init__(self, db):
+        self.db = db
+
+    def put_many(self, documents: dict):
+        self.db.set_descriptions(documents)
+
+    def get(self, key: str):
+        doc = self.db.get_description(key)
+        if not doc:
+            return None
+        return dict(doc, description=decompress_items(doc['data']))
+
+
+class RowSerializer:
+    # Turns job_data into a sheet row. Descriptions are normalized into one
+    # point per line and, unless mode is "full", capped so sheet cells (and every
+    # read, render and append of them) stay small. In "side_store" mode the full
+    # description is saved compressed under a row ID and the cell ends with a link.
+    def __init__(self, mode: str = 'full', max_items: int = 8, max_chars: int = 1000,
+                 store=None, link_base: str = ''):
+        if mode not in DESCRIPTION_MODES:
+            raise ValueError(f"Unknown description mode: {mode}")
+        if mode == 'side_store' and store is None:
+            # Capping without somewhere to keep the rest would drop it
+            logger.warning("No description store available, writing full descriptions")
+            mode = 'full'
+        self.mode = mode
+        self.max_items = max_items
+        self.max_chars = max_chars
+        self.store = store if mode == 'side_store' else None
+        self.link_base = link_base.rstrip('/')
+        if self.store and not self.link_base:
+            logger.warning("DESCRIPTION_LINK_BASE is not set, sheet cells will only name the description ID")
+        self.lock = threading.Lock()
+        self.capped = 0
+        self.stored = 0
+        self.store_errors = 0
+
+    def link(self, key: str):
+        if self.link_base:
+            return f"{self.link_base}/api/descriptions/{key}"
+        return f"description {key}"
+
+    def _description_cell(self, job_data: dict, documents: dict):
+        items = normalize_description(job_data.get('job_description'))
+        if self.mode == 'full':
+            return "\n".join(items)[:SHEETS_CELL_LIMIT]
+
+        kept = cap_items(items, self.max_items, self.max_chars)
+        if kept == items:
+            return "\n".join(items)
+        with self.lock:
+            self.capped += 1
+        if not self.store:
+            return "\n".join(kept)
+
+        key = description_key(job_data, items)
+        data = compress_items(items)
+        if len(data) > MAX_STORED_BYTES:
+            logger.warning(f"Description {key} is {len(data)} bytes compressed, not storing it")
+            return "\n".join(kept)
+        documents[key] = {
+            'data': data,
+            'items': len(items),
+            'job_title': job_data.get('job_title', ''),
+            'company_name': job_data.get('company_name', ''),
+            'created_at': time.time(),
+        }
+        more = len(items) - len(kept)
+        suffix = f"+{more} more point{'s' if more != 1 else ''}" if more else "Full text"
+        return "\n".join(kept) + f"\n{suffix}: {self.link(key)}"
+
+    def _row(self, job_data: dict, description: str):
+        return [
+            job_data.get('job_title', ''),
+            job_data.get('company_name'),
+            job_data.get('date_applied', ''),
+            description,
+            job_data.get('status', 'Pending'),
+            job_data.get('notes', '')
+        ]
+
+    def rows(self, records: list):
+        # One batched side store write for all rows; if it fails the rows keep
+        # their capped descriptions without a link rather than failing the append
+        documents = {}
+        cells = [self._description_cell(job_data, documents) for job_data in records]
+        if documents:
+            try:
+                self.store.put_many(documents)
+                with self.lock:
+                    self.stored += len(documents)
+            except Exception as e:
+                with self.lock:
+                    self.store_errors += 1
+                logger.error(f"Error storing full descriptions: {e}")
+                cells = [self._strip_link(cell, documents) for cell in cells]
+        return [self._row(job_data, cell) for job_data, cell in zip(records, cells)]
+
+    def _strip_link(self, cell: str, documents: dict):
+        for key in documents:
+            link = self.link(key)
+            if cell.endswith(link):
+                return cell.rsplit("\n", 1)[0]
+        return cell
+
+    def row(self, job_data: dict):
+        return self.rows([job_data])[0]
+
+    def stats(self):
+        with self.lock:
+            return {
+                'mode': self.mode,
+                'capped': self.capped,
+                'stored': self.stored,
+                'store_errors': self.store_errors,
+            }
@@ -0,0 +1,113 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class SheetProvisioner:
+    # Makes sure each user gets exactly one sheet, no matter how many requests
+    # arrive for them at once. Concurrent callers in this process share one
+    # in-flight creation; across instances a Firestore lease decides who creates it.
+    # New users are served from a pool of pre-created sheets when one is available.
+    def __init__(self, server, db, lease_ttl: float = 60, wait_timeout: float = 60, spare_target: int = 0):
+        self.server = server
+        self.db = db
+        self.lease_ttl = lease_ttl
+        self.wait_timeout = wait_timeout
+        self.spare_target = spare_target
+        self.owner = f"{id(self):x}-{time.time()}"
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.refilling = False
+
+    def ensure_sheet(self, user_email: str):
+        # Returns {"spreadsheetId", "spreadsheetUrl", "formatVersion"}
+        with self.lock:
+            future = self.inflight.get(user_email)
+            leader = future is None
+            if leader:
+                future = Future()
+                self.inflight[user_email] = future
+
+        if not leader:
+            return future.result(timeout=self.wait_timeout)
+
+        try:
+            sheet_info = self._provision(user_email)
+            future.set_result(sheet_info)
+            return sheet_info
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.inflight[user_email]
+
+    def _sheet_info(self, sheet_link: str, format_version=None):
+        return {
+            "spreadsheetId": sheet_link.split("/")[5],
+            "spreadsheetUrl": sheet_link,
+            "formatVersion": format_version
+        }
+
+    def _provision(self, user_email: str):
+        deadline = time.time() + self.wait_timeout
+        while True:
+            sheet_link, acquired = self.db.acquire_sheet_lease(user_email, self.owner, self.lease_ttl)
+            if sheet_link:
+                # Another instance finished first
+                return self._sheet_info(sheet_link)
+            if acquired:
+                break
+            if time.time() > deadline:
+                raise TimeoutError(f"Timed out waiting for sheet creation for {user_email}")
+            time.sleep(0.5)
+
+        try:
+            spare = self.db.claim_spare_sheet(user_email) if self.spare_target else None
+            if spare:
+                sheet_info = self._sheet_info(spare['sheet_link'], spare['sheet_format_version'])
+                try:
+                    self.server.claim_spare(sheet_info["spreadsheetId"], user_email)
+                except Exception as e:
+                    # The sheet is already the user's and works under its spare title
+                    logger.error(f"Error renaming spare sheet {sheet_info['spreadsheetId']} for {user_email}: {e}")
+                self.refill_async()
+                return sheet_info
+
+            sheet_info = self.server.trigger_new_sheet(user_email)
+            if not sheet_info:
+                raise RuntimeError(f"Failed to create a sheet for {user_email}")
+            self.db.add_user_to_firestore(user_email, sheet_info["spreadsheetUrl"], sheet_info["formatVersion"])
+            return sheet_info
+        finally:
+            self.db.release_sheet_lease(user_email)
+
+    def refill_async(self):
+        with self.lock:
+            if self.refilling or not self.spare_target:
+                return
+            self.refilling = True
+        threading.Thread(target=self.refill, name="spare-sheet-refill", daemon=True).start()
+
+    def refill(self):
+        # Top the spare pool back up to spare_target
+        try:
+            missing = self.spare_target - self.db.count_spare_sheets()
+            for _ in range(max(missing, 0)):
+                sheet_info = self.server.create_ledger_sheet("JobLedger_Sheet")
+                if not sheet_info:
+                    break
+                self.db.add_spare_sheet(
+                    sheet_info["spreadsheetId"],
+                    sheet_info["spreadsheetUrl"],
+                    sheet_info["formatVersion"]
+                )
+            logger.info(f"Spare sheet pool refilled ({max(missing, 0)} created)")
+        except Exception as e:
+            logger.error(f"Error refilling spare sheets: {e}")
+        finally:
+            with self.lock:
+                self.refilling = False
@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class SheetWriteBehind:
+    # Coalesces rows bound for the same spreadsheet into a single append.
+    # A row for a sheet with nothing in flight goes out at once. Rows that arrive
+    # while an append to their sheet is running are buffered and sent together
+    # when it finishes, when the oldest is older than window seconds, or when
+    # there are max_rows of them. Appends run on a pool of workers threads, so
+    # one slow sheet doesn't hold up the others. flush_fn is not retried here:
+    # it goes through resilience.outbound, which retries quota errors.
+    def __init__(self, flush_fn, window: float = 0.5, max_rows: int = 50, workers: int = 16):
+        self.flush_fn = flush_fn
+        self.window = window
+        self.max_rows = max_rows
+        self.buffers = {}  # spreadsheet_id -> (first_added_at, [(row, future)])
+        self.inflight = {}  # spreadsheet_id -> appends running
+        self.condition = threading.Condition()
+        self.closed = False
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sheet-write")
+        self.flusher = threading.Thread(target=self._run, name="sheet-write-behind", daemon=True)
+        self.flusher.start()
+
+    def add(self, spreadsheet_id: str, row: list):
+        future = Future()
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("Sheet writer is closed")
+            if spreadsheet_id not in self.buffers:
+                self.buffers[spreadsheet_id] = (time.time(), [])
+            pending = self.buffers[spreadsheet_id][1]
+            pending.append((row, future))
+            if len(pending) == 1 or len(pending) >= self.max_rows:
+                self.condition.notify()
+        return future
+
+    def _take_ready(self, force: bool = False):
+        now = time.time()
+        ready = []
+        for spreadsheet_id, (added_at, pending) in list(self.buffers.items()):
+            if (force or not self.inflight.get(spreadsheet_id) or len(pending) >= self.max_rows
+                    or now - added_at >= self.window):
+                ready.append((spreadsheet_id, pending))
+                del self.buffers[spreadsheet_id]
+                self.inflight[spreadsheet_id] = self.inflight.get(spreadsheet_id, 0) + 1
+        return ready
+
+    def _next_deadline(self):
+        # Everything still buffered is waiting on an append to its sheet
+        if not self.buffers:
+            return None
+        oldest = min(added_at for added_at, _ in self.buffers.values())
+        return max(oldest + self.window - time.time(), 0)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                ready = self._take_ready()
+                while not ready and not self.closed:
+                    self.condition.wait(timeout=self._next_deadline())
+                    ready = self._take_ready()
+                # Read under the lock: a close() after this pass needs another one
+                closing = self.closed
+                if closing:
+                    ready += self._take_ready(force=True)
+            for spreadsheet_id, pending in ready:
+                self.pool.submit(self._flush, spreadsheet_id, pending)
+            if closing:
+                return
+
+    def _flush(self, spreadsheet_id: str, pending: list):
+        rows = [row for row, _ in pending]
+        try:
+            result = self.flush_fn(spreadsheet_id, rows)
+        except Exception as e:
+            logger.error(f"Error flushing {len(rows)} rows to sheet {spreadsheet_id}: {e}")
+            for _, future in pending:
+                future.set_exception(e)
+        else:
+            logger.info(f"Flushed {len(rows)} rows to sheet {spreadsheet_id}")
+            for _, future in pending:
+                future.set_result(result)
+        finally:
+            # Rows buffered behind this append can go now
+            with self.condition:
+                self.inflight[spreadsheet_id] -= 1
+                if not self.inflight[spreadsheet_id]:
+                    del self.inflight[spreadsheet_id]
+                if spreadsheet_id in self.buffers:
+                    self.condition.notify()
+
+    def close(self):
+        # Flush everything still buffered, then wait for the appends to finish
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.flusher.join()
+        self.pool.shutdown(wait=True)
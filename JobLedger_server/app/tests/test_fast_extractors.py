@@ -0,0 +1,41 @@
+from fast_extractors import FULL_CONFIDENCE, LeverExtractor, LinkedInExtractor, confidence_for, default_registry
+
+LEVER_URL = 'https://jobs.lever.co/acme-robotics/1234'
+LEVER_TITLE = '<div class="posting-headline"><h2>Robotics Engineer</h2></div>'
+LEVER_DESCRIPTION = '<div data-qa="job-description"><p>Build robot arms</p><p>Ship firmware</p></div>'
+
+LINKEDIN_URL = 'https://www.linkedin.com/jobs/view/4567/'
+LINKEDIN_HTML = (
+    '<h1 class="job-details-jobs-unified-top-card__job-title">Software Engineer</h1>'
+    '<div class="job-details-jobs-unified-top-card__company-name">Example Corp</div>'
+    '<div id="job-details"><ul><li>Build services</li><li>Run them</li></ul></div>'
+)
+
+
+def test_title_and_company_without_description_fall_short():
+    assert confidence_for('Engineer', 'Example Corp', '') < 0.8
+    assert confidence_for('Engineer', 'Example Corp', 'Build things') == FULL_CONFIDENCE
+
+
+def test_company_from_the_page_is_fully_confident():
+    result, confidence = LinkedInExtractor().extract({'url': LINKEDIN_URL, 'html': LINKEDIN_HTML})
+
+    assert result['company_name'] == 'Example Corp'
+    assert result['job_description'] == ['Build services', 'Run them']
+    assert confidence == FULL_CONFIDENCE
+
+
+def test_company_from_url_slug_is_title_cased_and_less_confident():
+    result, confidence = LeverExtractor().extract({'url': LEVER_URL, 'html': LEVER_TITLE + LEVER_DESCRIPTION})
+
+    assert result['company_name'] == 'Acme Robotics'
+    assert 0.8 <= confidence < FULL_CONFIDENCE
+
+
+def test_title_and_slug_only_page_goes_to_the_llm():
+    registry = default_registry(0.8)
+
+    assert registry.extract({'url': LEVER_URL, 'html': LEVER_TITLE}) == (None, 0.0)
+    # Still good enough as a fallback when the LLM is down
+    result, _ = registry.extract({'url': LEVER_URL, 'html': LEVER_TITLE}, 0.4)
+    assert result['job_title'] == 'Robotics Engineer'
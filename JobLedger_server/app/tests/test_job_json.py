@@ -0,0 +1,77 @@
+import json
+
+from job_json import JobObjectDetector, extract_last_job_object
+
+JOB = {"job_title": "Engineer", "company_name": "Example Corp", "job_description": ["Build things"]}
+JOB_TEXT = json.dumps(JOB)
+ECHO = ('{"job_title": "title of the job", "company_name": "company name", '
+        '"job_description": ["description of the job in point form"]}')
+
+
+def feed_in_chunks(text, size, **kwargs):
+    detector = JobObjectDetector(**kwargs)
+    found = []
+    for start in range(0, len(text), size):
+        found.extend(detector.feed(text[start:start + size]))
+    return detector, found
+
+
+def test_detects_object_across_any_chunking():
+    text = f"Sure, here it is: {JOB_TEXT} Let me know."
+    for size in (1, 3, 7, len(text)):
+        _, found = feed_in_chunks(text, size)
+        assert found == [JOB]
+
+
+def test_skips_prompt_echo():
+    _, found = feed_in_chunks(f"Format: {ECHO}\nOutput: {JOB_TEXT}", 5)
+    assert found == [JOB]
+
+
+def test_skips_stray_braces_in_echoed_text():
+    text = "Page text with a { brace } and {curly} words.\nOutput: " + JOB_TEXT
+    for size in (1, 4, len(text)):
+        _, found = feed_in_chunks(text, size)
+        assert found == [JOB]
+
+
+def test_reports_fields_as_their_strings_close():
+    partials = []
+    detector = JobObjectDetector(on_partial=lambda fields: partials.append(dict(fields)))
+    for char in JOB_TEXT:
+        detector.feed(char)
+
+    assert partials[0] == {"job_title": "Engineer"}
+    assert partials[-1]["company_name"] == "Example Corp"
+
+
+def test_pending_object_repairs_truncated_output():
+    detector = JobObjectDetector()
+    detector.feed('{"job_title": "Engineer", "company_name": "Exam')
+
+    assert detector.pending_object()["job_title"] == "Engineer"
+
+
+def test_extract_last_prefers_the_last_complete_object():
+    other = dict(JOB, job_title="Designer")
+    text = f"{JOB_TEXT}\n{json.dumps(other)}"
+    assert extract_last_job_object(text) == other
+
+
+def test_extract_last_prefers_complete_over_truncated_trailing_object():
+    text = JOB_TEXT + '\n{"job_title": "Partial", "company_name": "Cut'
+    assert extract_last_job_object(text) == JOB
+
+
+def test_extract_last_restarts_after_unbalanced_stray_brace():
+    text = 'Example: {"job_title": oops\n' + JOB_TEXT
+    assert extract_last_job_object(text) == JOB
+
+
+def test_extract_last_falls_back_to_truncated_object():
+    assert extract_last_job_object('{"job_title": "Engineer", "company_name": "Ex')["job_title"] == "Engineer"
+
+
+def test_extract_last_returns_none_without_a_job():
+    assert extract_last_job_object("No JSON here") is None
+    assert extract_last_job_object(ECHO) is None
@@ -0,0 +1,104 @@
+import json
+import time
+
+import pytest
+import requests
+
+from llm_backends import HFInferenceBackend
+from resilience import clear_deadline, set_deadline
+
+
+class FakeClient:
+    # Answers single prompts; list inputs get rejected_status when it is set
+    def __init__(self, rejected_status=None):
+        self.rejected_status = rejected_status
+        self.posts = []
+
+    def post(self, json=None):
+        self.posts.append(json['inputs'])
+        if isinstance(json['inputs'], list):
+            if self.rejected_status:
+                response = requests.Response()
+                response.status_code = self.rejected_status
+                raise requests.HTTPError(f"{self.rejected_status} error", response=response)
+            return _dumps([{'generated_text': f"out {prompt}"} for prompt in json['inputs']])
+        return _dumps([{'generated_text': f"out {json['inputs']}"}])
+
+
+def _dumps(value):
+    return json.dumps(value).encode()
+
+
+def backend(client):
+    # Skips InferenceClient construction
+    instance = HFInferenceBackend.__new__(HFInferenceBackend)
+    instance.client = client
+    instance.batch_supported = True
+    instance.timeout = 60
+    return instance
+
+
+def test_generate_batch_sends_one_request():
+    client = FakeClient()
+
+    assert backend(client).generate_batch(['a', 'b'], 10) == ['out a', 'out b']
+    assert client.posts == [['a', 'b']]
+
+
+def test_generate_batch_falls_back_when_list_inputs_are_rejected():
+    client = FakeClient(rejected_status=422)
+    hf = backend(client)
+
+    assert hf.generate_batch(['a', 'b'], 10) == ['out a', 'out b']
+    assert hf.generate_batch(['c', 'd'], 10) == ['out c', 'out d']
+    # Only the first batch tried list inputs
+    assert client.posts[0] == ['a', 'b']
+    assert sorted(client.posts[1:]) == ['a', 'b', 'c', 'd']
+
+
+def test_per_prompt_fallback_runs_prompts_concurrently():
+    class SlowClient(FakeClient):
+        def post(self, json=None):
+            time.sleep(0.2)
+            return super().post(json=json)
+
+    hf = backend(SlowClient(rejected_status=422))
+    hf.batch_supported = False
+    started = time.perf_counter()
+
+    assert hf.generate_batch([str(i) for i in range(8)], 10) == [f"out {i}" for i in range(8)]
+    assert time.perf_counter() - started < 0.8
+
+
+@pytest.mark.parametrize('status', [429, 503])
+def test_generate_batch_leaves_quota_and_server_errors_to_the_caller(status):
+    hf = backend(FakeClient(rejected_status=status))
+
+    with pytest.raises(requests.HTTPError):
+        hf.generate_batch(['a', 'b'], 10)
+    assert hf.batch_supported
+
+
+def test_calls_are_capped_at_the_request_deadline():
+    class TimedClient(FakeClient):
+        timeout = 30
+
+        def post(self, json=None):
+            self.posts.append(self.timeout)
+            return _dumps([{'generated_text': 'out'}])
+
+    client = TimedClient()
+    hf = backend(client)
+    hf.timeout = 30
+
+    hf.generate('a', 10)
+    previous = set_deadline(5)
+    try:
+        hf.generate('a', 10)
+    finally:
+        clear_deadline(previous)
+
+    assert client.posts[0] == 30
+    assert 4 < client.posts[1] <= 5
+    # The shared client keeps its own timeout
+    assert client.timeout == 30
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+
+from llm_batcher import LLMBatcher
+
+
+def test_batches_prompts_submitted_together():
+    batches = []
+
+    def batch_fn(prompts):
+        batches.append(list(prompts))
+        return [prompt.upper() for prompt in prompts]
+
+    batcher = LLMBatcher(batch_fn, max_batch=4, max_wait=0.2)
+    futures = [batcher.submit(prompt) for prompt in ('a', 'b', 'c')]
+
+    assert [future.result(timeout=2) for future in futures] == ['A', 'B', 'C']
+    assert batches == [['a', 'b', 'c']]
+    assert batcher.stats()['avg_batch_size'] == 3
+    batcher.close()
+
+
+def test_splits_at_max_batch():
+    release = threading.Event()
+    batches = []
+
+    def batch_fn(prompts):
+        release.wait(2)
+        batches.append(list(prompts))
+        return prompts
+
+    batcher = LLMBatcher(batch_fn, max_batch=2, max_wait=0.2)
+    futures = [batcher.submit(str(i)) for i in range(5)]
+    release.set()
+
+    assert [future.result(timeout=2) for future in futures] == ['0', '1', '2', '3', '4']
+    assert sorted(len(batch) for batch in batches) == [1, 2, 2]
+    batcher.close()
+
+
+def test_batches_run_concurrently_up_to_workers():
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def batch_fn(prompts):
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.2)
+        with lock:
+            running.pop()
+        return prompts
+
+    batcher = LLMBatcher(batch_fn, max_batch=1, max_wait=0, workers=4)
+    started = time.perf_counter()
+    futures = [batcher.submit(str(i)) for i in range(8)]
+
+    assert [future.result(timeout=2) for future in futures] == [str(i) for i in range(8)]
+    assert max(peak) == 4
+    assert time.perf_counter() - started < 0.8
+    batcher.close()
+
+
+def test_batch_error_fails_every_prompt():
+    def batch_fn(prompts):
+        raise RuntimeError('model unavailable')
+
+    batcher = LLMBatcher(batch_fn, max_batch=4, max_wait=0.05)
+    futures = [batcher.submit(prompt) for prompt in ('a', 'b')]
+
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=2)
+    batcher.close()
+
+
+def test_close_finishes_queued_prompts_then_rejects():
+    batcher = LLMBatcher(lambda prompts: prompts, max_batch=8, max_wait=60)
+    future = batcher.submit('queued')
+
+    batcher.close()
+
+    assert future.result(timeout=0) == 'queued'
+    with pytest.raises(RuntimeError):
+        batcher.submit('late')
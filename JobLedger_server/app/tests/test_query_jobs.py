@@ -0,0 +1,43 @@
+import threading
+
+from query_jobs import QueryJob
+
+
+release = threading.Event()
+
+
+def extract(job=None):
+    # Holds the job running until the test has seen its partial fields
+    job.set_partial({'job_title': 'Engineer'})
+    release.wait(5)
+    return {'job_title': 'Engineer', 'company_name': 'Example'}
+
+
+def test_updates_streams_partials_then_result():
+    release.clear()
+    job = QueryJob('job-1', extract, ())
+    threading.Thread(target=job.run, daemon=True).start()
+
+    seen = []
+    for update in job.updates(timeout=10):
+        if update is None:
+            continue
+        seen.append(update)
+        if update.get('partial'):
+            release.set()
+
+    assert any(update.get('partial') == {'job_title': 'Engineer'} for update in seen)
+    assert seen[-1]['status'] == 'done'
+    assert seen[-1]['result']['company_name'] == 'Example'
+
+
+def test_updates_end_on_failure():
+    def fail(job=None):
+        raise RuntimeError('boom')
+
+    job = QueryJob('job-2', fail, ())
+    job.run()
+
+    updates = list(job.updates(timeout=10))
+    assert updates[-1]['status'] == 'failed'
+    assert updates[-1]['error'] == 'boom'
@@ -0,0 +1,162 @@
+import concurrent.futures
+import time
+
+import pytest
+
+from resilience import (
+    BreakerOpenError, CircuitBreaker, DeadlineExceeded, Outbound, clear_deadline, is_failure, is_retryable,
+    set_deadline
+)
+
+
+class StatusError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.code = status
+
+
+def failing(*errors):
+    # Raises the given errors in turn, then returns 'ok'
+    calls = []
+
+    def func():
+        calls.append(len(calls))
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return 'ok'
+    return func, calls
+
+
+def outbound(**settings):
+    settings = dict(dict(max_attempts=3, base_delay=0.001, max_delay=0.01, failure_threshold=2, reset_timeout=60),
+                    **settings)
+    return Outbound(**settings)
+
+
+def test_breaker_opens_after_threshold_and_rejects():
+    breaker = CircuitBreaker('dep', failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+    assert breaker.stats()['rejected'] == 1
+
+
+def test_breaker_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker('dep', failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+
+
+def test_breaker_reopens_when_trial_fails():
+    breaker = CircuitBreaker('dep', failure_threshold=5, reset_timeout=0.01)
+    for _ in range(5):
+        breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == 'open'
+    assert breaker.stats()['times_opened'] == 2
+
+
+def test_outbound_retries_transient_errors_for_idempotent_calls():
+    func, calls = failing(StatusError(502), StatusError(503))
+
+    assert outbound(failure_threshold=5).call('dep', func) == 'ok'
+    assert len(calls) == 3
+
+
+def test_outbound_retries_only_quota_errors_for_non_idempotent_calls():
+    func, calls = failing(StatusError(429))
+    assert outbound().call('dep', func, idempotent=False) == 'ok'
+    assert len(calls) == 2
+
+    func, calls = failing(StatusError(500))
+    with pytest.raises(StatusError):
+        outbound().call('dep', func, idempotent=False)
+    assert len(calls) == 1
+
+
+def test_outbound_does_not_retry_client_errors_or_count_them():
+    client = outbound()
+    func, calls = failing(StatusError(404), StatusError(404), StatusError(404))
+
+    for _ in range(3):
+        with pytest.raises(StatusError):
+            client.call('dep', func)
+    assert len(calls) == 3
+    assert client.breaker('dep').state == 'closed'
+
+
+def test_outbound_rejects_calls_while_open():
+    client = outbound(max_attempts=1)
+    func, calls = failing(StatusError(500), StatusError(500))
+    for _ in range(2):
+        with pytest.raises(StatusError):
+            client.call('dep', func)
+
+    with pytest.raises(BreakerOpenError):
+        client.call('dep', func)
+    assert len(calls) == 2
+    assert client.stats()['dep']['state'] == 'open'
+
+
+def test_outbound_stops_at_the_deadline():
+    client = outbound()
+    func, calls = failing(StatusError(503))
+    previous = set_deadline(0)
+    try:
+        with pytest.raises(DeadlineExceeded):
+            client.call('dep', func)
+    finally:
+        clear_deadline(previous)
+    assert calls == []
+
+
+def test_spent_deadline_is_not_a_dependency_failure():
+    assert not is_failure(DeadlineExceeded())
+    assert is_failure(TimeoutError())
+    assert is_failure(StatusError(429))
+    assert not is_failure(StatusError(400))
+
+
+def test_futures_timeouts_are_retryable():
+    assert is_retryable(concurrent.futures.TimeoutError(), idempotent=True)
+    assert not is_retryable(concurrent.futures.TimeoutError(), idempotent=False)
+
+
+def test_deadline_mid_call_records_neither_outcome():
+    client = outbound(failure_threshold=2)
+    func, _ = failing(ConnectionError('reset'), DeadlineExceeded('spent'))
+    with pytest.raises(ConnectionError):
+        client.call('dep', func, retry=False)
+
+    with pytest.raises(DeadlineExceeded):
+        client.call('dep', func)
+
+    assert client.breaker('dep').stats()['consecutive_failures'] == 1
+
+
+def test_deadline_mid_trial_frees_the_half_open_slot():
+    client = outbound(failure_threshold=1, reset_timeout=0.01)
+    func, _ = failing(StatusError(500), DeadlineExceeded('spent'))
+    with pytest.raises(StatusError):
+        client.call('dep', func, retry=False)
+    time.sleep(0.02)
+
+    with pytest.raises(DeadlineExceeded):
+        client.call('dep', func)
+
+    breaker = client.breaker('dep')
+    assert breaker.state == 'half_open'
+    assert breaker.allow()
@@ -0,0 +1,139 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from sheet_provisioning import SheetProvisioner
+
+
+def sheet_info(name):
+    return {
+        'spreadsheetId': name,
+        'spreadsheetUrl': f"https://docs.google.com/spreadsheets/d/{name}/edit",
+        'formatVersion': 2,
+    }
+
+
+class FakeServer:
+    def __init__(self, delay=0.1, fail=False, rename_error=None):
+        self.delay = delay
+        self.fail = fail
+        self.rename_error = rename_error
+        self.created = []
+        self.claimed = []
+        self.lock = threading.Lock()
+
+    def claim_spare(self, spreadsheet_id, user_email):
+        if self.rename_error:
+            raise self.rename_error
+        self.claimed.append((spreadsheet_id, user_email))
+
+    def trigger_new_sheet(self, user_email):
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError('Drive unavailable')
+        with self.lock:
+            self.created.append(user_email)
+            return sheet_info(f"sheet-{len(self.created)}")
+
+
+class FakeDatabase:
+    # Lease semantics of firestore_setup.database, in memory
+    def __init__(self, spares=()):
+        self.lock = threading.Lock()
+        self.leases = {}
+        self.users = {}
+        self.spares = list(spares)
+
+    def acquire_sheet_lease(self, user_email, owner, ttl):
+        with self.lock:
+            if user_email in self.users:
+                return self.users[user_email], False
+            if self.leases.get(user_email, owner) != owner:
+                return None, False
+            self.leases[user_email] = owner
+            return None, True
+
+    def release_sheet_lease(self, user_email):
+        with self.lock:
+            self.leases.pop(user_email, None)
+
+    def add_user_to_firestore(self, user_email, sheet_link, format_version):
+        with self.lock:
+            self.users[user_email] = sheet_link
+
+    def claim_spare_sheet(self, user_email):
+        with self.lock:
+            return self.spares.pop(0) if self.spares else None
+
+    def count_spare_sheets(self):
+        return len(self.spares)
+
+
+def test_concurrent_requests_share_one_creation():
+    server = FakeServer()
+    provisioner = SheetProvisioner(server, FakeDatabase())
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: provisioner.ensure_sheet('a@example.com'), range(8)))
+
+    assert server.created == ['a@example.com']
+    assert all(result == results[0] for result in results)
+    assert provisioner.inflight == {}
+
+
+def test_different_users_get_their_own_sheets():
+    server = FakeServer(delay=0.01)
+    provisioner = SheetProvisioner(server, FakeDatabase())
+
+    first = provisioner.ensure_sheet('a@example.com')
+    second = provisioner.ensure_sheet('b@example.com')
+
+    assert first['spreadsheetId'] != second['spreadsheetId']
+
+
+def test_waiters_get_the_leaders_error_and_the_next_call_retries():
+    server = FakeServer(fail=True)
+    db = FakeDatabase()
+    provisioner = SheetProvisioner(server, db)
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(provisioner.ensure_sheet, 'a@example.com') for _ in range(4)]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result()
+    assert db.leases == {}
+
+    server.fail = False
+    assert provisioner.ensure_sheet('a@example.com')['spreadsheetId'] == 'sheet-1'
+
+
+def test_existing_sheet_from_another_instance_is_reused():
+    server = FakeServer()
+    db = FakeDatabase()
+    db.users['a@example.com'] = sheet_info('existing')['spreadsheetUrl']
+
+    assert SheetProvisioner(server, db).ensure_sheet('a@example.com')['spreadsheetId'] == 'existing'
+    assert server.created == []
+
+
+def test_spare_sheet_is_claimed_before_creating_one():
+    server = FakeServer()
+    spare = {'sheet_link': sheet_info('spare')['spreadsheetUrl'], 'sheet_format_version': 2}
+    provisioner = SheetProvisioner(server, FakeDatabase(spares=[spare]), spare_target=1)
+    provisioner.refill_async = lambda: None
+
+    assert provisioner.ensure_sheet('a@example.com')['spreadsheetId'] == 'spare'
+    assert server.created == []
+    assert server.claimed == [('spare', 'a@example.com')]
+
+
+def test_claimed_spare_is_kept_when_the_rename_fails():
+    server = FakeServer(rename_error=RuntimeError('Drive unavailable'))
+    spare = {'sheet_link': sheet_info('spare')['spreadsheetUrl'], 'sheet_format_version': 2}
+    provisioner = SheetProvisioner(server, FakeDatabase(spares=[spare]), spare_target=1)
+    provisioner.refill_async = lambda: None
+
+    assert provisioner.ensure_sheet('a@example.com')['spreadsheetId'] == 'spare'
+    assert server.created == []
@@ -0,0 +1,135 @@
+import threading
+import time
+
+import pytest
+
+from sheet_writer import SheetWriteBehind
+
+
+class RecordingFlush:
+    # Blocks each append until release() when gated, so tests can hold one in flight
+    def __init__(self, error=None, gated=False):
+        self.calls = []
+        self.error = error
+        self.gate = threading.Event()
+        if not gated:
+            self.gate.set()
+        self.started = threading.Semaphore(0)
+        self.lock = threading.Lock()
+
+    def __call__(self, spreadsheet_id, rows):
+        with self.lock:
+            self.calls.append((spreadsheet_id, list(rows), time.monotonic()))
+        self.started.release()
+        self.gate.wait(5)
+        if self.error:
+            raise self.error
+        return {'updates': {'updatedRows': len(rows)}}
+
+    def wait_started(self, count=1):
+        for _ in range(count):
+            assert self.started.acquire(timeout=2)
+
+
+def rows_by_sheet(flush):
+    return sorted((spreadsheet_id, rows) for spreadsheet_id, rows, _ in flush.calls)
+
+
+def test_lone_row_is_flushed_without_waiting_for_the_window():
+    flush = RecordingFlush()
+    writer = SheetWriteBehind(flush, window=60, max_rows=50)
+    added = time.monotonic()
+
+    writer.add('sheet-1', ['only']).result(timeout=2)
+
+    assert rows_by_sheet(flush) == [('sheet-1', [['only']])]
+    assert flush.calls[0][2] - added < 1
+    writer.close()
+
+
+def test_rows_behind_an_inflight_append_go_together_when_it_finishes():
+    flush = RecordingFlush(gated=True)
+    writer = SheetWriteBehind(flush, window=60, max_rows=50)
+    first = writer.add('sheet-1', ['a'])
+    flush.wait_started()
+    queued = [writer.add('sheet-1', [row]) for row in ('b', 'c')]
+
+    flush.gate.set()
+
+    for future in [first] + queued:
+        future.result(timeout=2)
+    assert [rows for _, rows, _ in flush.calls] == [[['a']], [['b'], ['c']]]
+    writer.close()
+
+
+def test_buffer_goes_out_at_max_rows_even_with_an_append_in_flight():
+    flush = RecordingFlush(gated=True)
+    writer = SheetWriteBehind(flush, window=60, max_rows=2)
+    writer.add('sheet-1', ['a'])
+    flush.wait_started()
+    writer.add('sheet-1', ['b'])
+    writer.add('sheet-1', ['c'])
+
+    flush.wait_started()
+    assert [rows for _, rows, _ in flush.calls] == [[['a']], [['b'], ['c']]]
+    flush.gate.set()
+    writer.close()
+
+
+def test_buffer_goes_out_after_the_window_even_with_an_append_in_flight():
+    flush = RecordingFlush(gated=True)
+    writer = SheetWriteBehind(flush, window=0.1, max_rows=50)
+    writer.add('sheet-1', ['a'])
+    flush.wait_started()
+    writer.add('sheet-1', ['b'])
+
+    flush.wait_started()
+    assert [rows for _, rows, _ in flush.calls] == [[['a']], [['b']]]
+    flush.gate.set()
+    writer.close()
+
+
+def test_sheets_are_flushed_in_parallel():
+    flush = RecordingFlush(gated=True)
+    writer = SheetWriteBehind(flush, window=60, max_rows=50, workers=4)
+    futures = [writer.add(f'sheet-{i}', [i]) for i in range(3)]
+
+    # All three appends are running before any is allowed to finish
+    flush.wait_started(3)
+    flush.gate.set()
+
+    for future in futures:
+        future.result(timeout=2)
+    assert rows_by_sheet(flush) == [('sheet-0', [[0]]), ('sheet-1', [[1]]), ('sheet-2', [[2]])]
+    writer.close()
+
+
+def test_close_flushes_buffered_rows():
+    flush = RecordingFlush(gated=True)
+    writer = SheetWriteBehind(flush, window=60, max_rows=50)
+    first = writer.add('sheet-1', ['a'])
+    flush.wait_started()
+    buffered = writer.add('sheet-1', ['pending'])
+    flush.gate.set()
+
+    writer.close()
+
+    assert first.done() and buffered.done()
+    assert [rows for _, rows, _ in flush.calls] == [[['a']], [['pending']]]
+    with pytest.raises(RuntimeError):
+        writer.add('sheet-1', ['late'])
+
+
+def test_flush_error_fails_every_row_in_the_batch():
+    flush = RecordingFlush(error=ValueError('quota'), gated=True)
+    writer = SheetWriteBehind(flush, window=60, max_rows=50)
+    first = writer.add('sheet-1', [0])
+    flush.wait_started()
+    batch = [writer.add('sheet-1', [i]) for i in (1, 2)]
+    flush.gate.set()
+
+    for future in [first] + batch:
+        with pytest.raises(ValueError):
+            future.result(timeout=2)
+    assert len(flush.calls) == 2
+    writer.close()
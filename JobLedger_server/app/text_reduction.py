@@ -0,0 +1,133 @@
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Lines that only ever come from site chrome (nav bars, footers, buttons)
+BOILERPLATE_PATTERNS = [
+    re.compile(p, re.IGNORECASE) for p in [
+        r'^skip to (main content|search|content)',
+        r'^(home|jobs|messaging|notifications|me|for business|my network|sign in|sign up|join now|log in)$',
+        r'^(apply|easy apply|save|saved|share|dismiss|show more|show less|see more|see all|learn more|next|previous)$',
+        r'^(show more options|show all|report this job|back to search|view job)$',
+        r'^\d+ notifications? total',
+        r'^(cookie|privacy|terms|accessibility|copyright|©)',
+        r'^(promoted|viewed|be an early applicant|with verification)$',
+        r'try premium',
+        r'^page \d+ of \d+$',
+        r'^\d+$',
+    ]
+]
+
+# Section headers that mark the body of a job posting
+SECTION_KEYWORDS = [
+    'about the job', 'job description', 'responsibilities', 'requirements',
+    'qualifications', 'what you will do', "what you'll do", 'about the role',
+    'about the team', 'who you are', 'what we are looking for', 'job summary',
+]
+
+# Headers that mark the end of the posting (recommendations, company blurbs)
+TAIL_KEYWORDS = [
+    'similar jobs', 'people also viewed', 'more jobs', 'jobs you may be interested in',
+    'recommended jobs', 'about the company', 'interested in working with us',
+]
+
+HEAD_LINES = 8
+DENSITY_WINDOW = 15
+CHARS_PER_TOKEN = 4
+LONG_LINE = 300
+
+
+def iter_lines(text: str):
+    # Yield trimmed lines, breaking up very long ones so the scoring has something to work with
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if len(line) <= LONG_LINE:
+            yield line
+            continue
+        for sentence in re.split(r'(?<=[.!?])\s+', line):
+            sentence = sentence.strip()
+            if sentence:
+                yield sentence
+
+
+def is_boilerplate(line: str):
+    return any(pattern.search(line) for pattern in BOILERPLATE_PATTERNS)
+
+
+def iter_clean_lines(text: str):
+    seen = set()
+    for line in iter_lines(text):
+        normalized = re.sub(r'\s+', ' ', line).lower()
+        if normalized in seen or is_boilerplate(normalized):
+            continue
+        seen.add(normalized)
+        yield line
+
+
+def keyword_density(line: str):
+    lowered = line.lower()
+    return sum(1 for keyword in SECTION_KEYWORDS if keyword in lowered)
+
+
+def find_job_start(lines: list):
+    # Score each header line by the section keywords in the lines that follow it and
+    # start at the earliest one that is at least half as dense as the best
+    densities = [keyword_density(line) for line in lines]
+    scores = {}
+    for i, density in enumerate(densities):
+        if density:
+            scores[i] = sum(densities[i:i + DENSITY_WINDOW])
+    if not scores:
+        return None
+
+    best = max(scores.values())
+    return min(i for i, score in scores.items() if score * 2 >= best)
+
+
+def find_job_region(lines: list):
+    # Start at the densest run of posting section headers and stop at the first tail header after it
+    start = find_job_start(lines)
+    if start is None:
+        return lines
+
+    end = len(lines)
+    for i in range(start + 1, len(lines)):
+        lowered = lines[i].lower()
+        if any(lowered.startswith(keyword) or keyword in lowered[:60] for keyword in TAIL_KEYWORDS):
+            end = i
+            break
+
+    # The title and company sit near the top of the page, keep them too
+    head = lines[:min(HEAD_LINES, start)]
+    return head + lines[start:end]
+
+
+def cap_tokens(lines: list, token_budget: int):
+    char_budget = token_budget * CHARS_PER_TOKEN
+    kept = []
+    used = 0
+    for line in lines:
+        if used + len(line) + 1 > char_budget:
+            remaining = char_budget - used
+            if remaining > 0:
+                kept.append(line[:remaining].rsplit(' ', 1)[0])
+            break
+        kept.append(line)
+        used += len(line) + 1
+    return kept
+
+
+def reduce_page_text(text: str, token_budget: int = 1500):
+    lines = list(iter_clean_lines(text))
+    region = find_job_region(lines)
+    reduced = "\n".join(cap_tokens(region, token_budget))
+
+    ratio = len(reduced) / len(text) if text else 1.0
+    logger.info(
+        f"Reduced page text from {len(text)} to {len(reduced)} chars (ratio {ratio:.2f})",
+        extra={'chars': len(reduced), 'ratio': ratio}
+    )
+    return reduced
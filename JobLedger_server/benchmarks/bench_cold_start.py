@@ -0,0 +1,146 @@
+# Measures cold start of the production entry point (waitress-serve app:app)
+# for each STARTUP_MODE: how long `import app` takes, when the port starts
+# accepting connections, the latency of the first real request, and when
+# /api/ready turns 200. Needs the same credentials/env as a real deployment.
+#
+# Usage: python benchmarks/bench_cold_start.py [--modes eager,background,lazy] [--runs 3]
+#            [--request 'POST /api/link {"userEmail": "someone@example.com"}'] [--output results.json]
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import app; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def measure_import(env: dict):
+    output = subprocess.run(
+        [sys.executable, '-c', IMPORT_SNIPPET],
+        cwd=APP_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def send(base_url: str, method: str, path: str, body=None, timeout: float = 120):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(base_url + path, data=data, method=method,
+                                 headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def wait_for_port(port: int, process, deadline: float):
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with {process.returncode}")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.1):
+                return
+        except OSError:
+            time.sleep(0.01)
+    raise TimeoutError("Server did not start listening")
+
+
+def measure_serve(env: dict, request: tuple, timeout: float):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    launched = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'waitress', '--host=127.0.0.1', f'--port={port}', 'app:app'],
+        cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_port(port, process, time.time() + timeout)
+        listening = time.perf_counter() - launched
+
+        method, path, body = request
+        sent = time.perf_counter()
+        status = send(base_url, method, path, body, timeout)
+        first_request = time.perf_counter() - sent
+        first_response = time.perf_counter() - launched
+
+        while send(base_url, 'GET', '/api/ready') != 200:
+            if time.perf_counter() - launched > timeout:
+                raise TimeoutError("Server never reported ready")
+            time.sleep(0.05)
+        ready = time.perf_counter() - launched
+
+        return {
+            'listening_s': round(listening, 3),
+            'first_request_s': round(first_request, 3),
+            'first_request_status': status,
+            'first_response_since_launch_s': round(first_response, 3),
+            'ready_s': round(ready, 3),
+        }
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def parse_request(spec: str):
+    method, path, *rest = spec.split(' ', 2)
+    return method.upper(), path, json.loads(rest[0]) if rest else None
+
+
+def summarize(runs: list):
+    summary = {}
+    for key in runs[0]:
+        values = [run[key] for run in runs]
+        if isinstance(values[0], float):
+            summary[key] = {'median': round(statistics.median(values), 3), 'max': round(max(values), 3)}
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--modes', default='eager,background,lazy')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--request', default='GET /api/ready', help="first request: 'METHOD PATH [JSON body]'")
+    parser.add_argument('--timeout', type=float, default=120)
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    request = parse_request(args.request)
+    results = {'timestamp': datetime.now().isoformat(timespec='seconds'), 'request': args.request, 'modes': {}}
+    for mode in args.modes.split(','):
+        env = dict(os.environ, STARTUP_MODE=mode)
+        runs = []
+        for _ in range(args.runs):
+            run = {'import_s': round(measure_import(env), 3)}
+            run.update(measure_serve(env, request, args.timeout))
+            runs.append(run)
+            print(f"{mode}: " + ", ".join(f"{k}={v}" for k, v in run.items()))
+        results['modes'][mode] = {'runs': runs, 'summary': summarize(runs)}
+
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'results', f"cold_start-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# Compares the old regex in Server.jsonResult with job_json.extract_last_job_object
+# on long and adversarial model responses.
+#
+# Usage: python benchmarks/bench_job_json.py
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+from job_json import extract_last_job_object  # noqa: E402
+
+JOB = {
+    "job_title": "Algorithm Engineer Intern",
+    "company_name": "TikTok",
+    "job_description": [f"Responsibility {i}: build intelligent systems" for i in range(20)]
+}
+
+# Descriptions quoting code or templates: balanced and unbalanced braces inside strings
+BRACES_JOB = dict(JOB, job_description=[
+    f'Responsibility {i}: map {{"key": value}} pairs }} and {{ stray braces' for i in range(20)
+])
+
+PROMPT_ECHO = """
+    Process the following text and extract only the job details. Return the details in the JSON format below:
+    {
+        "job_title": "title of the job",
+        "company_name": "company name",
+        "job_description": [
+            "description of the job in point form"
+        ]
+    }
+"""
+
+
+def regex_extract(response: str):
+    json_matches = re.findall(r'\{\s*"job_title":.*?\}', response, re.DOTALL)
+    if json_matches:
+        try:
+            return json.loads(json_matches[-1])
+        except json.JSONDecodeError:
+            return None
+    return None
+
+
+CASES = {
+    'clean': json.dumps(JOB),
+    'prompt_echo_and_page': PROMPT_ECHO + "page text " * 2000 + json.dumps(JOB, indent=4),
+    'braces_in_description': json.dumps(BRACES_JOB),
+    'stray_brace_in_echo': "Text: stray { brace here. " * 50 + "Output: " + json.dumps(JOB),
+    'trailing_commas': json.dumps(JOB, indent=4).replace('"\n    ]', '",\n    ]'),
+    'truncated': json.dumps(JOB)[:-40],
+    'many_fragments': '{"job_title": "x", ' * 2000 + json.dumps(JOB),
+    'huge_description': json.dumps(dict(JOB, job_description=["point"] * 20000)),
+}
+
+
+def main():
+    results = {}
+    for name, response in CASES.items():
+        row = {'chars': len(response)}
+        for label, func in (('regex', regex_extract), ('scanner', extract_last_job_object)):
+            timer = timeit.Timer(lambda: func(response))
+            loops, _ = timer.autorange()
+            best = min(timer.repeat(repeat=3, number=loops)) / loops
+            parsed = func(response)
+            row[label] = {
+                'ms': round(best * 1000, 3),
+                'ok': bool(parsed) and parsed.get('job_title') == JOB['job_title'],
+            }
+        results[name] = row
+        print(f"{name:24} {row['chars']:>8} chars  "
+              f"regex {row['regex']['ms']:>9.3f}ms ok={row['regex']['ok']!s:5}  "
+              f"scanner {row['scanner']['ms']:>9.3f}ms ok={row['scanner']['ok']}")
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+# Compares serving models under the same offline load: the single waitress
+# process from the Dockerfile against gunicorn with several gthread workers
+# (gunicorn.conf.py), both serving serve_fakes:app with slow fake dependencies.
+# Also reports how long each server takes to exit after SIGTERM.
+#
+# Usage: python benchmarks/bench_serving.py [--configs waitress:16,gunicorn:2x16,gunicorn:4x16]
+#            [--levels 16,64] [--requests 400] [--endpoints query,sheets,link]
+#            [--llm 0.8] [--sheets 0.15] [--output results.json] [--markdown]
+#
+# --markdown prints the table in the format used in README.md.
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_cold_start import free_port, wait_for_port, send  # noqa: E402
+from load_test import LoadRunner  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+GUNICORN_CONF = os.path.join(BENCH_DIR, '..', 'app', 'gunicorn.conf.py')
+
+# Same offline defaults as load_test.py; gunicorn reads config before the app
+# module sets them, so they are passed to the server explicitly
+OFFLINE_ENV = {
+    'LLM_BACKEND': 'hf',
+    'HF_API_KEY': 'offline-benchmark',
+    'LLM_WARM_ON_START': 'false',
+    'EXTRACTION_CACHE_BACKEND': '',
+    'USER_CACHE_LISTEN': 'false',
+    'SPARE_SHEET_POOL_SIZE': '0',
+}
+
+
+def parse_config(spec: str):
+    # "waitress:16" -> one process, 16 threads; "gunicorn:4x16" -> 4 workers, 16 threads each
+    server, _, size = spec.partition(':')
+    if server == 'waitress':
+        return {'name': spec, 'server': server, 'workers': 1, 'threads': int(size or 16)}
+    if server == 'gunicorn':
+        workers, _, threads = (size or '2x16').partition('x')
+        return {'name': spec, 'server': server, 'workers': int(workers), 'threads': int(threads or 16)}
+    raise ValueError(f"Unknown server: {server}")
+
+
+def command(config: dict, port: int):
+    if config['server'] == 'waitress':
+        return [sys.executable, '-m', 'waitress', '--host=127.0.0.1', f'--port={port}',
+                f"--threads={config['threads']}", 'serve_fakes:app']
+    return [sys.executable, '-m', 'gunicorn', '-c', GUNICORN_CONF, '-b', f'127.0.0.1:{port}',
+            '-w', str(config['workers']), '--threads', str(config['threads']), 'serve_fakes:app']
+
+
+def wait_until_ready(base_url: str, timeout: float):
+    # Each gunicorn worker warms up on its own; a few consecutive 200s means
+    # the requests are landing on warm workers
+    deadline = time.time() + timeout
+    ready = 0
+    while ready < 5:
+        if time.time() > deadline:
+            raise TimeoutError("Server never reported ready")
+        ready = ready + 1 if send(base_url, 'GET', '/api/ready') == 200 else 0
+        time.sleep(0.05)
+
+
+def run_config(config: dict, args, env: dict):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(command(config, port), cwd=BENCH_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(port, process, time.time() + args.timeout)
+        wait_until_ready(base_url, args.timeout)
+
+        emails = [f"user{i}@example.com" for i in range(args.users)]
+        runner = LoadRunner(base_url, emails, 0.0, True)
+        results = []
+        for endpoint in args.endpoints.split(','):
+            for concurrency in [int(level) for level in args.levels.split(',')]:
+                result = runner.run(endpoint, concurrency, args.requests)
+                result['config'] = config['name']
+                results.append(result)
+                print(f"{config['name']} {endpoint} x{concurrency}: "
+                      f"{result['rps']} req/s, p95 {result['p95_ms']}ms, {result['errors']} errors")
+
+        stopped = time.perf_counter()
+        process.send_signal(signal.SIGTERM)
+        returncode = process.wait(timeout=args.timeout)
+        shutdown = {'seconds': round(time.perf_counter() - stopped, 3), 'returncode': returncode}
+        return results, shutdown
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def print_markdown(results: list):
+    print("| server | endpoint | concurrency | req/s | p50 ms | p95 ms | p99 ms | errors |")
+    print("|---|---|---:|---:|---:|---:|---:|---:|")
+    for r in results:
+        print(f"| {r['config']} | {r['endpoint']} | {r['concurrency']} | {r['rps']} | "
+              f"{r['p50_ms']} | {r['p95_ms']} | {r['p99_ms']} | {r['errors']} |")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--configs', default='waitress:16,gunicorn:2x16,gunicorn:4x16')
+    # Above 100 keep-alive clients waitress (connection_limit=100) stops accepting
+    # connections; Cloud Run sends at most 80 concurrent requests by default
+    parser.add_argument('--levels', default='16,64', help='comma separated concurrency levels')
+    parser.add_argument('--requests', type=int, default=400, help='requests per endpoint and level')
+    parser.add_argument('--endpoints', default='query,sheets,link')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--llm', default='0.8', help='HF inference profile')
+    parser.add_argument('--token-latency', type=float, default=0.0, help='seconds between streamed tokens')
+    parser.add_argument('--sheets', default='0.15', help='Sheets API profile')
+    parser.add_argument('--drive', default='0.1', help='Drive API profile')
+    parser.add_argument('--firestore', default='0.02', help='Firestore profile')
+    parser.add_argument('--timeout', type=float, default=120)
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--markdown', action='store_true')
+    args = parser.parse_args()
+
+    env = dict(OFFLINE_ENV, **os.environ)
+    env.update({
+        'BENCH_LLM': args.llm,
+        'BENCH_SHEETS': args.sheets,
+        'BENCH_DRIVE': args.drive,
+        'BENCH_FIRESTORE': args.firestore,
+        'BENCH_TOKEN_LATENCY': str(args.token_latency),
+        'BENCH_USERS': str(args.users),
+    })
+
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'settings': {
+            'levels': args.levels,
+            'requests': args.requests,
+            'cpus': os.cpu_count(),
+            'profiles': {name: getattr(args, name) for name in ('llm', 'sheets', 'drive', 'firestore')},
+        },
+        'load': [],
+        'shutdown': {},
+    }
+    for spec in args.configs.split(','):
+        config = parse_config(spec)
+        load, shutdown = run_config(config, args, env)
+        results['load'].extend(load)
+        results['shutdown'][config['name']] = shutdown
+        print(f"{config['name']} exited {shutdown['returncode']} {shutdown['seconds']}s after SIGTERM")
+
+    if args.markdown:
+        print()
+        print_markdown(results['load'])
+
+    output = args.output or os.path.join(BENCH_DIR, 'results', f"serving-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,454 @@
+# In-process stand-ins for the Hugging Face, Sheets/Drive and Firestore clients
+# used by load_test.py. Each fake takes a LatencyProfile so a run can model a
+# slow or flaky dependency without touching the real services.
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httplib2
+from google.api_core import exceptions as api_exceptions
+from googleapiclient.errors import HttpError
+
+import firestore_setup
+from instrumentation import span
+from resilience import outbound
+
+JOB_RESPONSE = json.dumps({
+    "job_title": "Software Engineer",
+    "company_name": "Example Corp",
+    "job_description": [
+        "Design and build backend services",
+        "Own features from design to production",
+        "Work with product and design on the roadmap"
+    ]
+}, indent=4)
+
+
+class LatencyProfile:
+    # Log-normal latency around `median` seconds, with `error_rate` of calls
+    # failing with `error_status`
+    def __init__(self, median: float = 0.0, sigma: float = 0.5, error_rate: float = 0.0, error_status: int = 503):
+        self.median = median
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+    @classmethod
+    def parse(cls, spec: str):
+        # "median[:error_rate[:status]]", e.g. "0.8:0.02:429"
+        parts = spec.split(':')
+        return cls(
+            median=float(parts[0]),
+            error_rate=float(parts[1]) if len(parts) > 1 else 0.0,
+            error_status=int(parts[2]) if len(parts) > 2 else 503
+        )
+
+    def delay(self):
+        if not self.median:
+            return 0.0
+        return random.lognormvariate(math.log(self.median), self.sigma)
+
+    def wait(self, make_error):
+        time.sleep(self.delay())
+        if self.error_rate and random.random() < self.error_rate:
+            raise make_error(self.error_status)
+
+    def to_dict(self):
+        return {
+            'median': self.median,
+            'sigma': self.sigma,
+            'error_rate': self.error_rate,
+            'error_status': self.error_status,
+        }
+
+
+class FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+
+class FakeHTTPError(Exception):
+    # Shaped like huggingface_hub's HfHubHTTPError: the status is on .response
+    def __init__(self, status: int):
+        super().__init__(f"{status} Server Error: fake inference endpoint")
+        self.response = FakeResponse(status)
+
+
+class FakeInferenceClient:
+    # Replaces huggingface_hub.InferenceClient inside HFInferenceBackend.
+    # Like the real text-generation task, post() echoes the prompt before the answer.
+    def __init__(self, profile: LatencyProfile, response: str = JOB_RESPONSE, token_latency: float = 0.0):
+        self.profile = profile
+        self.response = response
+        self.token_latency = token_latency
+
+    def _generated(self, prompt: str):
+        return {"generated_text": f"{prompt}\n{self.response}"}
+
+    def post(self, **kwargs):
+        self.profile.wait(FakeHTTPError)
+        inputs = kwargs["json"]["inputs"]
+        if isinstance(inputs, list):
+            body = [[self._generated(prompt)] for prompt in inputs]
+        else:
+            body = [self._generated(inputs)]
+        return json.dumps(body).encode()
+
+    def text_generation(self, prompt: str, max_new_tokens: int = None, stream: bool = False, **kwargs):
+        if not stream:
+            self.profile.wait(FakeHTTPError)
+            return self.response
+        return self._stream()
+
+    def _stream(self):
+        # The profile models time to first token; token_latency the gap between tokens
+        self.profile.wait(FakeHTTPError)
+        for i in range(0, len(self.response), 4):
+            if self.token_latency:
+                time.sleep(self.token_latency)
+            yield self.response[i:i + 4]
+
+
+def http_error(status: int):
+    return HttpError(httplib2.Response({'status': status}), b'{"error": "fake"}')
+
+
+class FakeSheetStore:
+    # Spreadsheets kept in memory: id -> {'title', 'rows', 'conditionalFormats', 'modifiedTime'}
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sheets = {}
+        self.permissions = {}
+
+    def create(self, title: str, spreadsheet_id: str = None):
+        spreadsheet_id = spreadsheet_id or uuid.uuid4().hex
+        with self.lock:
+            self.sheets[spreadsheet_id] = {'title': title, 'rows': [], 'conditionalFormats': []}
+            self.touch(spreadsheet_id)
+        return spreadsheet_id
+
+    def touch(self, spreadsheet_id: str):
+        # Caller holds the lock
+        self.sheets[spreadsheet_id]['modifiedTime'] = datetime.now(timezone.utc).isoformat(timespec='microseconds')
+
+    def sheet(self, spreadsheet_id: str):
+        sheet = self.sheets.get(spreadsheet_id)
+        if sheet is None:
+            raise http_error(404)
+        return sheet
+
+
+class FakeRequest:
+    # Mirrors google_clients.InstrumentedHttpRequest: nothing happens until
+    # execute(), which goes through the same outbound layer as real requests
+    def __init__(self, profile: LatencyProfile, method_id: str, action, method: str = 'POST'):
+        self.profile = profile
+        self.methodId = method_id
+        self.method = method
+        self.action = action
+
+    def execute(self, http=None, num_retries=0):
+        dependency = self.methodId.split('.')[0]
+
+        def attempt():
+            with span(dependency, self.methodId):
+                self.profile.wait(http_error)
+                return self.action()
+        return outbound.call(dependency, attempt, idempotent=self.method == 'GET')
+
+
+class FakeValues:
+    def __init__(self, store: FakeSheetStore, profile: LatencyProfile):
+        self.store = store
+        self.profile = profile
+
+    def append(self, spreadsheetId, range, body, **kwargs):
+        def action():
+            with self.store.lock:
+                rows = self.store.sheet(spreadsheetId)['rows']
+                start = len(rows) + 1
+                rows.extend(body.get('values', []))
+                self.store.touch(spreadsheetId)
+                return {
+                    'spreadsheetId': spreadsheetId,
+                    'updates': {
+                        'updatedRange': f"Sheet1!A{start}:F{len(rows)}",
+                        'updatedRows': len(body.get('values', [])),
+                    }
+                }
+        return FakeRequest(self.profile, 'sheets.spreadsheets.values.append', action)
+
+    def get(self, spreadsheetId, range, **kwargs):
+        def action():
+            # Only the "Sheet1!A<start>:F<end>" form the app uses
+            bounds = range.split('!')[-1].split(':')
+            start = int(bounds[0][1:] or 1)
+            end = int(bounds[1][1:] or 0) if len(bounds) > 1 else 0
+            with self.store.lock:
+                rows = self.store.sheet(spreadsheetId)['rows']
+                selected = rows[start - 1:end or None]
+            return {'range': range, 'values': [list(row) for row in selected]}
+        return FakeRequest(self.profile, 'sheets.spreadsheets.values.get', action, method='GET')
+
+
+class FakeSpreadsheets:
+    def __init__(self, store: FakeSheetStore, profile: LatencyProfile):
+        self.store = store
+        self.profile = profile
+
+    def values(self):
+        return FakeValues(self.store, self.profile)
+
+    def create(self, body, **kwargs):
+        def action():
+            spreadsheet_id = self.store.create(body.get('properties', {}).get('title', ''))
+            return {'spreadsheetId': spreadsheet_id}
+        return FakeRequest(self.profile, 'sheets.spreadsheets.create', action)
+
+    def get(self, spreadsheetId, **kwargs):
+        def action():
+            with self.store.lock:
+                sheet = self.store.sheet(spreadsheetId)
+                return {'sheets': [{
+                    'properties': {'sheetId': 0},
+                    'conditionalFormats': list(sheet['conditionalFormats']),
+                }]}
+        return FakeRequest(self.profile, 'sheets.spreadsheets.get', action, method='GET')
+
+    def batchUpdate(self, spreadsheetId, body, **kwargs):
+        def action():
+            with self.store.lock:
+                sheet = self.store.sheet(spreadsheetId)
+                for request in body.get('requests', []):
+                    if 'addConditionalFormatRule' in request:
+                        add = request['addConditionalFormatRule']
+                        sheet['conditionalFormats'].insert(add.get('index', len(sheet['conditionalFormats'])), add['rule'])
+                    elif 'deleteConditionalFormatRule' in request:
+                        sheet['conditionalFormats'].pop(request['deleteConditionalFormatRule']['index'])
+                self.store.touch(spreadsheetId)
+            return {'spreadsheetId': spreadsheetId, 'replies': [{} for _ in body.get('requests', [])]}
+        return FakeRequest(self.profile, 'sheets.spreadsheets.batchUpdate', action)
+
+
+class FakeSheetsService:
+    def __init__(self, store: FakeSheetStore, profile: LatencyProfile):
+        self.store = store
+        self.profile = profile
+
+    def spreadsheets(self):
+        return FakeSpreadsheets(self.store, self.profile)
+
+
+class FakePermissions:
+    def __init__(self, store: FakeSheetStore, profile: LatencyProfile):
+        self.store = store
+        self.profile = profile
+
+    def create(self, fileId, body, **kwargs):
+        def action():
+            with self.store.lock:
+                self.store.sheet(fileId)
+                self.store.permissions.setdefault(fileId, []).append(body)
+            return {'id': uuid.uuid4().hex, 'type': body.get('type'), 'role': body.get('role')}
+        return FakeRequest(self.profile, 'drive.permissions.create', action)
+
+
+class FakeFiles:
+    def __init__(self, store: FakeSheetStore, profile: LatencyProfile):
+        self.store = store
+        self.profile = profile
+
+    def get(self, fileId, fields=None, **kwargs):
+        def action():
+            with self.store.lock:
+                sheet = self.store.sheet(fileId)
+                return {'id': fileId, 'modifiedTime': sheet['modifiedTime']}
+        return FakeRequest(self.profile, 'drive.files.get', action, method='GET')
+
+    def update(self, fileId, body, fields=None, **kwargs):
+        def action():
+            with self.store.lock:
+                sheet = self.store.sheet(fileId)
+                if 'name' in body:
+                    sheet['title'] = body['name']
+            return {'id': fileId}
+        return FakeRequest(self.profile, 'drive.files.update', action, method='PATCH')
+
+
+class FakeDriveService:
+    def __init__(self, store: FakeSheetStore, profile: LatencyProfile):
+        self.store = store
+        self.profile = profile
+
+    def permissions(self):
+        return FakePermissions(self.store, self.profile)
+
+    def files(self):
+        return FakeFiles(self.store, self.profile)
+
+
+class FakeGoogleClientPool:
+    # Same interface as google_clients.GoogleClientPool, backed by one shared FakeSheetStore
+    def __init__(self, credentials=None, sheets_profile: LatencyProfile = None,
+                 drive_profile: LatencyProfile = None, store: FakeSheetStore = None):
+        self.store = store or FakeSheetStore()
+        self.sheets_service = FakeSheetsService(self.store, sheets_profile or LatencyProfile())
+        self.drive_service = FakeDriveService(self.store, drive_profile or LatencyProfile())
+        self.created = 2
+
+    def warm(self):
+        pass
+
+    def sheets(self):
+        return self.sheets_service
+
+    def drive(self):
+        return self.drive_service
+
+
+def firestore_error(status: int):
+    return api_exceptions.from_http_status(status, "fake Firestore error")
+
+
+class FakeDatabase(firestore_setup.database):
+    # firestore_setup.database with the collections held in memory. The user
+    # cache is the real one, so cache hit rates match production behaviour.
+    def __init__(self, profile: LatencyProfile = None, cache_size=1024, cache_ttl=300, listen=False):
+        self.profile = profile or LatencyProfile()
+        self.user_cache = firestore_setup.UserCache(cache_size, cache_ttl)
+        self.user_watch = None
+        self.lock = threading.Lock()
+        self.users = {}
+        self.leases = {}
+        self.spares = {}
+        self.extractions = {}
+        self.descriptions = {}
+
+    def _call(self, operation: str):
+        # Firestore calls are guarded by a breaker without retries, like firestore_setup
+        def attempt():
+            with span('firestore', operation):
+                self.profile.wait(firestore_error)
+        outbound.call('firestore', attempt, retry=False)
+
+    def get_user_info(self, user_email, use_cache=True):
+        cached = self.user_cache.get(user_email) if use_cache else None
+        if cached:
+            return cached
+        self._call('get_user_info')
+        with self.lock:
+            user_data = self.users.get(user_email)
+        if user_data:
+            self.user_cache.put(user_email, dict(user_data))
+            return dict(user_data)
+        return None
+
+    def add_user_to_firestore(self, user_email, sheet_link, sheet_format_version=None):
+        self._call('add_user_to_firestore')
+        with self.lock:
+            self.users[user_email] = self._user_data(user_email, sheet_link, sheet_format_version)
+        self.user_cache.invalidate(user_email)
+
+    def delete_user_from_firestore(self, user_email):
+        self._call('delete_user_from_firestore')
+        with self.lock:
+            self.users.pop(user_email, None)
+        self.user_cache.invalidate(user_email)
+
+    def update_user_info(self, user_email, updated_data: dict):
+        self._call('update_user_info')
+        with self.lock:
+            if user_email not in self.users:
+                raise api_exceptions.NotFound(f"No document to update: {user_email}")
+            self.users[user_email].update(updated_data)
+        self.user_cache.invalidate(user_email)
+
+    def list_users(self):
+        self._call('list_users')
+        with self.lock:
+            users = [dict(user) for user in self.users.values()]
+        yield from users
+
+    def acquire_sheet_lease(self, user_email, owner, ttl):
+        self._call('acquire_sheet_lease')
+        now = time.time()
+        with self.lock:
+            sheet_link = (self.users.get(user_email) or {}).get('sheet_link')
+            if sheet_link:
+                return sheet_link, False
+            lease = self.leases.get(user_email)
+            if lease and lease['owner'] != owner and lease['expires_at'] > now:
+                return None, False
+            self.leases[user_email] = {'owner': owner, 'expires_at': now + ttl}
+            return None, True
+
+    def release_sheet_lease(self, user_email):
+        self._call('release_sheet_lease')
+        with self.lock:
+            self.leases.pop(user_email, None)
+
+    def add_spare_sheet(self, spreadsheet_id, sheet_link, sheet_format_version=None):
+        self._call('add_spare_sheet')
+        with self.lock:
+            self.spares[spreadsheet_id] = {
+                'sheet_link': sheet_link,
+                'sheet_format_version': sheet_format_version,
+                'created_at': time.time(),
+            }
+
+    def count_spare_sheets(self):
+        self._call('count_spare_sheets')
+        with self.lock:
+            return len(self.spares)
+
+    def claim_spare_sheet(self, user_email):
+        self._call('claim_spare_sheet')
+        with self.lock:
+            if not self.spares:
+                return None
+            _, spare = self.spares.popitem()
+            self.users[user_email] = self._user_data(user_email, spare['sheet_link'], spare['sheet_format_version'])
+        self.user_cache.invalidate(user_email)
+        return spare
+
+    def get_cached_extraction(self, key):
+        self._call('get_cached_extraction')
+        with self.lock:
+            return self.extractions.get(key)
+
+    def set_cached_extraction(self, key, result: dict, created_at: float):
+        self._call('set_cached_extraction')
+        with self.lock:
+            self.extractions[key] = {'result': result, 'created_at': created_at}
+
+    def delete_cached_extraction(self, key):
+        self._call('delete_cached_extraction')
+        with self.lock:
+            self.extractions.pop(key, None)
+
+    def delete_expired_extractions(self, cutoff: float):
+        self._call('delete_expired_extractions')
+        with self.lock:
+            for key in [key for key, doc in self.extractions.items() if doc['created_at'] < cutoff]:
+                del self.extractions[key]
+
+    def trim_extractions(self, max_docs: int):
+        self._call('trim_extractions')
+        with self.lock:
+            oldest = sorted(self.extractions, key=lambda key: self.extractions[key]['created_at'])
+            for key in oldest[:max(len(oldest) - max_docs, 0)]:
+                del self.extractions[key]
+
+    def set_descriptions(self, documents: dict):
+        self._call('set_descriptions')
+        with self.lock:
+            self.descriptions.update(documents)
+
+    def get_description(self, key):
+        self._call('get_description')
+        with self.lock:
+            return self.descriptions.get(key)
@@ -0,0 +1,336 @@
+# Offline load test: serves the real Flask app through waitress with the HF,
+# Sheets/Drive and Firestore clients replaced by the fakes in fakes.py, then
+# drives /api/query, /api/sheets, /api/link and /api/applications at rising
+# concurrency.
+# Also microbenchmarks Server.jsonResult and sheet row building.
+#
+# Usage: python benchmarks/load_test.py [--levels 1,4,16,64] [--requests 200]
+#            [--llm 0.8:0.01] [--sheets 0.15:0.01:429] [--drive 0.1] [--firestore 0.02]
+#            [--output results.json] [--compare previous.json]
+#
+# Dependency profiles are "median_seconds[:error_rate[:status]]". App settings
+# come from the environment as usual (e.g. SHEETS_WRITE_MODE=off, LLM_STREAMING=false),
+# so the same harness compares configurations.
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+import timeit
+import urllib.parse
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Offline defaults; anything already set in the environment wins
+os.environ.setdefault('LLM_BACKEND', 'hf')
+os.environ.setdefault('HF_API_KEY', 'offline-benchmark')
+os.environ.setdefault('LLM_WARM_ON_START', 'false')
+os.environ.setdefault('EXTRACTION_CACHE_BACKEND', '')
+os.environ.setdefault('USER_CACHE_LISTEN', 'false')
+os.environ.setdefault('SPARE_SHEET_POOL_SIZE', '0')
+
+import requests  # noqa: E402
+from google.oauth2 import service_account  # noqa: E402
+from waitress import create_server  # noqa: E402
+
+import firestore_setup  # noqa: E402
+import google_clients  # noqa: E402
+import llm_backends  # noqa: E402
+from fakes import (  # noqa: E402
+    JOB_RESPONSE, FakeDatabase, FakeGoogleClientPool, FakeInferenceClient, FakeSheetStore, LatencyProfile
+)
+
+ENDPOINTS = ('query', 'sheets', 'link', 'applications')
+
+PAGE_TEXT = "\n".join(
+    ["Home My Network Jobs Messaging Notifications Me For Business Try Premium"] * 20
+    + [
+        "Software Engineer",
+        "Example Corp · Singapore · 2 days ago · 40 applicants",
+        "About the job",
+        "Responsibilities",
+    ]
+    + [f"Build and operate service number {i} with the platform team" for i in range(40)]
+    + ["Qualifications", "Degree in Computer Science or related field", "Experience with Python and Go"]
+    + ["About the company Example Corp 10,001+ employees Show more"] * 10
+)
+
+JOB_DETAILS = {
+    "job_title": "Software Engineer",
+    "company_name": "Example Corp",
+    "date_applied": "2024-12-08",
+    "job_description": ["Design and build backend services", "Own features from design to production"],
+    "status": "Applied",
+    "notes": "",
+}
+
+
+def percentile(sorted_values: list, p: float):
+    if not sorted_values:
+        return None
+    # Nearest-rank percentile
+    index = max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+def load_app(args, sheet_store: FakeSheetStore, resolve: bool = True):
+    # Import app.py with its module-level clients swapped for fakes. With
+    # resolve=False the Server is built later, e.g. by each gunicorn worker
+    # after fork, and still gets the fakes.
+    llm_profile = LatencyProfile.parse(args.llm)
+    firestore_setup.database = partial(FakeDatabase, LatencyProfile.parse(args.firestore))
+    google_clients.GoogleClientPool = partial(
+        FakeGoogleClientPool,
+        sheets_profile=LatencyProfile.parse(args.sheets),
+        drive_profile=LatencyProfile.parse(args.drive),
+        store=sheet_store
+    )
+    # Left active for the life of the process so a Server built later works too
+    mock.patch.object(service_account.Credentials, 'from_service_account_file', return_value=None).start()
+    load_backend = llm_backends.load_backend
+
+    def load_fake_backend(name: str, **settings):
+        backend = load_backend(name, **settings)
+        backend.client = FakeInferenceClient(llm_profile, token_latency=args.token_latency)
+        return backend
+
+    # Before the import: a background STARTUP_MODE builds the Server while app.py
+    # is still being imported, and must already get the fake inference client
+    llm_backends.load_backend = load_fake_backend
+    import app as app_module
+    app_module.load_backend = load_fake_backend
+    if resolve:
+        # Build the clients now, whatever STARTUP_MODE is
+        app_module.server.resolve()
+    return app_module
+
+
+def seed_users(app_module, sheet_store: FakeSheetStore, count: int):
+    emails = []
+    for i in range(count):
+        email = f"user{i}@example.com"
+        spreadsheet_id = sheet_store.create(f"JobLedger_{i}")
+        app_module.db.users[email] = app_module.db._user_data(
+            email,
+            f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/edit",
+            app_module.SHEET_FORMAT_VERSION
+        )
+        emails.append(email)
+    return emails
+
+
+class LoadRunner:
+    def __init__(self, base_url: str, emails: list, new_user_rate: float, unique_pages: bool):
+        self.base_url = base_url
+        self.emails = emails
+        self.new_user_rate = new_user_rate
+        self.unique_pages = unique_pages
+        self.local = threading.local()
+        self.counter = 0
+        self.lock = threading.Lock()
+
+    def _session(self):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = requests.Session()
+        return session
+
+    def _next(self):
+        with self.lock:
+            self.counter += 1
+            return self.counter
+
+    def _email(self, n: int):
+        if self.new_user_rate and n % max(int(1 / self.new_user_rate), 1) == 0:
+            return f"new-{uuid.uuid4().hex[:12]}@example.com"
+        return self.emails[n % len(self.emails)]
+
+    def payload(self, endpoint: str):
+        n = self._next()
+        email = self.emails[n % len(self.emails)]
+        if endpoint == 'query':
+            query = PAGE_TEXT
+            if self.unique_pages:
+                # Inside the job region, so it survives text reduction and misses the extraction cache
+                query = PAGE_TEXT.replace("About the job", f"About the job\nJob reference {n}", 1)
+            return '/api/query', {'query': query, 'user_email': email}
+        if endpoint == 'sheets':
+            return '/api/sheets', {'user_email': self._email(n), 'updatedJobDetails': dict(JOB_DETAILS)}
+        if endpoint == 'applications':
+            params = {'user_email': email, 'company': JOB_DETAILS['company_name'], 'title': JOB_DETAILS['job_title']}
+            return '/api/applications?' + urllib.parse.urlencode(params), None
+        return '/api/link', {'userEmail': email}
+
+    def request(self, endpoint: str):
+        path, body = self.payload(endpoint)
+        start = time.perf_counter()
+        try:
+            if body is None:
+                response = self._session().get(self.base_url + path, timeout=120)
+            else:
+                response = self._session().post(self.base_url + path, json=body, timeout=120)
+            ok = 200 <= response.status_code < 300
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    def run(self, endpoint: str, concurrency: int, total: int):
+        total = max(total, concurrency)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(lambda _: self.request(endpoint), range(total)))
+        wall = time.perf_counter() - start
+
+        latencies = sorted(latency for latency, _ in samples)
+        errors = sum(1 for _, ok in samples if not ok)
+        return {
+            'endpoint': endpoint,
+            'concurrency': concurrency,
+            'requests': total,
+            'errors': errors,
+            'wall_seconds': round(wall, 3),
+            'rps': round(total / wall, 2),
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        }
+
+
+def microbenchmarks(server, number: int):
+    prompt_echo = server.build_prompt(PAGE_TEXT)
+    responses = {
+        'clean': JOB_RESPONSE,
+        'prompt_echo': f"{prompt_echo}\n{JOB_RESPONSE}",
+        'long_description': json.dumps({
+            "job_title": "Software Engineer",
+            "company_name": "Example Corp",
+            "job_description": [f"Responsibility {i}: build {{reliable}} systems" for i in range(200)]
+        }),
+    }
+
+    def per_call_us(func):
+        best = min(timeit.repeat(func, number=number, repeat=5))
+        return round(best / number * 1e6, 2)
+
+    results = {f"jsonResult.{name}": per_call_us(lambda r=response: server.jsonResult(r))
+               for name, response in responses.items()}
+    results['build_row'] = per_call_us(lambda: server.build_row(JOB_DETAILS))
+    results['build_row_and_body'] = per_call_us(
+        lambda: json.dumps({'values': [server.build_row(JOB_DETAILS)]})
+    )
+    long_job = dict(JOB_DETAILS, job_description=json.loads(responses['long_description'])['job_description'])
+    results['build_row.long_description'] = per_call_us(lambda: server.build_row(long_job))
+    return results
+
+
+def print_table(load_results: list, baseline: dict = None):
+    previous = {(r['endpoint'], r['concurrency']): r for r in (baseline or {}).get('load', [])}
+    print(f"{'endpoint':<8} {'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for r in load_results:
+        line = (f"{r['endpoint']:<8} {r['concurrency']:>5} {r['rps']:>9} {r['p50_ms']:>9} "
+                f"{r['p95_ms']:>9} {r['p99_ms']:>9} {r['errors']:>7}")
+        before = previous.get((r['endpoint'], r['concurrency']))
+        if before:
+            line += (f"   (req/s {r['rps'] - before['rps']:+.1f}, "
+                     f"p95 {r['p95_ms'] - before['p95_ms']:+.1f}ms)")
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--levels', default='1,4,16,64', help='comma separated concurrency levels')
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint and level')
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS))
+    parser.add_argument('--threads', type=int, default=int(os.getenv('WAITRESS_THREADS', '16')))
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--new-user-rate', type=float, default=0.0, help='share of /api/sheets calls from unknown users')
+    parser.add_argument('--repeat-pages', action='store_true', help='send the same page every time (cache hits)')
+    parser.add_argument('--llm', default='0.8', help='HF inference profile')
+    parser.add_argument('--token-latency', type=float, default=0.0, help='seconds between streamed tokens')
+    parser.add_argument('--sheets', default='0.15', help='Sheets API profile')
+    parser.add_argument('--drive', default='0.1', help='Drive API profile')
+    parser.add_argument('--firestore', default='0.02', help='Firestore profile')
+    parser.add_argument('--micro-number', type=int, default=2000)
+    parser.add_argument('--log-level', default='WARNING', help='app log level during the run')
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--compare', default=None, help='previous results file to diff against')
+    args = parser.parse_args()
+
+    sheet_store = FakeSheetStore()
+    app_module = load_app(args, sheet_store)
+    emails = seed_users(app_module, sheet_store, args.users)
+    # One JSON line per request would dominate the run otherwise
+    logging.getLogger().setLevel(args.log_level)
+
+    server = create_server(app_module.app, host='127.0.0.1', port=0, threads=args.threads)
+    threading.Thread(target=server.run, name="waitress", daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.effective_port}"
+
+    runner = LoadRunner(base_url, emails, args.new_user_rate, not args.repeat_pages)
+    levels = [int(level) for level in args.levels.split(',')]
+    load_results = []
+    try:
+        for endpoint in args.endpoints.split(','):
+            for concurrency in levels:
+                result = runner.run(endpoint, concurrency, args.requests)
+                load_results.append(result)
+                print(f"{endpoint} x{concurrency}: {result['rps']} req/s, p95 {result['p95_ms']}ms")
+    finally:
+        server.close()
+        app_module.shutdown()
+
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'settings': {
+            'levels': levels,
+            'requests': args.requests,
+            'waitress_threads': args.threads,
+            'users': args.users,
+            'new_user_rate': args.new_user_rate,
+            'unique_pages': not args.repeat_pages,
+            'profiles': {
+                'llm': LatencyProfile.parse(args.llm).to_dict(),
+                'sheets': LatencyProfile.parse(args.sheets).to_dict(),
+                'drive': LatencyProfile.parse(args.drive).to_dict(),
+                'firestore': LatencyProfile.parse(args.firestore).to_dict(),
+            },
+            'env': {name: os.getenv(name) for name in (
+                'LLM_BACKEND', 'LLM_STREAMING', 'LLM_BATCH_MAX_SIZE', 'SHEETS_WRITE_MODE',
+                'SHEETS_WRITE_WINDOW', 'TEXT_REDUCTION_TOKEN_BUDGET', 'FAST_PATH_ENABLED',
+                'USER_CACHE_TTL', 'EXTRACTION_CACHE_BACKEND'
+            )},
+        },
+        'load': load_results,
+        'micro_us': microbenchmarks(app_module.server, args.micro_number),
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print()
+    print_table(load_results, baseline)
+    for name, value in results['micro_us'].items():
+        print(f"{name:<28} {value:>10} us/call")
+
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), 'results', f"load_test-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == '__main__':
+    main()
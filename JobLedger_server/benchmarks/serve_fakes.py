@@ -0,0 +1,34 @@
+# WSGI entry point serving app.py backed by the fakes in fakes.py, so
+# bench_serving.py can start the real waitress and gunicorn command lines
+# offline. Dependency profiles come from BENCH_LLM, BENCH_SHEETS, BENCH_DRIVE
+# and BENCH_FIRESTORE ("median_seconds[:error_rate[:status]]").
+#
+#   waitress-serve --threads=16 serve_fakes:app
+#   gunicorn -c ../app/gunicorn.conf.py serve_fakes:app
+#
+# Under gunicorn the users are seeded in the master, so every worker starts
+# with the same copy of the fake sheets and Firestore data.
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fakes import FakeSheetStore  # noqa: E402
+from load_test import load_app, seed_users  # noqa: E402
+
+args = SimpleNamespace(
+    llm=os.getenv('BENCH_LLM', '0.8'),
+    sheets=os.getenv('BENCH_SHEETS', '0.15'),
+    drive=os.getenv('BENCH_DRIVE', '0.1'),
+    firestore=os.getenv('BENCH_FIRESTORE', '0.02'),
+    token_latency=float(os.getenv('BENCH_TOKEN_LATENCY', '0')),
+)
+
+sheet_store = FakeSheetStore()
+# The Server is built per process: at import under waitress, after fork under gunicorn
+app_module = load_app(args, sheet_store, resolve=False)
+seed_users(app_module, sheet_store, int(os.getenv('BENCH_USERS', '50')))
+
+app = app_module.app
@@ -237,7 +237,22 @@ async function createTextArea(userEmail,
   });
 
   // Focus textarea
-  textarea.focus();
+  title_textarea.focus();
+
+  // Lets the caller fill in details that arrive after the modal is shown,
+  // without overwriting anything the user has already typed
+  const shown = { ...jobData };
+  return (updatedJobData) => {
+      if (title_textarea.value === shown.title) {
+          title_textarea.value = shown.title = updatedJobData.title;
+      }
+      if (company_textarea.value === shown.company) {
+          company_textarea.value = shown.company = updatedJobData.company;
+      }
+      if (description_textarea.value === shown.description) {
+          description_textarea.value = shown.description = updatedJobData.description;
+      }
+  };
 }
 
 console.log('content.js loaded');
@@ -278,13 +293,27 @@ async function addJobToSheet(userEmail, finalJobDetails) {
     }
 }
 
-async function sendTextToBackend(userEmail, extractedText) {
+// Streamed responses carry the fields as the model produces them on the same
+// connection, so they work however many server processes there are.
+const USE_STREAMING_QUERY = true;
+
+// Async extraction jobs live in the memory of the server process that accepted
+// them, so polling only works when every request reaches that process (one
+// instance and worker, or session affinity). Off by default.
+const USE_ASYNC_QUERY = false;
+
+async function sendTextToBackend(userEmail, extractedPage, onPartial) {
     const backendUrl = "https://jobledgerimg-167652472526.asia-southeast1.run.app/api/query";
 
     // Prepare the payload matching the expected format
     const payload = {
-        "query": extractedText,
-        "user_email": userEmail
+        "query": extractedPage.text,
+        "user_email": userEmail,
+        "url": extractedPage.url,
+        "json_ld": extractedPage.jsonLd,
+        "html": extractedPage.html,
+        "async": USE_ASYNC_QUERY,
+        "stream": USE_STREAMING_QUERY
     };
 
     // Make a POST request
@@ -303,7 +332,19 @@ async function sendTextToBackend(userEmail, extractedText) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
 
-        const data = await response.json(); // Parse the JSON response
+        // Servers without streaming ignore the flag and answer with plain JSON
+        const contentType = response.headers.get("Content-Type") || "";
+        if (contentType.includes("application/x-ndjson")) {
+            const data = await readQueryStream(response, onPartial);
+            console.log("Response from backend:", data);
+            return data;
+        }
+
+        let data = await response.json(); // Parse the JSON response
+        if (response.status === 202) {
+            // Accepted as a background job
+            data = await pollQueryJob(backendUrl, data.job_id, onPartial);
+        }
         console.log("Response from backend:", data);
 
         return data; // Return the parsed JSON object
@@ -314,29 +355,114 @@ async function sendTextToBackend(userEmail, extractedText) {
     }
 }
 
-async function extractJobDetails(userEmail, extractedText){
-    const jobDetails = await sendTextToBackend(userEmail, extractedText);
+// Read the streamed extraction one JSON line at a time until it finishes,
+// passing fields streamed from the model to onPartial as they arrive
+async function readQueryStream(response, onPartial) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffered = "";
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) {
+            break;
+        }
+        buffered += decoder.decode(value, { stream: true });
+
+        const lines = buffered.split("\n");
+        buffered = lines.pop();
+        for (const line of lines) {
+            // Blank lines are keep-alives
+            if (!line.trim()) {
+                continue;
+            }
+            const job = JSON.parse(line);
+            if (job.status === 'done') {
+                reader.cancel();
+                return job.result;
+            }
+            if (job.status === 'failed' || job.status === 'timeout') {
+                reader.cancel();
+                throw new Error(job.error || `Extraction ${job.status}`);
+            }
+            if (job.partial && onPartial) {
+                onPartial(job.partial);
+            }
+        }
+    }
+    throw new Error("Extraction ended without a result");
+}
+
+// Poll the background extraction job until it finishes,
+// passing fields streamed from the model to onPartial as they arrive
+async function pollQueryJob(backendUrl, jobId, onPartial) {
+    const statusUrl = `${backendUrl}/${jobId}`;
+    const deadline = Date.now() + 120000;
+    let delay = 500;
+
+    while (Date.now() < deadline) {
+        await new Promise((resolve) => setTimeout(resolve, delay));
+        delay = Math.min(delay * 1.5, 1000);
+
+        const response = await fetch(statusUrl, { mode: "cors" });
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+
+        const job = await response.json();
+        if (job.status === 'done') {
+            return job.result;
+        }
+        if (job.status === 'failed' || job.status === 'timeout') {
+            throw new Error(job.error || `Extraction ${job.status}`);
+        }
+        if (job.partial && onPartial) {
+            onPartial(job.partial);
+        }
+    }
+    throw new Error("Extraction timed out");
+}
+
+function toFinalJobDetails(jobDetails) {
+    // Extract relevant fields
+    return {
+        title: jobDetails.job_title || '',
+        company: jobDetails.company_name || '',
+        description: (jobDetails.job_description || []).map((item, index) => `${index + 1}. ${item}`).join("\n")
+    };
+}
+
+async function extractJobDetails(userEmail, extractedPage, onPartial){
+    const jobDetails = await sendTextToBackend(userEmail, extractedPage, onPartial);
 
     if (jobDetails) {
-        // Extract relevant fields
-        const finalJobDetails = {
-            title: jobDetails.job_title,
-            company: jobDetails.company_name,
-            description: jobDetails.job_description.map((item, index) => `${index + 1}. ${item}`).join("\n")
-        };
-        return finalJobDetails;
+        return toFinalJobDetails(jobDetails);
     } else {
         console.error("Failed to retrieve job details");
         return null;
     }
 }
 
-async function handleJobDetails(userEmail, extractedText) {
+async function handleJobDetails(userEmail, extractedPage) {
     try {
-        const finalJobDetails = await extractJobDetails(userEmail, extractedText); // Wait for the job details
+        // Show the modal as soon as the first fields stream in, then keep it updated
+        let modalUpdate = null;
+        const showDetails = (details) => {
+            if (modalUpdate) {
+                modalUpdate.then((update) => update(details));
+            } else {
+                modalUpdate = createTextArea(userEmail, details);
+            }
+        };
+
+        const finalJobDetails = await extractJobDetails(userEmail, extractedPage, (partial) => {
+            showDetails(toFinalJobDetails(partial));
+        }); // Wait for the job details
         // Pass the resolved finalJobDetails to createTextArea
         console.log(finalJobDetails)
-        createTextArea(userEmail, finalJobDetails);
+        if (finalJobDetails) {
+            showDetails(finalJobDetails);
+        }
     } catch (error) {
         console.error("Error handling job details:", error);
     }
@@ -348,8 +474,8 @@ chrome.runtime.onMessage.addListener((message, sender, sendResponse) => {
         const userEmail = message.data.userEmail;
         // const userEmail = userInfo.email || 'anonymous' // Use "anonymous" if no email is available
         
-        const extractedText = message.data.extractedText;
-        handleJobDetails(userEmail, extractedText);
+        const extractedPage = message.data.extractedText;
+        handleJobDetails(userEmail, extractedPage);
     }
 });
 
@@ -58,10 +58,41 @@ getLinkButton.addEventListener("click", async() => {
 
 
 // function to extract text
+// Runs inside the page, so everything it needs has to be defined here
 function extractTextFromPage() {
     const extractedText = document.body.innerText;
     // console.log(extractedText);
-    return extractedText;
+
+    // schema.org JobPosting data lets the server skip the LLM
+    const jsonLd = Array.from(document.querySelectorAll('script[type="application/ld+json"]'))
+        .map((script) => script.textContent);
+
+    // Only send markup for boards the server has layout extractors for, and only
+    // the elements those extractors read (mirrors the selectors in fast_extractors.py);
+    // the whole body is megabytes on these boards
+    const layoutSelectors = {
+        'linkedin.com': [
+            '[class*="job-details-jobs-unified-top-card__job-title"]',
+            '[class*="job-details-jobs-unified-top-card__company-name"]',
+            '[id*="job-details"]'
+        ],
+        'greenhouse.io': ['h1[class*="app-title"]', '[class*="company-name"]', 'div[id*="content"]'],
+        'lever.co': ['div[class*="posting-headline"]', '[data-qa*="job-description"]'],
+        'myworkdayjobs.com': ['[data-automation-id*="jobPostingHeader"]', '[data-automation-id*="jobPostingDescription"]']
+    };
+    const host = window.location.hostname;
+    const layoutHost = Object.keys(layoutSelectors).find((h) => host === h || host.endsWith('.' + h));
+    const elements = layoutHost
+        ? layoutSelectors[layoutHost].map((selector) => document.querySelector(selector)).filter(Boolean)
+        : [];
+    const html = elements.length ? elements.map((element) => element.outerHTML).join('\n') : null;
+
+    return {
+        text: extractedText,
+        url: window.location.href,
+        jsonLd,
+        html
+    };
   }
 
 // Function to fetch user info using Chrome Identity API